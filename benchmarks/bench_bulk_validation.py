@@ -0,0 +1,45 @@
+"""
+Throughput of the bulk validators, numpy vs pure python.
+
+    python -m benchmarks.bench_bulk_validation [--items 1000000]
+"""
+import argparse
+import random
+import time
+
+from pyfinnotech.bulk_validation import validate_cards, validate_ibans, validate_national_ids, numpy
+
+
+def generate(length, prefix=''):
+    return prefix + ''.join(random.choice('0123456789') for _ in range(length - len(prefix)))
+
+
+def measure(title, validate, items, **kwargs):
+    started_at = time.perf_counter()
+    validate(items, **kwargs)
+    elapsed = time.perf_counter() - started_at
+    print(f'{title:>32}: {len(items) / elapsed:>14,.0f} items/s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    random.seed(13)
+    samples = {
+        'cards': (validate_cards, [generate(16) for _ in range(args.items)]),
+        'ibans': (validate_ibans, [generate(26, 'IR') for _ in range(args.items)]),
+        'national ids': (validate_national_ids, [generate(10) for _ in range(args.items)]),
+    }
+
+    for title, (validate, items) in samples.items():
+        measure(f'{title}, python', validate, items, use_numpy=False)
+        if numpy is not None:
+            measure(f'{title}, numpy (list)', validate, items)
+            array = numpy.array([i.encode() for i in items])
+            measure(f'{title}, numpy (bytes array)', validate, array)
+
+
+if __name__ == '__main__':
+    main()
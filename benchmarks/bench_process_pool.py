@@ -0,0 +1,78 @@
+"""
+Measures the throughput of `map_processes` running `iban_inquiry` by 1, 2, 4, ... worker processes against a
+threaded mock server which adds a fixed latency to each response, like the real api does.
+
+    python -m benchmarks.bench_process_pool [--calls 400] [--latency .02] [--max-processes 8]
+"""
+import argparse
+import threading
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import make_server, WSGIServer, WSGIRequestHandler
+
+from nanohttp import settings
+from nanohttp.application import Application
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.process_pool import map_processes
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import FinnotechRootMockController, valid_mock_client_id, \
+    valid_mock_client_secret, valid_mock_ibans
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_server(latency):
+    settings.load()
+    application = Application(root=FinnotechRootMockController())
+
+    def delayed_application(environ, start_response):
+        time.sleep(latency)
+        return application(environ, start_response)
+
+    port = ApiClientTestCase.find_free_port()
+    httpd = make_server(
+        'localhost', port, delayed_application, server_class=ThreadingWSGIServer, handler_class=QuietRequestHandler
+    )
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f'http://localhost:{port}', httpd.shutdown
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=400)
+    parser.add_argument('--latency', type=float, default=.02)
+    parser.add_argument('--max-processes', type=int, default=8)
+    args = parser.parse_args()
+
+    base_url, shutdown = start_server(args.latency)
+    try:
+        api_client = FinnotechApiClient(
+            client_id=valid_mock_client_id,
+            client_secret=valid_mock_client_secret,
+            base_url=base_url
+        )
+        processes = 1
+        while processes <= args.max_processes:
+            started_at = time.perf_counter()
+            results = list(map_processes(
+                api_client, 'iban_inquiry', [valid_mock_ibans[0]] * args.calls, processes=processes, chunk_size=8
+            ))
+            elapsed = time.perf_counter() - started_at
+            assert all(r.is_ok for r in results)
+            print(f'{processes:>3} processes: {args.calls / elapsed:8.1f} calls/s')
+            processes *= 2
+
+    finally:
+        shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Measures the cost of acquiring a permit from the in-process and the cross-process (memory-mapped) rate limiters.
+
+    python -m benchmarks.bench_rate_limit [--calls 200000]
+"""
+import argparse
+import tempfile
+import time
+
+from pyfinnotech.const import ENDPOINT_CARD_TO_IBAN
+from pyfinnotech.rate_limit import RateLimiter, RateLimit
+from pyfinnotech.shared_rate_limit import shared_rate_limiter
+
+
+def run(rate_limiter, calls):
+    started_at = time.perf_counter()
+    for _ in range(calls):
+        rate_limiter.try_acquire(ENDPOINT_CARD_TO_IBAN)
+    return (time.perf_counter() - started_at) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    limits = {ENDPOINT_CARD_TO_IBAN: RateLimit(rate=1e9, burst=1000)}
+    with tempfile.TemporaryDirectory() as directory:
+        for title, rate_limiter in (
+                ('in-process', RateLimiter(endpoints=limits)),
+                ('shared (mmap)', shared_rate_limiter('bench', endpoints=limits, directory=directory)),
+        ):
+            print(f'{title:>15}: {run(rate_limiter, args.calls) * 1e6:.2f} us/permit')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares per-call latency of a pooled, keep-alive transport against a throwaway session per call (what
+`requests.request` does) by running `iban_inquiry` against the mock server.
+
+    python -m benchmarks.bench_transport [--calls 500]
+
+Note: the mock server runs on `wsgiref`, which closes the connection after every response, so against it the numbers
+only show the session/adapter setup saved per call. Pass `--base-url` to point at a keep-alive server to see the
+saved TCP+TLS handshakes as well.
+"""
+import argparse
+import time
+
+from nanohttp import quickstart
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import FinnotechRootMockController, valid_mock_client_id, \
+    valid_mock_client_secret, valid_mock_ibans
+
+
+def run(api_client, calls):
+    api_client.iban_inquiry(valid_mock_ibans[0])  # Warm up, also fetches the token
+
+    started_at = time.perf_counter()
+    for _ in range(calls):
+        api_client.iban_inquiry(valid_mock_ibans[0])
+    return (time.perf_counter() - started_at) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--base-url', default=None)
+    args = parser.parse_args()
+
+    shutdown = None
+    base_url = args.base_url
+    if base_url is None:
+        port = ApiClientTestCase.find_free_port()
+        shutdown = quickstart(controller=FinnotechRootMockController(), port=port, block=False)
+        base_url = f'http://localhost:{port}'
+
+    try:
+        for title, keep_alive_timeout in (('throwaway session', 0), ('pooled session', None)):
+            with FinnotechApiClient(
+                    client_id=valid_mock_client_id,
+                    client_secret=valid_mock_client_secret,
+                    base_url=base_url,
+                    keep_alive_timeout=keep_alive_timeout
+            ) as api_client:
+                latency = run(api_client, args.calls)
+            print(f'{title:>20}: {latency * 1000:.3f} ms/call')
+
+    finally:
+        if shutdown is not None:
+            shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,2 @@
 from .api import FinnotechApiClient
+from .async_api import AsyncFinnotechApiClient
@@ -0,0 +1,5 @@
+import sys
+
+from pyfinnotech.cli import main
+
+sys.exit(main())
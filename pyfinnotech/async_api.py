@@ -0,0 +1,521 @@
+import asyncio
+import logging
+import time
+from json import JSONDecodeError
+from logging import Logger
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from pyfinnotech.api import FinnotechApiClient
+from pyfinnotech.bulkhead import Bulkheads
+from pyfinnotech.cache import NegativeCache
+from pyfinnotech.circuit_breaker import CircuitBreakers
+from pyfinnotech.concurrency import AdaptiveConcurrencyLimiter
+from pyfinnotech.const import URL_SANDBOX, URL_MAINNET, ALL_SCOPE_CLIENT_CREDENTIALS, ALL_SCOPE_AUTHORIZATION_TOKEN, \
+    ENDPOINT_IBAN_INQUIRY, ENDPOINT_CARDS, ENDPOINT_CARD_TO_IBAN, ENDPOINT_NID_VERIFICATION, \
+    ENDPOINT_STANDARD_RELIABILITY, DEFAULT_TIMEOUT, ENDPOINT_TIMEOUTS
+from pyfinnotech.deadline import deadline, remaining, bounded
+from pyfinnotech.exceptions import FinnotechException, FinnotechHttpException, FinnotechTimeoutException
+from pyfinnotech.hedging import HedgingPolicy
+from pyfinnotech.metrics import MetricsRegistry
+from pyfinnotech.rate_limit import RateLimiter
+from pyfinnotech.responses import IbanInquiryResponse, CardInquiryResponse, NationalIdVerification, \
+    CardToIbanResponse
+from pyfinnotech.retry import RetryPolicy
+from pyfinnotech.scheduler import PriorityScheduler
+from pyfinnotech.singleflight import AsyncSingleFlight
+from pyfinnotech.token import ClientCredentialToken, Token, FacilitySmsAccessTokenToken
+from pyfinnotech.transport import HttpResponse
+from pyfinnotech.validation import validate_iban, validate_card, validate_national_id, validate_phone_number, \
+    validate_otp, ChecksumValidator
+
+
+class AsyncFinnotechApiClient:
+    """
+    Asyncio version of `FinnotechApiClient`, every api method is a coroutine.
+
+    All the calls share one `aiohttp` connection pool and at most `max_in_flight` requests are sent at the same time,
+    the rest wait for a free slot.
+
+    Requires `aiohttp`: `pip install pyfinnotech[async]`
+    """
+
+    def __init__(
+            self,
+            client_id,
+            client_secret=None,
+            client_national_id=None,
+            scopes=None,
+            is_sandbox=False,
+            logger: Logger = None,
+            requests_extra_kwargs: dict = None,
+            client_credential_token=None,
+            client_credential_refresh_token=None,
+            base_url=None,
+            pool_maxsize=100,
+            pool_maxsize_per_host=0,
+            keep_alive_timeout=15,
+            max_in_flight=100,
+            token_refresh_margin=60,
+            local_validation=True,
+            response_caches: dict = None,
+            negative_cache: NegativeCache = None,
+            rate_limiter: RateLimiter = None,
+            concurrency_limiter: AdaptiveConcurrencyLimiter = None,
+            retry_policy: RetryPolicy = None,
+            timeouts: dict = None,
+            default_timeout=DEFAULT_TIMEOUT,
+            circuit_breakers: CircuitBreakers = None,
+            deduplicate_calls=False,
+            hedging_policy: HedgingPolicy = None,
+            bulkheads: Bulkheads = None,
+            scheduler: PriorityScheduler = None,
+            metrics: MetricsRegistry = None
+    ):
+        if aiohttp is None:  # pragma: no cover
+            raise ImportError('AsyncFinnotechApiClient requires aiohttp, install it by: pip install pyfinnotech[async]')
+
+        self.server_url = base_url or (URL_SANDBOX if is_sandbox is True else URL_MAINNET)
+        self.logger = logger or logging.getLogger('pyfinnotech')
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.client_national_id = client_national_id
+        self.scopes = scopes or ALL_SCOPE_CLIENT_CREDENTIALS + ALL_SCOPE_AUTHORIZATION_TOKEN
+        self.requests_extra_kwargs = requests_extra_kwargs or {}
+        self.pool_maxsize = pool_maxsize
+        self.pool_maxsize_per_host = pool_maxsize_per_host
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_in_flight = max_in_flight
+        self.token_refresh_margin = token_refresh_margin
+        self.checksum_validator = ChecksumValidator(enabled=local_validation)
+        self.response_caches = response_caches or {}
+        self.negative_cache = negative_cache
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.retry_policy = retry_policy
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self.default_timeout = default_timeout
+        self.circuit_breakers = circuit_breakers
+        self._execute_flight = AsyncSingleFlight(self.logger) if deduplicate_calls is True else None
+        self.hedging_policy = hedging_policy
+        self.bulkheads = bulkheads
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self._session = None
+        self._in_flight = None
+        self._client_credential_flight = AsyncSingleFlight(self.logger)
+        self._client_credential_token = None
+        if client_credential_token is not None:
+            self._client_credential_token = ClientCredentialToken.load(
+                raw_token=client_credential_token,
+                refresh_token=client_credential_refresh_token
+            )
+
+    _generate_track_id = FinnotechApiClient._generate_track_id
+    avoided_calls = FinnotechApiClient.avoided_calls
+    deduplicated_calls = FinnotechApiClient.deduplicated_calls
+    _deduplication_key = FinnotechApiClient._deduplication_key
+    _timeout = FinnotechApiClient._timeout
+    _retry_delay = FinnotechApiClient._retry_delay
+    _circuit_breaker = FinnotechApiClient._circuit_breaker
+    _record = FinnotechApiClient._record
+    _check_bulkhead = FinnotechApiClient._check_bulkhead
+    _is_hedged = FinnotechApiClient._is_hedged
+    _is_winner = FinnotechApiClient._is_winner
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_maxsize,
+                    limit_per_host=self.pool_maxsize_per_host,
+                    keepalive_timeout=self.keep_alive_timeout
+                )
+            )
+        return self._session
+
+    async def close(self):
+        if self.negative_cache is not None and self.negative_cache.path is not None:
+            self.negative_cache.save()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def get_client_credential(self) -> ClientCredentialToken:
+        token = self._client_credential_token
+        if token is None:
+            # Concurrent callers share one fetch, but wait at most their own deadline
+            return await self._client_credential_flight.do('fetch', self._fetch_client_credential)
+
+        if token.is_valid is not True or token.needs_refresh(self.token_refresh_margin):
+            await token.refresh_async(self, stale_token=token.token)
+        return token
+
+    async def _fetch_client_credential(self) -> ClientCredentialToken:
+        if self._client_credential_token is None:
+            self._client_credential_token = await ClientCredentialToken.fetch_async(self)
+        return self._client_credential_token
+
+    async def _cached(self, endpoint, key, load):
+        """
+        Coroutine version of `FinnotechApiClient._cached`, `load` should be a coroutine function
+        """
+        if self.negative_cache is not None and self.negative_cache.is_rejected(endpoint, key):
+            if self.metrics is not None:
+                self.metrics.record_cache_hit(endpoint, 'negative')
+            raise FinnotechHttpException(self.negative_cache.rejection_response(endpoint, key), self.logger)
+
+        cache = self.response_caches.get(endpoint)
+        result = None if cache is None else cache.get(key)
+        if result is not None and self.metrics is not None:
+            self.metrics.record_cache_hit(endpoint)
+        if result is None:
+            try:
+                result = await load()
+            except FinnotechHttpException as e:
+                if self.negative_cache is not None and e.status_code in self.negative_cache.status_codes:
+                    self.negative_cache.add(endpoint, key)
+                raise
+
+            if cache is not None and result is not None:
+                cache.set(key, result)
+        return result
+
+    async def _bulkhead(self, endpoint):
+        """
+        Coroutine version of `FinnotechApiClient._bulkhead`
+        """
+        if self.bulkheads is None:
+            return None
+
+        bulkhead = self.bulkheads.get(endpoint)
+        self._check_bulkhead(bulkhead, await bulkhead.acquire_async(timeout=remaining()))
+        return bulkhead
+
+    async def _send(self, endpoint, method, url, params, headers, body) -> HttpResponse:
+        timeout = self._timeout(endpoint)
+        breaker = self._circuit_breaker(endpoint)
+        bulkhead = None
+        try:
+            bulkhead = await self._bulkhead(endpoint)
+            if self.rate_limiter is not None and \
+                    not await self.rate_limiter.acquire_async(endpoint, timeout=remaining()):
+                raise FinnotechTimeoutException(f'Deadline exceeded waiting for the rate limit of {endpoint}',
+                                                logger=self.logger)
+
+            if self.concurrency_limiter is not None and \
+                    not await self.concurrency_limiter.acquire_async(timeout=remaining()):
+                raise FinnotechTimeoutException(f'Deadline exceeded waiting for the concurrency limit of {endpoint}',
+                                                logger=self.logger)
+        except BaseException:
+            if bulkhead is not None:
+                bulkhead.release()
+            if breaker is not None:
+                breaker.cancel()
+            raise
+
+        started_at = time.perf_counter()
+        response = None
+        error = None
+        cancelled = False
+        try:
+            response = await self._request(method, url, params, headers, body, bounded(timeout))
+            return response
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._record(endpoint, breaker, bulkhead, started_at, response, error=error, cancelled=cancelled)
+
+    async def _request(self, method, url, params, headers, body, timeout=DEFAULT_TIMEOUT) -> HttpResponse:
+        """
+        :param timeout: `(connect, read)` timeouts, the whole request is bounded by the deadline of the call as well
+        """
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        connect, read = timeout
+        async with self._in_flight:
+            async with self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    headers=headers,
+                    json=body,
+                    **{
+                        'timeout': aiohttp.ClientTimeout(total=remaining(), sock_connect=connect, sock_read=read),
+                        **self.requests_extra_kwargs
+                    }
+            ) as response:
+                return HttpResponse(response.status, await response.read(), response.headers)
+
+    async def _execute(self, uri, method='get', params=None, headers=None, body=None, token: Token = None,
+                       error_mapper=None, no_track_id=False, endpoint=None):
+        endpoint = endpoint or uri.split('?')[0]
+        execute = self._execute_once if self.scheduler is None else self._execute_scheduled
+        key = self._deduplication_key(endpoint, uri, method, params, headers, body, token)
+        try:
+            if key is None:
+                return await execute(uri, method, params, headers, body, token, no_track_id, endpoint)
+            return await self._execute_flight.do(
+                key, execute, uri, method, params, headers, body, token, no_track_id, endpoint
+            )
+        except (FinnotechHttpException, FinnotechException) as e:
+            if self.metrics is not None:
+                self.metrics.record_error(endpoint, e)
+            raise
+
+    async def _execute_scheduled(self, uri, method, params, headers, body, token: Token, no_track_id, endpoint):
+        """
+        Coroutine version of `FinnotechApiClient._execute_scheduled`
+        """
+        priority = await self.scheduler.acquire_async(timeout=remaining())
+        if priority is None:
+            raise FinnotechTimeoutException(f'Deadline exceeded waiting for the scheduler on {endpoint}',
+                                            logger=self.logger)
+        try:
+            return await self._execute_once(uri, method, params, headers, body, token, no_track_id, endpoint)
+        finally:
+            self.scheduler.release(priority)
+
+    async def _execute_once(self, uri, method, params, headers, body, token: Token, no_track_id, endpoint):
+        params = params or dict()
+        headers = headers or dict()
+        # Generated once, so the retries reuse it
+        track_id = self._generate_track_id() if no_track_id is False else None
+        if track_id is not None:
+            params.setdefault('trackId', track_id)
+        self.logger.debug(f"Requesting"
+                          f" on {uri} with id:{track_id}"
+                          f" with parameters: {'.'.join(str(params))}")
+
+        if self.retry_policy is not None:
+            self.retry_policy.budget.deposit()
+
+        url = ''.join([self.server_url, uri])
+        attempt = 1
+        while True:
+            try:
+                response = await self._hedged_attempt(endpoint, method, url, params, headers, body, token)
+
+            except (FinnotechHttpException, FinnotechException) as e:
+                # Raised locally (e.g. an open circuit or a full bulkhead) or already handled by a nested call
+                raise e
+
+            except Exception as e:
+                delay = self._retry_delay(attempt, exception=e)
+                if delay is None:
+                    if remaining() == 0:
+                        raise FinnotechTimeoutException(f'Deadline exceeded on {uri}: {str(e)}', logger=self.logger)
+                    raise FinnotechException(f"Request error: {str(e)}", logger=self.logger)
+
+            else:
+                if response.status_code == 200:
+                    try:
+                        return response.json()
+                    except (JSONDecodeError, ValueError) as e:
+                        raise FinnotechHttpException(
+                            response=response,
+                            logger=self.logger,
+                            underlying_exception=e
+                        )
+
+                delay = self._retry_delay(attempt, response=response)
+                if delay is None:
+                    raise FinnotechHttpException(response, self.logger)
+
+            self.logger.info(f'Retrying {uri} with id:{track_id} in {delay:.3f} seconds')
+            if self.metrics is not None:
+                self.metrics.record_retry(endpoint)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _hedged_attempt(self, endpoint, method, url, params, headers, body, token: Token):
+        """
+        Coroutine version of `FinnotechApiClient._hedged_attempt`, the loser is cancelled
+        """
+        if not self._is_hedged(endpoint, method):
+            return await self._attempt(endpoint, method, url, params, headers, body, token)
+
+        delay = self.hedging_policy.delay(endpoint)
+        if delay is None:
+            return await self._observed_attempt(endpoint, method, url, params, headers, body, token)
+
+        attempts = [asyncio.ensure_future(self._observed_attempt(endpoint, method, url, params, headers, body, token))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if done or not self.hedging_policy.try_hedge():
+                return await attempts[0]
+
+            self.logger.info(f'Hedging {url} with id:{params.get("trackId")} after {delay:.3f} seconds')
+            attempts.append(asyncio.ensure_future(
+                self._observed_attempt(endpoint, method, url, params, headers, body, token)
+            ))
+            pending = set(attempts)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if pending and not self._is_winner(task):
+                        continue
+
+                    if task is not attempts[0]:
+                        self.hedging_policy.record_win()
+                    return task.result()
+
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+    async def _observed_attempt(self, endpoint, method, url, params, headers, body, token: Token):
+        started_at = time.perf_counter()
+        response = await self._attempt(endpoint, method, url, params, headers, body, token)
+        self.hedging_policy.observe(endpoint, time.perf_counter() - started_at)
+        return response
+
+    async def _attempt(self, endpoint, method, url, params, headers, body, token: Token):
+        rejected_token = None if token is None else token.token
+        response = await self._send(
+            endpoint,
+            method,
+            url,
+            params=params,
+            headers=headers if token is None else {**headers, **token.generate_authorization_header()},
+            body=body
+        )
+
+        if response.status_code == 403:
+            self.logger.info('Trying to refresh token')
+            await token.refresh_async(self, stale_token=rejected_token)
+
+            response = await self._send(
+                endpoint,
+                method,
+                url,
+                params=params,
+                headers={**headers, **token.generate_authorization_header()},
+                body=body
+            )
+
+        return response
+
+    async def iban_inquiry(self, iban, timeout=None) -> IbanInquiryResponse:
+        """
+        Coroutine version of `FinnotechApiClient.iban_inquiry`
+        """
+        validate_iban(iban)
+        self.checksum_validator.validate('iban_inquiry', 'iban', iban)
+
+        url = f'/oak/v2/clients/{self.client_id}/ibanInquiry'
+
+        async def load():
+            return (await self._execute(
+                uri=url,
+                endpoint=ENDPOINT_IBAN_INQUIRY,
+                token=await self.get_client_credential(),
+                params={'iban': iban}
+            )).get('result')
+
+        with deadline(timeout):
+            return IbanInquiryResponse(await self._cached('iban_inquiry', iban, load))
+
+    async def card_inquiry(self, card, timeout=None) -> CardInquiryResponse:
+        """
+        Coroutine version of `FinnotechApiClient.card_inquiry`
+        """
+        validate_card(card)
+        self.checksum_validator.validate('card_inquiry', 'card', card)
+
+        url = f'/mpg/v2/clients/{self.client_id}/cards/{card}'
+
+        async def load():
+            return (await self._execute(
+                uri=url,
+                endpoint=ENDPOINT_CARDS,
+                token=await self.get_client_credential(),
+            )).get('result')
+
+        with deadline(timeout):
+            return CardInquiryResponse(await self._cached('card_inquiry', card, load))
+
+    async def standard_reliability(self, national_id, phone_number, otp, timeout=None):
+        """
+        Coroutine version of `FinnotechApiClient.standard_reliability`
+        """
+        validate_national_id(national_id)
+        self.checksum_validator.validate('standard_reliability', 'national_id', national_id)
+        validate_phone_number(phone_number)
+        validate_otp(otp)
+
+        url = f'/oak/v2/clients/{self.client_id}/users/{national_id}/standardReliability'
+
+        with deadline(timeout):
+            return (await self._execute(
+                uri=url,
+                endpoint=ENDPOINT_STANDARD_RELIABILITY,
+                params={'phoneNumber': phone_number, 'otp': otp},
+                token=await self.get_client_credential(),
+            )).get('result')
+
+    # noinspection PyProtectedMember
+    async def national_id_verification(self, access_token: FacilitySmsAccessTokenToken,
+                                       national_id,
+                                       birth_date: str,
+                                       first_name=None, last_name=None, full_name=None,
+                                       father_name=None, gender=None, timeout=None) -> NationalIdVerification:
+        """
+        Coroutine version of `FinnotechApiClient.national_id_verification`
+        """
+        validate_national_id(national_id)
+        self.checksum_validator.validate('national_id_verification', 'national_id', national_id)
+        url = f'/facility/v2/clients/{self.client_id}/users/{national_id}/sms/nidVerification'
+
+        params = FinnotechApiClient._national_id_verification_params(
+            birth_date=birth_date,
+            first_name=first_name,
+            last_name=last_name,
+            full_name=full_name,
+            father_name=father_name,
+            gender=gender
+        )
+
+        with deadline(timeout):
+            return NationalIdVerification((await self._execute(
+                uri=url,
+                endpoint=ENDPOINT_NID_VERIFICATION,
+                params=params,
+                token=access_token,
+            )).get('result'))
+
+    async def card_to_iban(self, card, timeout=None) -> CardToIbanResponse:
+        """
+        Coroutine version of `FinnotechApiClient.card_to_iban`
+        """
+        validate_card(card)
+        self.checksum_validator.validate('card_to_iban', 'card', card)
+
+        url = f'/facility/v2/clients/{self.client_id}/cardToIban'
+
+        async def load():
+            return (await self._execute(
+                uri=url,
+                endpoint=ENDPOINT_CARD_TO_IBAN,
+                token=await self.get_client_credential(),
+                params={'card': card}
+            )).get('result')
+
+        with deadline(timeout):
+            return CardToIbanResponse(await self._cached('card_to_iban', card, load))
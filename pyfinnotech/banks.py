@@ -0,0 +1,143 @@
+"""
+Offline bank resolution: the bank of an iban is known by its bank code (the 3 digits after the check digits) and the
+bank of a card by its BIN (the first 6 digits), so there is no need to call an inquiry api just for that.
+"""
+from collections import namedtuple
+
+from pyfinnotech.const import BANK_MARKAZI, BANK_SANATVAMADAN, BANK_MELLAT, BANK_REFAH, BANK_MASKAN, BANK_SEPAH, \
+    BANK_KESHAVARZI, BANK_MELLI, BANK_TEJARAT, BANK_SADERAT, BANK_TOSEESADERAT, BANK_TOSEE, BANK_POST, \
+    BANK_TOSEETAAVON, BANK_GHAVAMIN, BANK_KARAFARIN, BANK_PARSIAN, BANK_EGHTESADENOVIN, BANK_SAMAN, BANK_PASARGAD, \
+    BANK_SARMAYEH, BANK_SINA, BANK_MEHRIRAN, BANK_SHAHR, BANK_AYANDEH, BANK_ANSAR, BANK_GARDESHGARI, \
+    BANK_HEKMATIRANIAN, BANK_DEY, BANK_IRANZAMIN, BANK_RESALAT, BANK_KOSAR, BANK_MELAL, BANK_KHAVARMIANEH, \
+    BANK_MEHREGHTESAD, BANK_NOOR, BANK_IRANVENEZUELA
+
+Bank = namedtuple('Bank', ['code', 'name', 'persian_name'])
+
+BANKS = {
+    b.code: b for b in [
+        Bank(BANK_MARKAZI, 'Central Bank of Iran', 'بانک مرکزی'),
+        Bank(BANK_SANATVAMADAN, 'Sanat va Madan', 'صنعت و معدن'),
+        Bank(BANK_MELLAT, 'Mellat', 'ملت'),
+        Bank(BANK_REFAH, 'Refah Kargaran', 'رفاه کارگران'),
+        Bank(BANK_MASKAN, 'Maskan', 'مسکن'),
+        Bank(BANK_SEPAH, 'Sepah', 'سپه'),
+        Bank(BANK_KESHAVARZI, 'Keshavarzi', 'کشاورزی'),
+        Bank(BANK_MELLI, 'Melli Iran', 'ملی ایران'),
+        Bank(BANK_TEJARAT, 'Tejarat', 'تجارت'),
+        Bank(BANK_SADERAT, 'Saderat Iran', 'صادرات ایران'),
+        Bank(BANK_TOSEESADERAT, 'Tosee Saderat', 'توسعه صادرات'),
+        Bank(BANK_POST, 'Post Bank', 'پست بانک'),
+        Bank(BANK_TOSEETAAVON, 'Tosee Taavon', 'توسعه تعاون'),
+        Bank(BANK_TOSEE, 'Tosee Credit Institution', 'موسسه اعتباری توسعه'),
+        Bank(BANK_GHAVAMIN, 'Ghavamin', 'قوامین'),
+        Bank(BANK_KARAFARIN, 'Karafarin', 'کارآفرین'),
+        Bank(BANK_PARSIAN, 'Parsian', 'پارسیان'),
+        Bank(BANK_EGHTESADENOVIN, 'Eghtesad Novin', 'اقتصاد نوین'),
+        Bank(BANK_SAMAN, 'Saman', 'سامان'),
+        Bank(BANK_PASARGAD, 'Pasargad', 'پاسارگاد'),
+        Bank(BANK_SARMAYEH, 'Sarmayeh', 'سرمایه'),
+        Bank(BANK_SINA, 'Sina', 'سینا'),
+        Bank(BANK_MEHRIRAN, 'Gharzolhasaneh Mehr Iran', 'قرض الحسنه مهر ایران'),
+        Bank(BANK_SHAHR, 'Shahr', 'شهر'),
+        Bank(BANK_AYANDEH, 'Ayandeh', 'آینده'),
+        Bank(BANK_ANSAR, 'Ansar', 'انصار'),
+        Bank(BANK_GARDESHGARI, 'Gardeshgari', 'گردشگری'),
+        Bank(BANK_HEKMATIRANIAN, 'Hekmat Iranian', 'حکمت ایرانیان'),
+        Bank(BANK_DEY, 'Dey', 'دی'),
+        Bank(BANK_IRANZAMIN, 'Iran Zamin', 'ایران زمین'),
+        Bank(BANK_RESALAT, 'Gharzolhasaneh Resalat', 'قرض الحسنه رسالت'),
+        Bank(BANK_KOSAR, 'Kosar Credit Institution', 'موسسه اعتباری کوثر'),
+        Bank(BANK_MELAL, 'Melal Credit Institution', 'موسسه اعتباری ملل'),
+        Bank(BANK_KHAVARMIANEH, 'Khavarmianeh', 'خاورمیانه'),
+        Bank(BANK_MEHREGHTESAD, 'Mehr Eghtesad', 'مهر اقتصاد'),
+        Bank(BANK_NOOR, 'Noor Credit Institution', 'موسسه اعتباری نور'),
+        Bank(BANK_IRANVENEZUELA, 'Iran-Venezuela', 'ایران و ونزوئلا'),
+    ]
+}
+
+CARD_BINS = {
+    '603799': BANK_MELLI,
+    '170019': BANK_MELLI,
+    '589210': BANK_SEPAH,
+    '627648': BANK_TOSEESADERAT,
+    '207177': BANK_TOSEESADERAT,
+    '627961': BANK_SANATVAMADAN,
+    '603770': BANK_KESHAVARZI,
+    '639217': BANK_KESHAVARZI,
+    '628023': BANK_MASKAN,
+    '627760': BANK_POST,
+    '502908': BANK_TOSEETAAVON,
+    '627412': BANK_EGHTESADENOVIN,
+    '622106': BANK_PARSIAN,
+    '639194': BANK_PARSIAN,
+    '627884': BANK_PARSIAN,
+    '502229': BANK_PASARGAD,
+    '639347': BANK_PASARGAD,
+    '627488': BANK_KARAFARIN,
+    '502910': BANK_KARAFARIN,
+    '621986': BANK_SAMAN,
+    '639346': BANK_SINA,
+    '639607': BANK_SARMAYEH,
+    '636214': BANK_AYANDEH,
+    '502806': BANK_SHAHR,
+    '504706': BANK_SHAHR,
+    '502938': BANK_DEY,
+    '603769': BANK_SADERAT,
+    '610433': BANK_MELLAT,
+    '991975': BANK_MELLAT,
+    '627353': BANK_TEJARAT,
+    '585983': BANK_TEJARAT,
+    '589463': BANK_REFAH,
+    '627381': BANK_ANSAR,
+    '505785': BANK_IRANZAMIN,
+    '636795': BANK_MARKAZI,
+    '504172': BANK_RESALAT,
+    '606373': BANK_MEHRIRAN,
+    '505416': BANK_GARDESHGARI,
+    '636949': BANK_HEKMATIRANIAN,
+    '585947': BANK_KHAVARMIANEH,
+    '507677': BANK_NOOR,
+    '639599': BANK_GHAVAMIN,
+    '628157': BANK_TOSEE,
+    '505801': BANK_KOSAR,
+    '606256': BANK_MELAL,
+    '639370': BANK_MEHREGHTESAD,
+    '581874': BANK_IRANVENEZUELA,
+}
+
+# Prefix index of the BINs: one dict lookup per distinct BIN length (longest first), so the longest matching prefix
+# wins and a lookup costs O(1) regardless of the number of BINs
+_BIN_INDEX = {prefix: BANKS[code] for prefix, code in CARD_BINS.items()}
+_BIN_LENGTHS = sorted({len(prefix) for prefix in CARD_BINS}, reverse=True)
+
+
+def resolve_iban_bank(iban) -> Bank:
+    if iban is None or len(iban) != 26 or not iban.startswith('IR'):
+        return None
+    return BANKS.get(iban[4:7])
+
+
+def resolve_card_bank(card) -> Bank:
+    if card is None or not card.isdigit():
+        return None
+
+    for length in _BIN_LENGTHS:
+        bank = _BIN_INDEX.get(card[:length])
+        if bank is not None:
+            return bank
+    return None
+
+
+def resolve_bank(card_or_iban) -> Bank:
+    """
+    Resolves the bank of a card number or an iban locally, without any api call.
+
+    :return: `Bank` or `None` when it's unknown
+    """
+    if card_or_iban is None:
+        return None
+
+    card_or_iban = card_or_iban.replace(' ', '').replace('-', '').upper()
+    if card_or_iban.startswith('IR'):
+        return resolve_iban_bank(card_or_iban)
+    return resolve_card_bank(card_or_iban)
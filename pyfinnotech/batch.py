@@ -0,0 +1,88 @@
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+
+from pyfinnotech.exceptions import FinnotechException, FinnotechHttpException
+
+CAPTURED_EXCEPTIONS = (ValueError, FinnotechHttpException, FinnotechException)
+
+
+class BatchResult:
+    """
+    Outcome of one input of a batch: either `result` or the captured `error`.
+    """
+
+    __slots__ = ('input', 'result', 'error')
+
+    def __init__(self, input_, result=None, error=None):
+        self.input = input_
+        self.result = result
+        self.error = error
+
+    @property
+    def is_ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return f'<BatchResult {self.input}: {self.error if self.error is not None else "ok"}>'
+
+
+def _run(func, input_):
+    try:
+        return BatchResult(input_, result=func(input_))
+    except CAPTURED_EXCEPTIONS as e:
+        return BatchResult(input_, error=e)
+
+
+def map_bounded(executor, func, inputs, max_pending, ordered=True):
+    """
+    Submits `func` for each of `inputs` to `executor` and yields the results, keeping at most `max_pending` of them
+    submitted but not yet yielded, while `inputs` is consumed lazily.
+    """
+    inputs = iter(inputs)
+
+    def submit(input_):
+        return executor.submit(func, input_)
+
+    pending = deque() if ordered else set()
+    try:
+        if ordered:
+            pending.extend(submit(i) for i in itertools.islice(inputs, max_pending))
+            while pending:
+                result = pending.popleft().result()
+                for input_ in itertools.islice(inputs, 1):
+                    pending.append(submit(input_))
+                yield result
+
+        else:
+            pending.update(submit(i) for i in itertools.islice(inputs, max_pending))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for input_ in itertools.islice(inputs, len(done)):
+                    pending.add(submit(input_))
+                for future in done:
+                    yield future.result()
+
+    finally:
+        # Abandoned early (e.g. `break` or an exception), the queued inputs shouldn't be called at all,
+        # `shutdown(cancel_futures=True)` isn't available before python 3.9
+        for future in pending:
+            future.cancel()
+
+
+def map_concurrently(func, inputs, max_workers=8, ordered=True, max_pending=None):
+    """
+    Calls `func` for each of `inputs` on a bounded thread pool and yields a `BatchResult` per input, `ValueError`,
+    `FinnotechHttpException` and `FinnotechException` are captured as the results instead of aborting the batch.
+
+    `inputs` is consumed lazily and at most `max_pending` (default: twice `max_workers`) inputs are in progress or
+    waiting to be yielded, so the memory stays bounded no matter how large the input is.
+
+    :param ordered: Yield in the input order, otherwise as soon as they complete
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pyfinnotech-batch')
+    try:
+        yield from map_bounded(executor, partial(_run, func), inputs, max_pending or max_workers * 2, ordered)
+    finally:
+        executor.shutdown(wait=True)
@@ -0,0 +1,83 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+
+
+class BloomFilter:
+    """
+    Compact probabilistic set: never misses an added key, but may report a not-added key as present with the
+    probability of `error_rate` (while it holds at most `capacity` keys).
+
+    It takes `-capacity * ln(error_rate) / ln(2)^2` bits, e.g. 10 million keys with 1% error rate fit in ~12MB.
+    `created_at` is the unix time it's created at, kept in its file as well.
+    """
+
+    _header = struct.Struct('<4sQQQQdd')
+    _magic = b'PFB2'
+
+    def __init__(self, capacity=10_000_000, error_rate=.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self.created_at = time.time()
+        self.bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = struct.unpack('<QQ', digest)
+        second |= 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        with self._lock:
+            for position in self._positions(key):
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def save(self, path):
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(self._header.pack(
+                self._magic, self.size, self.hash_count, self.count, self.capacity, self.error_rate, self.created_at
+            ))
+            f.write(self.bits)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, size, hash_count, count, capacity, error_rate, created_at = cls._header.unpack(
+                f.read(cls._header.size)
+            )
+            if magic != cls._magic:
+                raise ValueError(f'Bad bloom filter file: {path}')
+
+            bloom_filter = cls.__new__(cls)
+            bloom_filter.size = size
+            bloom_filter.hash_count = hash_count
+            bloom_filter.count = count
+            bloom_filter.capacity = capacity
+            bloom_filter.error_rate = error_rate
+            bloom_filter.created_at = created_at
+            bloom_filter.bits = bytearray(f.read())
+            bloom_filter._lock = threading.Lock()
+            return bloom_filter
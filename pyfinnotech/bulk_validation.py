@@ -0,0 +1,129 @@
+"""
+Batch version of the local checks of `pyfinnotech.validation`, for pre-screening millions of card numbers, ibans and
+national ids at once.
+
+Every function takes an array or any iterable of strings and returns a boolean mask (`True` for the valid items).
+The checks run as numpy vectorized operations over fixed-width digit matrices when numpy is installed
+(`pip install pyfinnotech[bulk]`), and as a pure python loop otherwise.
+"""
+import itertools
+import re
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from pyfinnotech.validation import is_luhn_valid, is_iban_checksum_valid, is_national_id_checksum_valid
+
+CHUNK_SIZE = 1_000_000
+
+_ZERO = ord('0')
+_LUHN_DOUBLED = [0, 2, 4, 6, 8, 1, 3, 5, 7, 9]
+_IBAN_COUNTRY_DIGITS = [1, 8, 2, 7]  # I=18, R=27
+
+
+def _to_matrix(items, width):
+    """
+    Converts the strings to a `(len(items), width + 1)` matrix of character codes, the extra column is non-zero
+    only for the strings longer than `width`.
+    """
+    if isinstance(items, numpy.ndarray) and items.dtype.kind == 'S':
+        array = items.astype(f'S{width + 1}')
+        return array.view(numpy.uint8).reshape(len(array), width + 1)
+
+    array = numpy.asarray(items, dtype=f'U{width + 1}')
+    return array.view(numpy.uint32).reshape(len(array), width + 1)
+
+
+def _has_length(matrix, width):
+    return (matrix[:, width] == 0) & (matrix[:, width - 1] != 0)
+
+
+def _are_digits(matrix):
+    return ((matrix >= _ZERO) & (matrix <= _ZERO + 9)).all(axis=1)
+
+
+def _card_mask(items):
+    matrix = _to_matrix(items, 16)
+    digits = matrix[:, :16].astype(numpy.int64) - _ZERO
+    mask = _has_length(matrix, 16) & _are_digits(matrix[:, :16])
+
+    digits = numpy.where(mask[:, None], digits, 0)
+    doubled = numpy.asarray(_LUHN_DOUBLED, dtype=numpy.int64)[digits[:, 0::2]]
+    return mask & ((doubled.sum(axis=1) + digits[:, 1::2].sum(axis=1)) % 10 == 0)
+
+
+def _iban_mask(items):
+    matrix = _to_matrix(items, 26)
+    mask = _has_length(matrix, 26) & (matrix[:, 0] == ord('I')) & (matrix[:, 1] == ord('R')) & \
+        _are_digits(matrix[:, 2:26])
+
+    digits = numpy.where(mask[:, None], matrix[:, 2:26].astype(numpy.int64) - _ZERO, 0)
+    remainder = numpy.zeros(len(matrix), dtype=numpy.int64)
+    # Rearranged iban: bban + country code digits + check digits
+    for column in itertools.chain(range(2, 24), range(-4, 0), range(0, 2)):
+        digit = _IBAN_COUNTRY_DIGITS[column] if column < 0 else digits[:, column]
+        remainder = (remainder * 10 + digit) % 97
+    return mask & (remainder == 1)
+
+
+def _national_id_mask(items):
+    matrix = _to_matrix(items, 10)
+    mask = _has_length(matrix, 10) & _are_digits(matrix[:, :10])
+
+    digits = numpy.where(mask[:, None], matrix[:, :10].astype(numpy.int64) - _ZERO, 0)
+    remainder = (digits[:, :9] * numpy.arange(10, 1, -1)).sum(axis=1) % 11
+    check_digit = digits[:, 9]
+    return mask & \
+        ~(digits == digits[:, :1]).all(axis=1) & \
+        numpy.where(remainder < 2, check_digit == remainder, check_digit == 11 - remainder)
+
+
+def _python_mask(items, pattern, check):
+    pattern = re.compile(pattern)
+    return [isinstance(i, str) and pattern.fullmatch(i) is not None and check(i) for i in items]
+
+
+def _validate(items, numpy_mask, pattern, check, use_numpy):
+    if use_numpy is None:
+        use_numpy = numpy is not None
+
+    if not use_numpy:
+        return _python_mask(items, pattern, check)
+
+    if isinstance(items, numpy.ndarray):
+        return numpy_mask(items)
+
+    # Any other iterable is converted chunk by chunk, to keep the memory bounded
+    iterator = iter(items)
+    masks = []
+    while True:
+        chunk = list(itertools.islice(iterator, CHUNK_SIZE))
+        if not chunk:
+            break
+        masks.append(numpy_mask(chunk))
+    return numpy.concatenate(masks) if masks else numpy.zeros(0, dtype=bool)
+
+
+def validate_cards(cards, use_numpy=None):
+    """
+    Format and luhn check of 16 digits card numbers
+
+    :param use_numpy: Force (or avoid) the numpy implementation, by default it's used when numpy is installed
+    """
+    return _validate(cards, _card_mask, '^[0-9]{16}$', is_luhn_valid, use_numpy)
+
+
+def validate_ibans(ibans, use_numpy=None):
+    """
+    Format and ISO 13616 mod-97 check of IR ibans
+    """
+    return _validate(ibans, _iban_mask, '^IR[0-9]{24}$', is_iban_checksum_valid, use_numpy)
+
+
+def validate_national_ids(national_ids, use_numpy=None):
+    """
+    Format and check digit of Iranian national ids
+    """
+    return _validate(national_ids, _national_id_mask, '^[0-9]{10}$', is_national_id_checksum_valid, use_numpy)
@@ -0,0 +1,226 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+from pyfinnotech.const import ENDPOINT_FAMILIES
+from pyfinnotech.transport import HttpTransport
+
+
+def endpoint_family(endpoint):
+    """
+    :return: The Finnotech product of `endpoint` (e.g: `oak`, `facility`), by default the first part of its path
+    """
+    family = ENDPOINT_FAMILIES.get(endpoint)
+    if family is None:
+        family = endpoint.lstrip('/').split('/', 1)[0]
+    return family
+
+
+class Bulkhead:
+    """
+    Isolated capacity of an endpoint family: at most `max_concurrent` calls at the same time, the rest wait in a
+    queue of at most `max_queue` calls (`None`: unbounded) and the calls beyond that are rejected. The calls of the
+    sync client use the own connection pool of the bulkhead (`transport`), so one degraded product can't hold up the
+    connections of the others either. The pool keeps up to `max_concurrent` connections.
+
+    :param pool_block: `pool_block` of the `transport`
+    :param keep_alive_timeout: `keep_alive_timeout` of the `transport`
+    """
+
+    def __init__(self, name, max_concurrent=10, max_queue=None, pool_block=False, keep_alive_timeout=None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.transport = HttpTransport(
+            pool_connections=1,
+            pool_maxsize=max_concurrent,
+            pool_block=pool_block,
+            keep_alive_timeout=keep_alive_timeout
+        )
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.wait_time = 0.
+        self.max_wait_time = 0.
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('_lock', '_condition', '_async_waiters'):
+            del state[name]
+        state['in_flight'] = 0
+        state['queued'] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'max_concurrent': self.max_concurrent,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'acquired': self.acquired,
+            'rejected': self.rejected,
+            'mean_wait_time': self.wait_time / self.acquired if self.acquired else 0.,
+            'max_wait_time': self.max_wait_time,
+        }
+
+    def _try_acquire(self, queued_at=None):
+        """
+        Should be called while holding the lock.
+        """
+        if self.in_flight >= self.max_concurrent:
+            return False
+
+        self.in_flight += 1
+        self.acquired += 1
+        if queued_at is not None:
+            wait_time = time.monotonic() - queued_at
+            self.wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+        return True
+
+    def _enqueue(self):
+        """
+        Should be called while holding the lock.
+
+        :return: `False` if the queue is full
+        """
+        if self.max_queue is not None and self.queued >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        return True
+
+    def acquire(self, timeout=None):
+        """
+        Blocks until there is a free slot.
+
+        :return: `True` if acquired, `False` if not acquired in `timeout` seconds, `None` if rejected as the queue is
+            full
+        """
+        with self._condition:
+            if self._try_acquire():
+                return True
+            if not self._enqueue():
+                return None
+
+            queued_at = time.monotonic()
+            try:
+                return self._condition.wait_for(lambda: self._try_acquire(queued_at), timeout)
+            finally:
+                self.queued -= 1
+
+    async def acquire_async(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                return True
+            if not self._enqueue():
+                return None
+
+        queued_at = time.monotonic()
+        try:
+            while True:
+                with self._lock:
+                    if self._try_acquire(queued_at):
+                        return True
+
+                    wait = None if deadline is None else deadline - time.monotonic()
+                    if wait is not None and wait <= 0:
+                        return False
+                    waiter = (loop, loop.create_future())
+                    self._async_waiters.append(waiter)
+
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter[1]), wait)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    with self._lock:
+                        if waiter in self._async_waiters:
+                            self._async_waiters.remove(waiter)
+        finally:
+            with self._lock:
+                self.queued -= 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, deque()
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._wake, future)
+
+    @classmethod
+    def _wake(cls, future):
+        if not future.done():
+            future.set_result(None)
+
+
+class Bulkheads:
+    """
+    A `Bulkhead` per endpoint family (`oak`, `mpg`, `facility`, `credit` and `dev`, see `endpoint_family`), so a
+    backlog of slow calls to one Finnotech product can't starve the calls to the others. It's integrated into
+    `_execute` of the clients by their `bulkheads` parameter: a call waits for a slot of its family (at most until
+    its deadline) and fails fast by `FinnotechBulkheadFullException` when the queue of the family is full.
+
+    The sync client sends the calls through the connection pools of the bulkheads, so its own `pool_maxsize`,
+    `pool_block` and `keep_alive_timeout` stop applying to them: pass `pool_block` and `keep_alive_timeout` here
+    instead. The asyncio client shares one connection pool among the families, set its `pool_maxsize` to at least the
+    sum of the `max_concurrent` of the families.
+
+    :param families: `{family: {parameter: value}}`, overrides `defaults` for the families
+    :param defaults: Parameters of the `Bulkhead`s
+    """
+
+    def __init__(self, families: dict = None, **defaults):
+        self.families = families or {}
+        self.defaults = defaults
+        self._bulkheads = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, endpoint) -> Bulkhead:
+        family = endpoint_family(endpoint)
+        bulkhead = self._bulkheads.get(family)
+        if bulkhead is None:
+            with self._lock:
+                bulkhead = self._bulkheads.get(family)
+                if bulkhead is None:
+                    bulkhead = self._bulkheads[family] = Bulkhead(
+                        family,
+                        **{**self.defaults, **self.families.get(family, {})}
+                    )
+        return bulkhead
+
+    def close(self):
+        for bulkhead in list(self._bulkheads.values()):
+            bulkhead.transport.close()
+
+    @property
+    def stats(self) -> dict:
+        return {family: bulkhead.stats for family, bulkhead in list(self._bulkheads.items())}
@@ -0,0 +1,197 @@
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import ujson
+
+from pyfinnotech.bloom import BloomFilter
+from pyfinnotech.transport import HttpResponse
+
+_negative_cache_bypassed = contextvars.ContextVar('pyfinnotech_negative_cache_bypassed', default=False)
+
+
+class ResponseCache:
+    """
+    Thread-safe cache of the raw `result` payloads of an inquiry api, entries expire after `ttl` seconds and the
+    least recently used ones are evicted when there are more than `max_size` of them.
+    """
+
+    def __init__(self, ttl=3600, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :return: The cached payload, or `None`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, payload):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class NegativeCache:
+    """
+    Remembers the inputs (card numbers, ibans) rejected by finnotech, so resubmitting them fails fast locally by the
+    same `FinnotechHttpException` instead of another billed call.
+
+    The keys are kept in a `BloomFilter`, so tens of millions of them take a few MB. The rejections are probabilistic:
+    a never seen input is rejected as well with the probability of `error_rate`. By `ttl` such a false rejection (and
+    any other) expires: the filter is replaced by a fresh one every `ttl` seconds, while the previous one is still
+    checked, so a rejection is remembered for `ttl` to `2 * ttl` seconds. Wrap a call in `bypass` to send it anyway.
+
+    :param path: The filter (and the previous one, at `{path}.previous`) is loaded from this file if it exists, and
+        saved into it by `save`
+    :param status_codes: The http status codes which mean the input is rejected
+    :param ttl: Seconds, `None` remembers the rejections forever
+    """
+
+    def __init__(self, capacity=10_000_000, error_rate=.001, path=None, status_codes=(400,), ttl=None):
+        self.path = path
+        self.status_codes = status_codes
+        self.ttl = ttl
+        self.hits = 0
+        self.previous_bloom_filter = None
+        if path is not None and os.path.exists(path):
+            self.bloom_filter = BloomFilter.load(path)
+            if os.path.exists(self._previous_path(path)):
+                self.previous_bloom_filter = BloomFilter.load(self._previous_path(path))
+        else:
+            self.bloom_filter = BloomFilter(capacity=capacity, error_rate=error_rate)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _previous_path(cls, path):
+        return f'{path}.previous'
+
+    @classmethod
+    @contextlib.contextmanager
+    def bypass(cls):
+        """
+        The calls made inside are sent even if their inputs have been rejected, e.g. to recheck a falsely rejected one
+        """
+        token = _negative_cache_bypassed.set(True)
+        try:
+            yield
+        finally:
+            _negative_cache_bypassed.reset(token)
+
+    def _rotate(self):
+        if self.ttl is None or time.time() - self.bloom_filter.created_at < self.ttl:
+            return
+
+        with self._lock:
+            age = time.time() - self.bloom_filter.created_at
+            if age < self.ttl:
+                return
+
+            # The previous one is dropped as well when the current one is older than `2 * ttl`, e.g. when it's
+            # loaded after a long pause
+            self.previous_bloom_filter = self.bloom_filter if age < 2 * self.ttl else None
+            self.bloom_filter = BloomFilter(
+                capacity=self.bloom_filter.capacity,
+                error_rate=self.bloom_filter.error_rate
+            )
+
+    @classmethod
+    def _key(cls, endpoint, value):
+        return f'{endpoint}:{value}'
+
+    def is_rejected(self, endpoint, value):
+        if _negative_cache_bypassed.get():
+            return False
+
+        self._rotate()
+        key = self._key(endpoint, value)
+        previous_bloom_filter = self.previous_bloom_filter
+        if key in self.bloom_filter or (previous_bloom_filter is not None and key in previous_bloom_filter):
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, endpoint, value):
+        self._rotate()
+        self.bloom_filter.add(self._key(endpoint, value))
+
+    def rejection_response(self, endpoint, value) -> HttpResponse:
+        return HttpResponse(self.status_codes[0], ujson.dumps({
+            'status': 'FAILED',
+            'error': {
+                'code': 'LOCALLY_REJECTED',
+                'message': f'{value} has already been rejected by {endpoint}',
+            },
+        }).encode())
+
+    def save(self, path=None):
+        path = path or self.path
+        self.bloom_filter.save(path)
+        if self.previous_bloom_filter is not None:
+            self.previous_bloom_filter.save(self._previous_path(path))
+        elif os.path.exists(self._previous_path(path)):
+            os.remove(self._previous_path(path))
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'size': self.bloom_filter.count,
+            'hits': self.hits,
+        }
@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import deque
+
+from pyfinnotech.retry import RETRIABLE_STATUS_CODES
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Stops calling an endpoint while it's failing: the circuit opens when the rate of the failed (an error or a
+    `failure_status_codes` response) or slow (longer than `slow_call_threshold` seconds) calls among the recent
+    `window` calls reaches its threshold. While it's open the calls fail fast, after `open_duration` seconds it's
+    half-open and lets `half_open_calls` probe calls through: it closes if all of them succeed and opens again
+    otherwise.
+
+    :param on_state_change: Called by `(endpoint, old_state, new_state)` on every state change
+    """
+
+    def __init__(self, endpoint, failure_rate_threshold=.5, slow_call_threshold=None, slow_call_rate_threshold=.5,
+                 window=20, min_calls=10, open_duration=30., half_open_calls=3,
+                 failure_status_codes=RETRIABLE_STATUS_CODES, on_state_change=None):
+        self.endpoint = endpoint
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.window = window
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.failure_status_codes = failure_status_codes
+        self.on_state_change = on_state_change
+        self.state = CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._outcomes = deque()
+        self._failures = 0
+        self._slow_calls = 0
+        self._open_until = 0.
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def failure_rate(self):
+        return self._failures / len(self._outcomes) if self._outcomes else 0.
+
+    @property
+    def slow_call_rate(self):
+        return self._slow_calls / len(self._outcomes) if self._outcomes else 0.
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'state': self.state,
+            'calls': len(self._outcomes),
+            'failure_rate': self.failure_rate,
+            'slow_call_rate': self.slow_call_rate,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
+
+    def allow(self):
+        """
+        :return: `False` if the call should fail fast, otherwise the call should be either `record`ed or `cancel`ed
+        """
+        with self._lock:
+            change = None
+            if self.state == OPEN:
+                if time.monotonic() < self._open_until:
+                    self.rejected += 1
+                    return False
+                change = self._transition(HALF_OPEN)
+
+            allowed = True
+            if self.state == HALF_OPEN:
+                if self._probes + self._probe_successes >= self.half_open_calls:
+                    self.rejected += 1
+                    allowed = False
+                else:
+                    self._probes += 1
+
+        self._notify(change)
+        return allowed
+
+    def cancel(self):
+        """
+        Gives back an allowed call which is not made, e.g. when its deadline has passed before sending it.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record(self, latency, status_code=None):
+        """
+        :param latency: Seconds the call took
+        :param status_code: Http status of the response, `None` if the call has failed (e.g: a connection error)
+        """
+        failed = status_code is None or status_code in self.failure_status_codes
+        slow = self.slow_call_threshold is not None and latency > self.slow_call_threshold
+
+        with self._lock:
+            change = None
+            if self.state == HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+                if failed or slow:
+                    change = self._transition(OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        change = self._transition(CLOSED)
+
+            elif self.state == CLOSED:
+                self._outcomes.append((failed, slow))
+                self._failures += failed
+                self._slow_calls += slow
+                if len(self._outcomes) > self.window:
+                    old_failed, old_slow = self._outcomes.popleft()
+                    self._failures -= old_failed
+                    self._slow_calls -= old_slow
+
+                if len(self._outcomes) >= self.min_calls and (
+                        self.failure_rate >= self.failure_rate_threshold or
+                        self.slow_call_rate >= self.slow_call_rate_threshold
+                ):
+                    change = self._transition(OPEN)
+
+        self._notify(change)
+
+    def _transition(self, state):
+        """
+        Should be called while holding the lock.
+        """
+        change = (self.endpoint, self.state, state)
+        self.state = state
+        self._probes = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self.opened += 1
+            self._open_until = time.monotonic() + self.open_duration
+        else:
+            self._outcomes.clear()
+            self._failures = 0
+            self._slow_calls = 0
+        return change
+
+    def _notify(self, change):
+        if change is not None and self.on_state_change is not None:
+            self.on_state_change(*change)
+
+
+class CircuitBreakers:
+    """
+    A `CircuitBreaker` per endpoint, created on the first call to it. It's integrated into `_execute` of the clients
+    by their `circuit_breakers` parameter, the calls to an open circuit raise `FinnotechCircuitOpenException`.
+
+    :param endpoints: `{endpoint: {parameter: value}}`, overrides `defaults` for the `ENDPOINT_*` path templates
+    :param on_state_change: Called by `(endpoint, old_state, new_state)` on every state change of the breakers
+    :param defaults: Parameters of the `CircuitBreaker`s
+    """
+
+    def __init__(self, endpoints: dict = None, on_state_change=None, **defaults):
+        self.endpoints = endpoints or {}
+        self.on_state_change = on_state_change
+        self.defaults = defaults
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, endpoint) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(endpoint)
+                if breaker is None:
+                    breaker = self._breakers[endpoint] = CircuitBreaker(
+                        endpoint,
+                        on_state_change=self.on_state_change,
+                        **{**self.defaults, **self.endpoints.get(endpoint, {})}
+                    )
+        return breaker
+
+    @property
+    def stats(self) -> dict:
+        return {endpoint: breaker.stats for endpoint, breaker in list(self._breakers.items())}
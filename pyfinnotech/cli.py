@@ -0,0 +1,298 @@
+"""
+Command line bulk tool, streams the inputs of a csv, json-lines or plain text file through an inquiry api:
+
+    python -m pyfinnotech card-to-iban cards.csv --column card --output ibans.jsonl --concurrency 16
+
+The client id and secret are taken from `--client-id` and `--client-secret`, or the `FINNOTECH_CLIENT_ID` and
+`FINNOTECH_CLIENT_SECRET` environment variables.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import Counter, deque
+
+import ujson
+
+from pyfinnotech.api import FinnotechApiClient
+from pyfinnotech.batch import map_concurrently
+from pyfinnotech.cache import ResponseCache, NegativeCache
+from pyfinnotech.const import URL_SANDBOX, URL_MAINNET
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.jobs import BulkJob, FileCheckpoint, SqliteCheckpoint
+from pyfinnotech.rate_limit import RateLimiter, RateLimit
+from pyfinnotech.responses import BaseFinnotechResponse
+from pyfinnotech.scheduler import as_bulk
+
+# Subcommand: (client method, default input column)
+COMMANDS = {
+    'iban-inquiry': ('iban_inquiry', 'iban'),
+    'card-inquiry': ('card_inquiry', 'card'),
+    'card-to-iban': ('card_to_iban', 'card'),
+}
+
+FORMATS = ('csv', 'jsonl', 'txt')
+
+
+def detect_format(path, given):
+    if given is not None:
+        return given
+
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    if extension in ('json', 'ndjson'):
+        return 'jsonl'
+    return extension if extension in FORMATS else 'txt'
+
+
+def read_inputs(f, input_format, column):
+    """
+    Yields the input values one by one, without reading the whole file.
+    """
+    if input_format == 'csv':
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        if column in header:
+            index = header.index(column)
+        elif len(header) == 1:
+            # No header, just one value per line
+            index = 0
+            yield header[0].strip()
+        else:
+            raise ValueError(f'There is no {column} column in: {",".join(header)}')
+
+        for row in reader:
+            if len(row) > index and row[index].strip():
+                yield row[index].strip()
+
+    else:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            if input_format == 'jsonl':
+                value = ujson.loads(line)
+                yield value[column] if isinstance(value, dict) else str(value)
+            else:
+                yield line
+
+
+def error_record(error) -> dict:
+    record = {'type': error.__class__.__name__, 'message': getattr(error, 'message', str(error))}
+    if isinstance(error, FinnotechHttpException):
+        record['status'] = error.status_code
+    return record
+
+
+class JsonLinesWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, result):
+        record = {'input': result.input}
+        if result.is_ok:
+            payload = result.result
+            record['result'] = payload.payload if isinstance(payload, BaseFinnotechResponse) else payload
+        else:
+            record['error'] = error_record(result.error)
+        self.f.write(ujson.dumps(record, ensure_ascii=False) + '\n')
+
+
+class CsvWriter:
+    columns = ['input', 'status', 'error', 'result']
+
+    def __init__(self, f, write_header=True):
+        self.writer = csv.writer(f)
+        if write_header:
+            self.writer.writerow(self.columns)
+
+    def write(self, result):
+        if result.is_ok:
+            payload = result.result
+            payload = payload.payload if isinstance(payload, BaseFinnotechResponse) else payload
+            self.writer.writerow([result.input, 'ok', '', ujson.dumps(payload, ensure_ascii=False)])
+        else:
+            error = error_record(result.error)
+            self.writer.writerow([result.input, error.get('status', error['type']), error['message'], ''])
+
+
+class Progress:
+    """
+    Counts the finished inputs and the errors, keeps the latencies of the recent calls and periodically prints a
+    one-line summary of them.
+    """
+
+    def __init__(self, stream=None, interval=1., window=10000):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.done = 0
+        self.skipped = 0
+        self.errors = Counter()
+        self.latencies = deque(maxlen=window)
+        self.started_at = time.monotonic()
+        self._printed_at = self.started_at
+
+    def record_latency(self, seconds):
+        # Called by the worker threads, `deque.append` is thread-safe
+        self.latencies.append(seconds)
+
+    def add(self, result):
+        self.done += 1
+        if not result.is_ok:
+            error = result.error
+            key = error.status_code if isinstance(error, FinnotechHttpException) else error.__class__.__name__
+            self.errors[key] += 1
+
+    @classmethod
+    def percentile(cls, latencies, percent):
+        if not latencies:
+            return 0.
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))]
+
+    def line(self):
+        elapsed = time.monotonic() - self.started_at
+        latencies = sorted(self.latencies)
+        errors = ' '.join(f'{k}={v}' for k, v in sorted(self.errors.items(), key=lambda item: str(item[0]))) or '0'
+        return f'{self.done} done, {self.skipped} skipped | {self.done / max(elapsed, 1e-9):.1f}/s | ' \
+               f'p50 {self.percentile(latencies, 50) * 1000:.0f}ms ' \
+               f'p90 {self.percentile(latencies, 90) * 1000:.0f}ms ' \
+               f'p99 {self.percentile(latencies, 99) * 1000:.0f}ms | errors: {errors}'
+
+    def tick(self):
+        """
+        :return: `True` if the line is printed
+        """
+        now = time.monotonic()
+        if now - self._printed_at < self.interval:
+            return False
+        self.print()
+        return True
+
+    def print(self, final=False):
+        self._printed_at = time.monotonic()
+        self.stream.write(f'\r{self.line()}' + ('\n' if final else ''))
+        self.stream.flush()
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog='python -m pyfinnotech', description='Finnotech bulk inquiries')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, (method, column) in COMMANDS.items():
+        subparser = subparsers.add_parser(command, help=f'Runs {method} for each input')
+        subparser.add_argument('input', nargs='?', default='-', help='Input file, `-` for stdin')
+        subparser.add_argument('--input-format', choices=FORMATS, help='Default: by the file extension')
+        subparser.add_argument('--column', default=column, help='Input column (csv) or key (jsonl)')
+        subparser.add_argument('-o', '--output', default='-', help='Output file, `-` for stdout')
+        subparser.add_argument('--output-format', choices=('csv', 'jsonl'), help='Default: by the file extension')
+
+        subparser.add_argument('--client-id', default=os.environ.get('FINNOTECH_CLIENT_ID'))
+        subparser.add_argument('--client-secret', default=os.environ.get('FINNOTECH_CLIENT_SECRET'))
+        subparser.add_argument('--client-national-id', default=os.environ.get('FINNOTECH_CLIENT_NATIONAL_ID'))
+        server = subparser.add_mutually_exclusive_group()
+        server.add_argument('--sandbox', dest='base_url', action='store_const', const=URL_SANDBOX)
+        server.add_argument('--mainnet', dest='base_url', action='store_const', const=URL_MAINNET)
+        server.add_argument('--base-url', dest='base_url')
+
+        subparser.add_argument('-c', '--concurrency', type=int, default=8, help='Number of the concurrent calls')
+        subparser.add_argument('--rate-limit', type=float, help='Maximum calls per second')
+        subparser.add_argument('--cache-ttl', type=float, default=3600,
+                               help='Seconds to reuse the result of a repeated input, 0 to disable')
+        subparser.add_argument('--cache-file', help='Bloom filter file of the rejected inputs, kept between runs')
+        subparser.add_argument('--checkpoint', help='Checkpoint file (.sqlite or .jsonl) of the finished inputs')
+        subparser.add_argument('--resume', action='store_true',
+                               help='Skip the inputs finished in the checkpoint and append to the output')
+        subparser.add_argument('--progress-interval', type=float, default=1.)
+        subparser.add_argument('-q', '--quiet', action='store_true', help='No progress line')
+    return parser
+
+
+def open_checkpoint(path):
+    if os.path.splitext(path)[1].lower() in ('.sqlite', '.sqlite3', '.db'):
+        return SqliteCheckpoint(path)
+    return FileCheckpoint(path)
+
+
+def main(argv=None):
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    method, _ = COMMANDS[args.command]
+
+    if args.client_id is None:
+        parser.error('--client-id (or FINNOTECH_CLIENT_ID) is required')
+    if args.checkpoint is not None and os.path.exists(args.checkpoint) and not args.resume:
+        parser.error(f'{args.checkpoint} exists, pass --resume to continue it')
+
+    api_client = FinnotechApiClient(
+        client_id=args.client_id,
+        client_secret=args.client_secret,
+        client_national_id=args.client_national_id,
+        base_url=args.base_url,
+        pool_maxsize=args.concurrency,
+        response_caches={method: ResponseCache(ttl=args.cache_ttl)} if args.cache_ttl > 0 else None,
+        negative_cache=NegativeCache(path=args.cache_file) if args.cache_file is not None else None,
+        rate_limiter=RateLimiter(default=RateLimit(args.rate_limit)) if args.rate_limit else None,
+    )
+    progress = Progress(interval=args.progress_interval)
+    call = getattr(api_client, method)
+
+    def timed_call(input_):
+        started_at = time.perf_counter()
+        try:
+            return call(input_)
+        finally:
+            progress.record_latency(time.perf_counter() - started_at)
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    appending = args.resume and args.output != '-' and os.path.exists(args.output)
+    output_file = sys.stdout if args.output == '-' else open(
+        args.output, 'a' if appending else 'w', newline='', encoding='utf-8'
+    )
+    output_format = args.output_format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+    writer = CsvWriter(output_file, write_header=not appending) if output_format == 'csv' \
+        else JsonLinesWriter(output_file)
+
+    checkpoint = open_checkpoint(args.checkpoint) if args.checkpoint is not None else None
+    inputs = read_inputs(input_file, detect_format(args.input, args.input_format), args.column)
+    job = None
+    if checkpoint is not None:
+        job = BulkJob(api_client, timed_call, checkpoint, max_workers=args.concurrency)
+        results = job.run(inputs)
+    else:
+        results = map_concurrently(as_bulk(timed_call), inputs, max_workers=args.concurrency, ordered=False)
+
+    exit_code = 0
+    try:
+        for result in results:
+            writer.write(result)
+            progress.add(result)
+            if job is not None:
+                progress.skipped = job.skipped
+            if not args.quiet and progress.tick():
+                output_file.flush()
+
+    except KeyboardInterrupt:
+        exit_code = 130
+
+    except ValueError as e:
+        # Bad input file
+        parser.error(str(e))
+
+    finally:
+        results.close()
+        if job is not None:
+            progress.skipped = job.skipped
+        output_file.flush()
+        if checkpoint is not None:
+            checkpoint.close()
+        api_client.close()
+        for f in (input_file, output_file):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+
+    if not args.quiet:
+        progress.print(final=True)
+    return exit_code
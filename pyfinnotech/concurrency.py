@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Status codes by which the server says it's overloaded
+OVERLOAD_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value):
+    """
+    :param value: `Retry-After` header, either seconds or an http date
+    :return: Seconds, or `None`
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.)
+    except ValueError:
+        pass
+
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit of the concurrent api calls: while the latency stays within `latency_tolerance` times the baseline
+    (the minimum latency of the recent `window` calls), the limit grows by one per `limit` calls. It's multiplied by
+    `backoff_ratio` when the latency exceeds that and by `overload_backoff_ratio` on 429/503 responses and errors.
+    The new calls are held back for `Retry-After` seconds if the server says so.
+
+    It's integrated into `_execute` of the clients by their `concurrency_limiter` parameter, give the batch methods
+    at least `max_limit` workers so they don't cap it.
+    """
+
+    def __init__(self, initial_limit=8, min_limit=1, max_limit=200, latency_tolerance=2., backoff_ratio=.9,
+                 overload_backoff_ratio=.5, window=100):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.overload_backoff_ratio = overload_backoff_ratio
+        self.window = window
+        self.in_flight = 0
+        self.baseline_latency = None
+        self._limit = float(initial_limit)
+        self._window_min_latency = None
+        self._window_count = 0
+        self._paused_until = 0.
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('_lock', '_condition', '_async_waiters'):
+            del state[name]
+        state['in_flight'] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'baseline_latency': self.baseline_latency,
+        }
+
+    def _try_acquire(self):
+        """
+        Should be called while holding the lock.
+
+        :return: `0` if acquired, otherwise seconds to wait (`None`: until a release)
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        if self.in_flight < self.limit:
+            self.in_flight += 1
+            return 0
+        return None
+
+    def acquire(self, timeout=None):
+        """
+        Blocks until the number of the in-flight calls is below the limit.
+
+        :return: `False` if not acquired in `timeout` seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return True
+
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._condition.wait(wait)
+
+    async def acquire_async(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return True
+                waiter = (loop, loop.create_future())
+                self._async_waiters.append(waiter)
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = remaining if wait is None else min(wait, remaining)
+
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter[1]), wait)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._lock:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+    def release(self, latency, status_code=None, retry_after=None):
+        """
+        Releases an acquired call and adapts the limit to its outcome.
+
+        :param latency: Seconds the call took
+        :param status_code: Http status of the response, `None` if the call has failed (e.g: a connection error)
+        :param retry_after: Seconds the server has asked to wait
+        """
+        with self._condition:
+            self.in_flight -= 1
+
+            if status_code is None or status_code in OVERLOAD_STATUS_CODES:
+                self._limit = max(self.min_limit, self._limit * self.overload_backoff_ratio)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+            else:
+                self._observe_latency(latency)
+                if latency > self.baseline_latency * self.latency_tolerance:
+                    self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                elif self.in_flight + 1 >= self.limit / 2:
+                    # Only when the limit is actually used, otherwise it would grow unbounded
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+            self._wake_waiters()
+
+    def cancel(self):
+        """
+        Releases an acquired call which is abandoned before its outcome is known (e.g. the loser of a hedged call),
+        without adapting the limit.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._wake_waiters()
+
+    def _wake_waiters(self):
+        """
+        Should be called while holding the lock.
+        """
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, deque()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._wake, future)
+
+    @classmethod
+    def _wake(cls, future):
+        if not future.done():
+            future.set_result(None)
+
+    def _observe_latency(self, latency):
+        if self._window_min_latency is None or latency < self._window_min_latency:
+            self._window_min_latency = latency
+        self._window_count += 1
+
+        if self.baseline_latency is None or self._window_min_latency < self.baseline_latency:
+            self.baseline_latency = self._window_min_latency
+
+        if self._window_count >= self.window:
+            # Follows the baseline up as well, e.g. when the server becomes slower for good
+            self.baseline_latency = self._window_min_latency
+            self._window_min_latency = None
+            self._window_count = 0
@@ -1,11 +1,43 @@
 URL_SANDBOX = 'https://sandboxapi.finnotech.ir'
 URL_MAINNET = 'https://apibeta.finnotech.ir'
 
+BANK_MARKAZI = '010'
+BANK_SANATVAMADAN = '011'
+BANK_MELLAT = '012'
+BANK_REFAH = '013'
+BANK_MASKAN = '014'
+BANK_SEPAH = '015'
+BANK_KESHAVARZI = '016'
+BANK_MELLI = '017'
+BANK_TEJARAT = '018'
+BANK_SADERAT = '019'
+BANK_TOSEESADERAT = '020'
+BANK_POST = '021'
+BANK_TOSEETAAVON = '022'
+BANK_TOSEE = '051'
+BANK_GHAVAMIN = '052'
+BANK_KARAFARIN = '053'
+BANK_PARSIAN = '054'
+BANK_EGHTESADENOVIN = '055'
+BANK_SAMAN = '056'
+BANK_PASARGAD = '057'
+BANK_SARMAYEH = '058'
+BANK_SINA = '059'
+BANK_MEHRIRAN = '060'
+BANK_SHAHR = '061'
 BANK_AYANDEH = '062'
+BANK_ANSAR = '063'
+BANK_GARDESHGARI = '064'
+BANK_HEKMATIRANIAN = '065'
 BANK_DEY = '066'
 BANK_IRANZAMIN = '069'
-BANK_EGHTESADENOVIN = '055'
-BANK_ANSAR = '063'
+BANK_RESALAT = '070'
+BANK_KOSAR = '073'
+BANK_MELAL = '075'
+BANK_KHAVARMIANEH = '078'
+BANK_MEHREGHTESAD = '079'
+BANK_NOOR = '080'
+BANK_IRANVENEZUELA = '095'
 
 GENDER_MALE = 'مرد'
 GENDER_FEMALE = 'زن'
@@ -84,3 +116,48 @@ ALL_SCOPE_AUTHORIZATION_TOKEN = [
     SCOPE_KILID_REQUEST_DELETE,
     SCOPE_KILID_REQUEST_UPDATE,
 ]
+
+SCOPE_CREDIT_CC_STANDARD_RELIABILITY_GET = 'credit:cc-standard-reliability:get'
+
+# Path templates of the endpoints, the keys of the per endpoint policies (e.g: rate limits)
+ENDPOINT_IBAN_INQUIRY = '/oak/v2/clients/{clientId}/ibanInquiry'
+ENDPOINT_CARDS = '/mpg/v2/clients/{clientId}/cards/{card}'
+ENDPOINT_CARD_TO_IBAN = '/facility/v2/clients/{clientId}/cardToIban'
+ENDPOINT_NID_VERIFICATION = '/facility/v2/clients/{clientId}/users/{nationalId}/sms/nidVerification'
+ENDPOINT_STANDARD_RELIABILITY = '/oak/v2/clients/{clientId}/users/{nationalId}/standardReliability'
+ENDPOINT_OAUTH2_TOKEN = '/dev/v2/oauth2/token'
+ENDPOINT_OAUTH2_AUTHORIZE = '/dev/v2/oauth2/authorize'
+ENDPOINT_OAUTH2_VERIFY_SMS = '/dev/v2/oauth2/verify/sms'
+
+ENDPOINT_SCOPES = {
+    ENDPOINT_IBAN_INQUIRY: SCOPE_OAK_IBAN_INQUIRY_GET,
+    ENDPOINT_CARDS: SCOPE_CARD_INFORMATION_GET,
+    ENDPOINT_CARD_TO_IBAN: SCOPE_FACILITY_CARD_TO_IBAN_GET,
+    ENDPOINT_NID_VERIFICATION: SCOPE_FACILITY_SMS_NID_VERIFICATION_GET,
+    ENDPOINT_STANDARD_RELIABILITY: SCOPE_CREDIT_CC_STANDARD_RELIABILITY_GET,
+}
+
+# Finnotech products of the endpoints, the credit inquiries are served under the oak path
+ENDPOINT_FAMILIES = {
+    ENDPOINT_IBAN_INQUIRY: 'oak',
+    ENDPOINT_CARDS: 'mpg',
+    ENDPOINT_CARD_TO_IBAN: 'facility',
+    ENDPOINT_NID_VERIFICATION: 'facility',
+    ENDPOINT_STANDARD_RELIABILITY: 'credit',
+    ENDPOINT_OAUTH2_TOKEN: 'dev',
+    ENDPOINT_OAUTH2_AUTHORIZE: 'dev',
+    ENDPOINT_OAUTH2_VERIFY_SMS: 'dev',
+}
+
+# (connect, read) timeouts in seconds, the read timeout is longer for the apis relayed to the banks
+DEFAULT_TIMEOUT = (3.05, 30)
+ENDPOINT_TIMEOUTS = {
+    ENDPOINT_IBAN_INQUIRY: (3.05, 10),
+    ENDPOINT_CARDS: (3.05, 10),
+    ENDPOINT_CARD_TO_IBAN: (3.05, 20),
+    ENDPOINT_NID_VERIFICATION: (3.05, 20),
+    ENDPOINT_STANDARD_RELIABILITY: (3.05, 30),
+    ENDPOINT_OAUTH2_TOKEN: (3.05, 10),
+    ENDPOINT_OAUTH2_AUTHORIZE: (3.05, 10),
+    ENDPOINT_OAUTH2_VERIFY_SMS: (3.05, 10),
+}
@@ -0,0 +1,55 @@
+"""
+Deadlines of the api calls: the remaining time of the current call is kept in a context variable (so it's per thread
+and per asyncio task) and bounds everything done for it, e.g. fetching or refreshing the token, waiting for a rate
+limit and the retries, so one call can't take longer than its timeout in total.
+"""
+import contextlib
+import contextvars
+import time
+
+_deadline = contextvars.ContextVar('pyfinnotech_deadline', default=None)
+
+
+@contextlib.contextmanager
+def deadline(timeout):
+    """
+    Bounds the api calls made inside to `timeout` seconds in total. A nested deadline can only make it shorter.
+
+    :param timeout: Seconds, `None` keeps the current deadline (if any)
+    """
+    if timeout is None:
+        yield
+        return
+
+    at = time.monotonic() + timeout
+    current = _deadline.get()
+    if current is not None:
+        at = min(at, current)
+
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """
+    :return: Seconds left to the current deadline (never negative), `None` if there is no deadline
+    """
+    at = _deadline.get()
+    if at is None:
+        return None
+    return max(at - time.monotonic(), 0.)
+
+
+def bounded(timeout):
+    """
+    :param timeout: `(connect, read)` timeouts
+    :return: `timeout` capped by the time left to the current deadline
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    connect, read = timeout
+    return min(connect, left), min(read, left)
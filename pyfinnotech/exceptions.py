@@ -1,3 +1,9 @@
+def _restore(cls, state):
+    exception = cls.__new__(cls, state.get('message'))
+    exception.__dict__.update(state)
+    return exception
+
+
 class FinnotechException(Exception):
     def __init__(self, message, logger):
         """
@@ -6,6 +12,10 @@ class FinnotechException(Exception):
         self.message = message
         logger.error(f"Finnotech api error: {message}")
 
+    def __reduce__(self):
+        # Rebuilt without logging it again, e.g. when it's returned by a worker process
+        return _restore, (self.__class__, self.__dict__)
+
 
 class FinnotechHttpException(Exception):
     def __init__(self, response, logger, underlying_exception: Exception = None):
@@ -30,3 +40,32 @@ class FinnotechHttpException(Exception):
                 'data': self.data
             }
         )
+
+    def __reduce__(self):
+        return _restore, (self.__class__, self.__dict__)
+
+
+class FinnotechTimeoutException(FinnotechException):
+    """
+    The deadline of the call (see `pyfinnotech.deadline`) has passed before it's done
+    """
+
+
+class FinnotechCircuitOpenException(FinnotechException):
+    """
+    The call has failed fast, because the circuit breaker of its endpoint is open
+    """
+
+    def __init__(self, endpoint, logger):
+        self.endpoint = endpoint
+        super().__init__(f'Circuit breaker of {endpoint} is open', logger)
+
+
+class FinnotechBulkheadFullException(FinnotechException):
+    """
+    The call is rejected, because the queue of the bulkhead of its endpoint family is full
+    """
+
+    def __init__(self, family, logger):
+        self.family = family
+        super().__init__(f'Bulkhead of {family} is full', logger)
@@ -0,0 +1,129 @@
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from pyfinnotech.const import ENDPOINT_IBAN_INQUIRY, ENDPOINT_CARDS, ENDPOINT_CARD_TO_IBAN
+from pyfinnotech.retry import RetryBudget
+
+# The idempotent inquiries, which are safe to send twice
+HEDGED_ENDPOINTS = (ENDPOINT_IBAN_INQUIRY, ENDPOINT_CARDS, ENDPOINT_CARD_TO_IBAN)
+
+_abandoned = contextvars.ContextVar('pyfinnotech_abandoned', default=None)
+
+
+def attempt_context():
+    """
+    :return: A copy of the current context to run a hedged attempt in, and the event to set when it's abandoned
+    """
+    abandoned = threading.Event()
+    context = contextvars.copy_context()
+    context.run(_abandoned.set, abandoned)
+    return context, abandoned
+
+
+def is_abandoned():
+    """
+    :return: `True` if the current attempt is the abandoned loser of a hedged call of the sync client
+    """
+    abandoned = _abandoned.get()
+    return abandoned is not None and abandoned.is_set()
+
+
+class HedgingPolicy:
+    """
+    Hedged requests: when the first attempt of a call to one of `endpoints` hasn't answered within the `percentile`
+    of the recent `window` latencies of its endpoint, a second attempt is sent with the same `trackId`. The first
+    response wins and the other attempt is cancelled (the sync client just abandons it, as `requests` can't cancel a
+    sent request, and its outcome is recorded as cancelled).
+
+    There is no hedging until `min_samples` latencies of the endpoint are known, and a `RetryBudget` caps the hedges
+    to a ratio of the attempts, so they can't multiply the load when the server is slow for all the calls.
+
+    It's integrated into `_execute` of the clients by their `hedging_policy` parameter. The sync client runs the
+    hedged attempts on a thread pool of `max_workers` threads, give it at least twice the concurrent calls.
+    """
+
+    def __init__(self, endpoints=HEDGED_ENDPOINTS, percentile=.95, window=200, min_samples=20, min_delay=.01,
+                 budget: RetryBudget = None, max_workers=32):
+        self.endpoints = endpoints
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.budget = budget or RetryBudget(ratio=.05)
+        self.max_workers = max_workers
+        self.hedge_wins = 0
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_executor'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='pyfinnotech-hedge'
+                )
+            return self._executor
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'hedged': self.budget.withdrawn,
+            'hedge_wins': self.hedge_wins,
+            'budget_tokens': self.budget.tokens,
+            'budget_exhausted': self.budget.exhausted,
+        }
+
+    def is_hedged(self, endpoint):
+        return endpoint in self.endpoints
+
+    def observe(self, endpoint, latency):
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+            latencies.append(latency)
+
+    def delay(self, endpoint):
+        """
+        Should be called once per attempt, it earns the budget of the hedges.
+
+        :return: Seconds to wait for the first attempt before hedging it, `None` while the latency is not known yet
+        """
+        self.budget.deposit()
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            latencies = sorted(latencies)
+
+        return max(self.min_delay, latencies[min(int(len(latencies) * self.percentile), len(latencies) - 1)])
+
+    def try_hedge(self):
+        """
+        :return: `False` if there is no budget left for another hedge
+        """
+        return self.budget.withdraw()
+
+    def record_win(self):
+        with self._lock:
+            self.hedge_wins += 1
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+TEHRAN_TIMEZONE = timezone(timedelta(hours=3, minutes=30), 'Asia/Tehran')
+
+_GREGORIAN_MONTH_STARTS = [0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334]
+
+
+def _is_gregorian_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def jalali_to_gregorian(year, month, day):
+    year += 1595
+    days = -355668 + (365 * year) + ((year // 33) * 8) + (((year % 33) + 3) // 4) + day
+    days += (month - 1) * 31 if month < 7 else ((month - 7) * 30) + 186
+
+    gregorian_year = 400 * (days // 146097)
+    days %= 146097
+    if days > 36524:
+        days -= 1
+        gregorian_year += 100 * (days // 36524)
+        days %= 36524
+        if days >= 365:
+            days += 1
+
+    gregorian_year += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        gregorian_year += (days - 1) // 365
+        days = (days - 1) % 365
+
+    gregorian_day = days + 1
+    month_lengths = [31, 29 if _is_gregorian_leap(gregorian_year) else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    gregorian_month = 1
+    for month_length in month_lengths:
+        if gregorian_day <= month_length:
+            break
+        gregorian_day -= month_length
+        gregorian_month += 1
+
+    return gregorian_year, gregorian_month, gregorian_day
+
+
+def gregorian_to_jalali(year, month, day):
+    year2 = year + 1 if month > 2 else year
+    days = 355666 + (365 * year) + ((year2 + 3) // 4) - ((year2 + 99) // 100) + ((year2 + 399) // 400) + day + \
+        _GREGORIAN_MONTH_STARTS[month - 1]
+
+    jalali_year = -1595 + (33 * (days // 12053))
+    days %= 12053
+    jalali_year += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        jalali_year += (days - 1) // 365
+        days = (days - 1) % 365
+
+    if days < 186:
+        return jalali_year, 1 + days // 31, 1 + days % 31
+    return jalali_year, 7 + (days - 186) // 30, 1 + (days - 186) % 30
+
+
+def parse_jalali_timestamp(timestamp) -> datetime:
+    """
+    Parses finnotech's compact jalali timestamps (Tehran local time), e.g: `13970730111355`
+
+    :return: Timezone aware datetime
+    """
+    timestamp = str(timestamp)
+    if len(timestamp) != 14 or not timestamp.isdigit():
+        raise ValueError(f'Bad jalali timestamp: {timestamp}')
+
+    year, month, day = jalali_to_gregorian(int(timestamp[0:4]), int(timestamp[4:6]), int(timestamp[6:8]))
+    return datetime(
+        year, month, day,
+        int(timestamp[8:10]), int(timestamp[10:12]), int(timestamp[12:14]),
+        tzinfo=TEHRAN_TIMEZONE
+    )
+
+
+def format_jalali_timestamp(moment: datetime) -> str:
+    moment = moment.astimezone(TEHRAN_TIMEZONE)
+    year, month, day = gregorian_to_jalali(moment.year, moment.month, moment.day)
+    return f'{year:04d}{month:02d}{day:02d}{moment.hour:02d}{moment.minute:02d}{moment.second:02d}'
@@ -0,0 +1,249 @@
+"""
+Resumable bulk jobs: the outcome of every finished input is appended to a checkpoint, so a restarted job skips them
+and only pays for the rest.
+"""
+import os
+import sqlite3
+import time
+
+import ujson
+
+from pyfinnotech.batch import map_concurrently
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.process_pool import map_processes
+from pyfinnotech.responses import BaseFinnotechResponse
+from pyfinnotech.scheduler import as_bulk
+
+
+class Checkpoint:
+    """
+    Append-only record of the finished inputs of a bulk job and their raw `result` payloads (or errors).
+
+    The records are written through, but synced to the disk only every `sync_every` records or `sync_interval`
+    seconds, so a crash may lose (and so repeat) at most that many of the last calls.
+    """
+
+    def __init__(self, sync_every=1000, sync_interval=1.):
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def is_done(self, input_) -> bool:
+        raise NotImplementedError()
+
+    def records(self):
+        """
+        :return: Iterator of `(input, result, error)` of all the finished inputs
+        """
+        raise NotImplementedError()
+
+    def add(self, input_, result=None, error=None):
+        self._write(input_, result, error)
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every or time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        self._sync()
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def close(self):
+        raise NotImplementedError()
+
+    def _write(self, input_, result, error):
+        raise NotImplementedError()
+
+    def _sync(self):
+        raise NotImplementedError()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class FileCheckpoint(Checkpoint):
+    """
+    Keeps the records in a json-lines file, the finished inputs are loaded into the memory on open. A partially
+    written last line (of a crashed run) is truncated.
+    """
+
+    def __init__(self, path, sync_every=1000, sync_interval=1.):
+        super().__init__(sync_every=sync_every, sync_interval=sync_interval)
+        self.path = path
+        self._done = set()
+
+        valid_size = 0
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        self._done.add(ujson.loads(line)['input'])
+                    except ValueError:
+                        break
+                    valid_size += len(line)
+
+        self._file = open(path, 'ab')
+        self._file.truncate(valid_size)
+
+    def is_done(self, input_):
+        return input_ in self._done
+
+    def records(self):
+        self._file.flush()
+        with open(self.path, 'rb') as f:
+            for line in f:
+                record = ujson.loads(line)
+                yield record['input'], record.get('result'), record.get('error')
+
+    def _write(self, input_, result, error):
+        record = {'input': input_, 'result': result} if error is None else {'input': input_, 'error': error}
+        self._file.write(ujson.dumps(record, ensure_ascii=False).encode() + b'\n')
+        self._done.add(input_)
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+class SqliteCheckpoint(Checkpoint):
+    """
+    Keeps the records in a sqlite table, the finished inputs are looked up instead of being loaded into the memory.
+    The records are inserted by one transaction per sync.
+    """
+
+    def __init__(self, path, table='checkpoint', sync_every=1000, sync_interval=1.):
+        super().__init__(sync_every=sync_every, sync_interval=sync_interval)
+        self.path = path
+        self.table = table
+        self._pending = {}
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} (input TEXT PRIMARY KEY, result TEXT, error TEXT)'
+        )
+
+    def is_done(self, input_):
+        return input_ in self._pending or self._connection.execute(
+            f'SELECT 1 FROM {self.table} WHERE input = ?', (input_,)
+        ).fetchone() is not None
+
+    def records(self):
+        self.sync()
+        for input_, result, error in self._connection.execute(f'SELECT input, result, error FROM {self.table}'):
+            yield (
+                input_,
+                None if result is None else ujson.loads(result),
+                None if error is None else ujson.loads(error)
+            )
+
+    def _write(self, input_, result, error):
+        self._pending[input_] = (
+            input_,
+            None if error is not None else ujson.dumps(result, ensure_ascii=False),
+            None if error is None else ujson.dumps(error, ensure_ascii=False)
+        )
+
+    def _sync(self):
+        if not self._pending:
+            return
+
+        self._connection.execute('BEGIN')
+        try:
+            self._connection.executemany(
+                f'INSERT OR REPLACE INTO {self.table} (input, result, error) VALUES (?, ?, ?)',
+                self._pending.values()
+            )
+            self._connection.execute('COMMIT')
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._pending.clear()
+
+    def close(self):
+        if self._connection is not None:
+            self.sync()
+            self._connection.close()
+            self._connection = None
+
+
+class BulkJob:
+    """
+    Runs an inquiry method of `api_client` (e.g: `'iban_inquiry'`) for many inputs, recording each finished one in
+    `checkpoint`. Running it again with the same checkpoint skips the already finished inputs.
+
+    Successful results, invalid inputs (`ValueError`) and the inputs rejected by the server (`rejected_status_codes`)
+    are finished, the other errors (network errors, 5xx, and the transient 4xx like 401, 403, 408 and 429) are not
+    recorded, so they're retried by the next run.
+
+    :param method: Name of the client's method, or a function of an input when it runs on threads
+    :param max_workers: Number of the threads
+    :param processes: Run on this many worker processes (by `map_processes`) instead of threads
+    :param rejected_status_codes: The http status codes which mean the input itself is rejected
+    """
+
+    def __init__(self, api_client, method, checkpoint: Checkpoint, max_workers=8, processes=None,
+                 rejected_status_codes=(400, 404, 422)):
+        self.api_client = api_client
+        self.method = method
+        self.checkpoint = checkpoint
+        self.max_workers = max_workers
+        self.processes = processes
+        self.rejected_status_codes = rejected_status_codes
+        self.skipped = 0
+
+    def _pending(self, inputs):
+        for input_ in inputs:
+            if self.checkpoint.is_done(input_):
+                self.skipped += 1
+            else:
+                yield input_
+
+    def _error_record(self, error):
+        if isinstance(error, ValueError):
+            return {'message': str(error)}
+
+        if isinstance(error, FinnotechHttpException) and error.status_code in self.rejected_status_codes:
+            return {'status': error.status_code, 'message': error.message}
+
+        return None
+
+    def run(self, inputs):
+        """
+        :return: A generator of `BatchResult` of the not-yet-finished inputs, as they complete
+        """
+        pending = self._pending(inputs)
+        if self.processes is not None:
+            results = map_processes(self.api_client, self.method, pending, processes=self.processes, ordered=False)
+        else:
+            method = self.method if callable(self.method) else getattr(self.api_client, self.method)
+            results = map_concurrently(as_bulk(method), pending, max_workers=self.max_workers, ordered=False)
+
+        try:
+            for result in results:
+                if result.is_ok:
+                    payload = result.result
+                    if isinstance(payload, BaseFinnotechResponse):
+                        payload = payload.payload
+                    self.checkpoint.add(result.input, result=payload)
+
+                else:
+                    error = self._error_record(result.error)
+                    if error is not None:
+                        self.checkpoint.add(result.input, error=error)
+
+                yield result
+
+        finally:
+            results.close()
+            self.checkpoint.sync()
@@ -0,0 +1,225 @@
+"""
+Metrics of the api calls: request counts by endpoint and status code, error classes, retries, cache hits, token
+refreshes and the latency of the requests, kept in memory and exported as a snapshot or in the Prometheus text
+format, e.g. to serve them from the metrics endpoint of the application.
+"""
+import threading
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the latency buckets, the bank switches behind some endpoints take seconds to answer
+DEFAULT_LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10., 30.)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: recording a value is a binary search over the bucket bounds and an increment, so it costs
+    a few hundred nanoseconds no matter how many values are recorded. It isn't thread-safe by itself, the
+    `MetricsRegistry` records under its lock.
+
+    :param buckets: Sorted upper bounds of the buckets, values above the last one go to the `+Inf` bucket
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.
+
+    def __getstate__(self):
+        return self.buckets, self.counts, self.sum
+
+    def __setstate__(self, state):
+        self.buckets, self.counts, self.sum = state
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def cumulative_counts(self):
+        """
+        :return: `[(upper bound, number of values <= it)]`, the last bound is `float('inf')`
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        """
+        :return: Upper bound of the bucket holding the `q` quantile (e.g: `.99`), `None` if there are no values
+        """
+        rank = q * self.count
+        if not rank:
+            return None
+        for bound, total in self.cumulative_counts():
+            if total >= rank:
+                return bound
+
+    @property
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': {bound: total for bound, total in self.cumulative_counts()},
+            'p50': self.quantile(.5),
+            'p95': self.quantile(.95),
+            'p99': self.quantile(.99),
+        }
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class MetricsRegistry:
+    """
+    Metrics of the api calls of a client, it's integrated into the clients by their `metrics` parameter and can be
+    shared by several of them:
+
+    - `requests`: sent requests by `(endpoint, status)`, the status is `'error'` when no response has arrived
+    - `errors`: failures by `(endpoint, exception class)`, of the requests (e.g. `ConnectionError`) and of the calls
+      (e.g. `FinnotechCircuitOpenException`)
+    - `retries`: retried attempts by endpoint
+    - `cache_hits`: calls answered by the response cache or rejected by the negative cache, by `(method, cache)`
+    - `token_refreshes`: refreshes of the tokens, by token type
+    - `latency`: a `Histogram` of the latency of the requests (seconds) by endpoint
+
+    :param prefix: Prefix of the names of the Prometheus metrics
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS, prefix='pyfinnotech'):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.requests = {}
+        self.errors = {}
+        self.retries = {}
+        self.cache_hits = {}
+        self.token_refreshes = {}
+        self.latency = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _increment(cls, counter, key):
+        """
+        Should be called while holding the lock, a plain dict is cheaper to update than a `Counter`
+        """
+        counter[key] = counter.get(key, 0) + 1
+
+    def record_request(self, endpoint, latency, status_code=None, error=None):
+        """
+        :param status_code: Http status of the response, `None` if the request has failed by `error`
+        """
+        key = endpoint, 'error' if status_code is None else status_code
+        with self._lock:
+            self._increment(self.requests, key)
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = Histogram(self.buckets)
+            histogram.observe(latency)
+            if error is not None:
+                self._increment(self.errors, (endpoint, error.__class__.__name__))
+
+    def record_error(self, endpoint, error):
+        with self._lock:
+            self._increment(self.errors, (endpoint, error.__class__.__name__))
+
+    def record_retry(self, endpoint):
+        with self._lock:
+            self._increment(self.retries, endpoint)
+
+    def record_cache_hit(self, method, cache='response'):
+        """
+        :param cache: `'response'` or `'negative'`
+        """
+        with self._lock:
+            self._increment(self.cache_hits, (method, cache))
+
+    def record_token_refresh(self, token_type):
+        with self._lock:
+            self._increment(self.token_refreshes, token_type)
+
+    def snapshot(self) -> dict:
+        """
+        :return: A copy of the metrics as plain dicts, e.g.
+            `{'requests': {endpoint: {status: count}}, 'latency': {endpoint: {'count', 'sum', 'buckets', 'p99', ...}}}`
+        """
+        with self._lock:
+            snapshot = {
+                'requests': {},
+                'errors': {},
+                'retries': dict(self.retries),
+                'cache_hits': {},
+                'token_refreshes': dict(self.token_refreshes),
+                'latency': {endpoint: histogram.snapshot for endpoint, histogram in self.latency.items()},
+            }
+            for name in ('requests', 'errors', 'cache_hits'):
+                for (key, label), count in getattr(self, name).items():
+                    snapshot[name].setdefault(key, {})[label] = count
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """
+        :return: The metrics in the Prometheus text exposition format (version 0.0.4)
+        """
+        prefix = self.prefix
+        lines = []
+
+        def add(name, kind, help_, samples):
+            lines.append(f'# HELP {prefix}_{name} {help_}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            lines.extend(samples)
+
+        with self._lock:
+            add('requests_total', 'counter', 'Sent api requests', [
+                f'{prefix}_requests_total{_labels(endpoint=endpoint, status=status)} {count}'
+                for (endpoint, status), count in sorted(self.requests.items(), key=str)
+            ])
+            add('errors_total', 'counter', 'Failed api requests and calls', [
+                f'{prefix}_errors_total{_labels(endpoint=endpoint, error=error)} {count}'
+                for (endpoint, error), count in sorted(self.errors.items())
+            ])
+            add('retries_total', 'counter', 'Retried api calls', [
+                f'{prefix}_retries_total{_labels(endpoint=endpoint)} {count}'
+                for endpoint, count in sorted(self.retries.items())
+            ])
+            add('cache_hits_total', 'counter', 'Api calls answered by the caches', [
+                f'{prefix}_cache_hits_total{_labels(method=method, cache=cache)} {count}'
+                for (method, cache), count in sorted(self.cache_hits.items())
+            ])
+            add('token_refreshes_total', 'counter', 'Refreshed tokens', [
+                f'{prefix}_token_refreshes_total{_labels(token=token_type)} {count}'
+                for token_type, count in sorted(self.token_refreshes.items())
+            ])
+
+            samples = []
+            for endpoint, histogram in sorted(self.latency.items()):
+                for bound, total in histogram.cumulative_counts():
+                    le = '+Inf' if bound == float('inf') else repr(float(bound))
+                    samples.append(f'{prefix}_request_duration_seconds_bucket{_labels(endpoint=endpoint, le=le)} '
+                                   f'{total}')
+                samples.append(f'{prefix}_request_duration_seconds_sum{_labels(endpoint=endpoint)} {histogram.sum}')
+                samples.append(f'{prefix}_request_duration_seconds_count{_labels(endpoint=endpoint)} '
+                               f'{histogram.count}')
+            add('request_duration_seconds', 'histogram', 'Latency of the api requests', samples)
+
+        return '\n'.join(lines) + '\n'
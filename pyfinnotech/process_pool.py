@@ -0,0 +1,73 @@
+"""
+Multiprocessing bulk runner: fans an inquiry method of a `FinnotechApiClient` out across worker processes, for when
+the post-processing of the results is CPU-heavy enough to be bound by the GIL.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from pyfinnotech.batch import map_bounded, _run
+from pyfinnotech.scheduler import priority, BULK
+
+# The client of this worker process, set once by `_initialize_worker`
+_worker_client = None
+
+
+def _initialize_worker(api_client):
+    global _worker_client
+    _worker_client = api_client
+
+
+def _call(method, postprocess, input_):
+    with priority(BULK):
+        result = getattr(_worker_client, method)(input_)
+    return result if postprocess is None else postprocess(result)
+
+
+def _run_chunk(method, postprocess, chunk):
+    func = partial(_call, method, postprocess)
+    return [_run(func, input_) for input_ in chunk]
+
+
+def map_processes(api_client, method, inputs, processes=None, chunk_size=64, ordered=True, postprocess=None,
+                  mp_context=None):
+    """
+    Calls `method` (e.g: `'iban_inquiry'`) of `api_client` for each of `inputs` on a pool of worker processes and
+    yields a `BatchResult` per input, same as `map_concurrently`.
+
+    The client credential token is minted once here and shipped to the workers along with the (pickled or forked)
+    client, so the workers don't fetch their own. Pass a `token_store` to the client to share the refreshed tokens
+    of a long run as well.
+
+    :param method: Name of the client's method
+    :param chunk_size: Number of the inputs sent to a worker at once
+    :param postprocess: Picklable function applied to each successful result in the worker process
+    :param mp_context: `multiprocessing` context, e.g: `multiprocessing.get_context('spawn')`
+    """
+    # noinspection PyStatementEffect
+    api_client.client_credential
+
+    processes = processes or os.cpu_count() or 1
+    inputs = iter(inputs)
+    chunks = iter(lambda: list(itertools.islice(inputs, chunk_size)), [])
+    executor = ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=mp_context,
+        initializer=_initialize_worker,
+        initargs=(api_client,)
+    )
+    # Closed explicitly, so the queued chunks are cancelled before waiting for the workers to shut down
+    chunk_results = map_bounded(
+        executor,
+        partial(_run_chunk, method, postprocess),
+        chunks,
+        max_pending=processes * 2,
+        ordered=ordered
+    )
+    try:
+        for results in chunk_results:
+            yield from results
+    finally:
+        chunk_results.close()
+        executor.shutdown(wait=True)
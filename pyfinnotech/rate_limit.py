@@ -0,0 +1,153 @@
+import asyncio
+import struct
+import threading
+import time
+import uuid
+
+from pyfinnotech.const import ENDPOINT_SCOPES
+
+
+def boot_id() -> bytes:
+    """
+    :return: 16 bytes identifying the current boot of the host, the `time.monotonic` timestamps of another boot
+        aren't comparable to the current ones
+    """
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            return uuid.UUID(f.read().strip()).bytes
+    except (OSError, ValueError):
+        # The boot time by the minute, a spurious mismatch just resets the limits
+        return struct.pack('<qq', round((time.time() - time.monotonic()) / 60), 0)
+
+
+class RateLimit:
+    """
+    GCRA (a.k.a. virtual scheduling) limit of `rate` calls per second, allowing bursts of up to `burst` calls; it's
+    equivalent to a token bucket of `burst` capacity refilled by `rate` tokens per second, but keeps just one
+    timestamp: the theoretical arrival time of the next call.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.emission_interval = 1 / rate
+        self.tolerance = self.emission_interval * (burst - 1)
+        self._arrival_at = 0.
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_boot_id'] = boot_id()
+        return state
+
+    def __setstate__(self, state):
+        if state.pop('_boot_id', None) != boot_id():
+            # Unpickled after a reboot, the timestamp of the old boot would block the calls for the old uptime
+            state['_arrival_at'] = 0.
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=None):
+        """
+        Reserves a permit.
+
+        :param max_wait: Nothing is reserved if the permit is not available in this many seconds, `None` waits as
+            long as needed
+        :return: Seconds to wait before using the reserved permit, or `None` if nothing is reserved
+        """
+        with self._lock:
+            now = time.monotonic()
+            arrival_at = max(self._get_arrival_at(), now)
+            wait = arrival_at - self.tolerance - now
+            if wait <= 0:
+                wait = 0.
+            elif max_wait is not None and wait > max_wait:
+                return None
+
+            self._set_arrival_at(arrival_at + self.emission_interval)
+            return wait
+
+    def cancel(self):
+        """
+        Gives back a reserved (but not used) permit.
+        """
+        with self._lock:
+            self._set_arrival_at(self._get_arrival_at() - self.emission_interval)
+
+    def _get_arrival_at(self):
+        return self._arrival_at
+
+    def _set_arrival_at(self, value):
+        self._arrival_at = value
+
+
+class RateLimiter:
+    """
+    Paces the api calls of a client by the `RateLimit` of their endpoint and the one of their scope, a call waits for
+    both. It's integrated into `_execute` of the clients by their `rate_limiter` parameter.
+
+    :param endpoints: `{endpoint: RateLimit}`, the endpoints are the `ENDPOINT_*` path templates of `const`
+    :param scopes: `{scope: RateLimit}`, the limit is shared by all the endpoints of the scope (`ENDPOINT_SCOPES`)
+    :param default: `RateLimit` shared by all the other endpoints
+    """
+
+    def __init__(self, endpoints: dict = None, scopes: dict = None, default: RateLimit = None):
+        self.endpoints = endpoints or {}
+        self.scopes = scopes or {}
+        self.default = default
+
+    def limits(self, endpoint) -> list:
+        limits = []
+        limit = self.endpoints.get(endpoint, None)
+        if limit is not None:
+            limits.append(limit)
+
+        scope = ENDPOINT_SCOPES.get(endpoint)
+        limit = None if scope is None else self.scopes.get(scope)
+        if limit is not None:
+            limits.append(limit)
+
+        if not limits and self.default is not None:
+            limits.append(self.default)
+        return limits
+
+    def _reserve(self, endpoint, max_wait):
+        reserved = []
+        for limit in self.limits(endpoint):
+            wait = limit.reserve(max_wait)
+            if wait is None:
+                for reserved_limit, _ in reserved:
+                    reserved_limit.cancel()
+                return None
+            reserved.append((limit, wait))
+        return max((wait for _, wait in reserved), default=0.)
+
+    def acquire(self, endpoint, timeout=None):
+        """
+        Blocks until a call to `endpoint` is allowed.
+
+        :param timeout: Gives up (without waiting) if it's not allowed in this many seconds, `None` waits as long as
+            needed
+        :return: `False` if it has given up
+        """
+        wait = self._reserve(endpoint, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def try_acquire(self, endpoint):
+        """
+        Non-blocking version of `acquire`.
+        """
+        return self._reserve(endpoint, 0) is not None
+
+    async def acquire_async(self, endpoint, timeout=None):
+        wait = self._reserve(endpoint, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
@@ -1,7 +1,13 @@
+from pyfinnotech.banks import resolve_iban_bank, Bank
+
+
 class BaseFinnotechResponse:
     def __init__(self, payload):
         self.payload = payload
 
+    def __reduce__(self):
+        return self.__class__, (self.payload,)
+
     @property
     def track_id(self):
         return self.payload.get('trackId', None)
@@ -21,6 +27,13 @@ class CardToIbanResponse(BaseFinnotechResponse):
     def bank_name(self):
         return self.payload.get('bankName', None)
 
+    @property
+    def bank(self) -> Bank:
+        """
+        Resolved locally from the iban
+        """
+        return resolve_iban_bank(self.iban)
+
     @property
     def deposit(self):
         return self.payload.get('deposit', None)
@@ -67,6 +80,21 @@ class IbanInquiryResponse(BaseFinnotechResponse):
     def is_valid(self):
         return self.payload.get('depositStatus', None) in ['02', '2']  # FIXME: WTF
 
+    @property
+    def iban(self):
+        return self.payload.get('IBAN', None)
+
+    @property
+    def bank_name(self):
+        return self.payload.get('bankName', None)
+
+    @property
+    def bank(self) -> Bank:
+        """
+        Resolved locally from the iban
+        """
+        return resolve_iban_bank(self.iban)
+
     @property
     def owner_first_name(self):
         # FIXME: What should we do with cards with more than one owner?
@@ -0,0 +1,108 @@
+import random
+import threading
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from pyfinnotech.concurrency import parse_retry_after
+
+# Failures in which the request may not have been processed, so it's safe to send it again (with the same trackId)
+RETRIABLE_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError) + (
+    () if aiohttp is None else (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+)
+
+RETRIABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class RetryBudget:
+    """
+    Caps the retries to a `ratio` of the calls, so the retries can't multiply the load during an outage: every call
+    deposits `ratio` tokens (up to `max_tokens`) and every retry withdraws one.
+    """
+
+    def __init__(self, ratio=.1, max_tokens=10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.withdrawn = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        """
+        :return: `False` if there is no token left
+        """
+        with self._lock:
+            if self.tokens < 1:
+                self.exhausted += 1
+                return False
+            self.tokens -= 1
+            self.withdrawn += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Retries the calls failed by a connection error, a timeout or a `retry_status_codes` response, up to
+    `max_attempts` attempts in total. The other failures (e.g: 400) are not retried.
+
+    The attempts are apart by an exponential backoff with full jitter (a random delay up to
+    `backoff_base * 2 ^ attempt`, at most `backoff_max`), or by the `Retry-After` of the response when it's longer.
+    The retries of a call reuse its `trackId`, so the server can deduplicate them.
+
+    :param budget: `RetryBudget` shared by all the calls of the client
+    """
+
+    def __init__(self, max_attempts=3, backoff_base=.1, backoff_max=10., retry_status_codes=RETRIABLE_STATUS_CODES,
+                 retry_exceptions=RETRIABLE_EXCEPTIONS, budget: RetryBudget = None):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_status_codes = retry_status_codes
+        self.retry_exceptions = retry_exceptions
+        self.budget = budget or RetryBudget()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'retries': self.budget.withdrawn,
+            'budget_tokens': self.budget.tokens,
+            'budget_exhausted': self.budget.exhausted,
+        }
+
+    def is_retriable(self, response=None, exception=None):
+        if exception is not None:
+            return isinstance(exception, self.retry_exceptions)
+        return response is not None and response.status_code in self.retry_status_codes
+
+    def should_retry(self, attempt, response=None, exception=None):
+        """
+        :param attempt: Number of the attempts made so far
+        :return: Seconds to wait before the next attempt, or `None` if it should not be retried
+        """
+        if attempt >= self.max_attempts or not self.is_retriable(response=response, exception=exception):
+            return None
+
+        if not self.budget.withdraw():
+            return None
+
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = None if response is None else parse_retry_after(response.headers.get('Retry-After'))
+        return delay if retry_after is None else max(delay, min(retry_after, self.backoff_max))
@@ -0,0 +1,206 @@
+"""
+Priority classes of the api calls: the interactive calls (e.g. a checkout waiting for an iban inquiry) and the bulk
+ones (e.g. an overnight `card_to_iban` batch) share the rate budget of a `client_id`, so the bulk work should only
+take the capacity the interactive work leaves. The class of the current call is kept in a context variable, same as
+its deadline, the batch helpers tag their calls as bulk.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+PRIORITIES = (INTERACTIVE, BULK)
+
+_priority = contextvars.ContextVar('pyfinnotech_priority', default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def priority(value):
+    """
+    Tags the api calls made inside as `INTERACTIVE` or `BULK`.
+    """
+    if value not in PRIORITIES:
+        raise ValueError(f'Invalid priority: {value}')
+
+    token = _priority.set(value)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    """
+    :return: Priority class of the current call, `INTERACTIVE` by default
+    """
+    return _priority.get()
+
+
+def as_bulk(func):
+    """
+    :return: `func` tagging the api calls it makes as `BULK`, e.g. to run it on the threads of a batch, where the
+        context of the caller doesn't reach
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with priority(BULK):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class PriorityScheduler:
+    """
+    Strict priority permits of the api calls: at most `max_concurrent` calls at the same time, a waiting interactive
+    call always gets the next free permit and the bulk calls only take what is left while no interactive call waits.
+    `reserved` permits are never taken by the bulk calls, so an interactive call arriving during a batch doesn't
+    wait for a bulk call to finish.
+
+    It's integrated in front of `_execute` of the clients by their `scheduler` parameter, a permit is held for the
+    whole call including its retries. Tag the calls by `priority` (or `as_bulk`), the batch methods of the clients,
+    `map_processes`, the jobs and the command line tool tag theirs as bulk.
+    """
+
+    def __init__(self, max_concurrent=16, reserved=1):
+        if not 0 <= reserved < max_concurrent:
+            raise ValueError('reserved should be less than max_concurrent')
+
+        self.max_concurrent = max_concurrent
+        self.reserved = reserved
+        self.in_flight = dict.fromkeys(PRIORITIES, 0)
+        self.queued = dict.fromkeys(PRIORITIES, 0)
+        self.acquired = dict.fromkeys(PRIORITIES, 0)
+        self.wait_time = dict.fromkeys(PRIORITIES, 0.)
+        self.max_wait_time = dict.fromkeys(PRIORITIES, 0.)
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('_lock', '_condition', '_async_waiters'):
+            del state[name]
+        state['in_flight'] = dict.fromkeys(PRIORITIES, 0)
+        state['queued'] = dict.fromkeys(PRIORITIES, 0)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()
+
+    @property
+    def stats(self) -> dict:
+        """
+        In-flight and queued calls, and the time they have waited for a permit, per priority class
+        """
+        return {
+            priority_: {
+                'in_flight': self.in_flight[priority_],
+                'queued': self.queued[priority_],
+                'acquired': self.acquired[priority_],
+                'mean_wait_time': self.wait_time[priority_] / self.acquired[priority_]
+                if self.acquired[priority_] else 0.,
+                'max_wait_time': self.max_wait_time[priority_],
+            }
+            for priority_ in PRIORITIES
+        }
+
+    def _try_acquire(self, priority_, queued_at):
+        """
+        Should be called while holding the lock.
+        """
+        in_flight = self.in_flight[INTERACTIVE] + self.in_flight[BULK]
+        if priority_ == BULK and (self.queued[INTERACTIVE] or in_flight >= self.max_concurrent - self.reserved):
+            return False
+        if in_flight >= self.max_concurrent:
+            return False
+
+        self.in_flight[priority_] += 1
+        self.acquired[priority_] += 1
+        wait_time = time.monotonic() - queued_at
+        self.wait_time[priority_] += wait_time
+        self.max_wait_time[priority_] = max(self.max_wait_time[priority_], wait_time)
+        return True
+
+    def acquire(self, priority_=None, timeout=None):
+        """
+        Blocks until a permit is granted to `priority_` (default: of the current call).
+
+        :return: The acquired priority class to `release`, `None` if not acquired in `timeout` seconds
+        """
+        priority_ = priority_ or current_priority()
+        queued_at = time.monotonic()
+        with self._condition:
+            if self._try_acquire(priority_, queued_at):
+                return priority_
+
+            self.queued[priority_] += 1
+            try:
+                acquired = self._condition.wait_for(lambda: self._try_acquire(priority_, queued_at), timeout)
+            finally:
+                self.queued[priority_] -= 1
+                # A bulk call may go on, now that this one doesn't wait anymore
+                self._wake_waiters()
+            return priority_ if acquired else None
+
+    async def acquire_async(self, priority_=None, timeout=None):
+        priority_ = priority_ or current_priority()
+        queued_at = time.monotonic()
+        deadline = None if timeout is None else queued_at + timeout
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire(priority_, queued_at):
+                return priority_
+            self.queued[priority_] += 1
+
+        try:
+            while True:
+                with self._lock:
+                    if self._try_acquire(priority_, queued_at):
+                        return priority_
+
+                    wait = None if deadline is None else deadline - time.monotonic()
+                    if wait is not None and wait <= 0:
+                        return None
+                    waiter = (loop, loop.create_future())
+                    self._async_waiters.append(waiter)
+
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter[1]), wait)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    with self._lock:
+                        if waiter in self._async_waiters:
+                            self._async_waiters.remove(waiter)
+        finally:
+            with self._lock:
+                self.queued[priority_] -= 1
+                self._wake_waiters()
+
+    def release(self, priority_):
+        with self._condition:
+            self.in_flight[priority_] -= 1
+            self._wake_waiters()
+
+    def _wake_waiters(self):
+        """
+        Should be called while holding the lock.
+        """
+        self._condition.notify_all()
+        waiters, self._async_waiters = self._async_waiters, deque()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._wake, future)
+
+    @classmethod
+    def _wake(cls, future):
+        if not future.done():
+            future.set_result(None)
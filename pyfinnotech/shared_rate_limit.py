@@ -0,0 +1,183 @@
+"""
+Rate limits shared by all the processes of a host: the state of the limits lives in a memory-mapped file, updated
+under a lock, so e.g. 32 worker processes of the same client id share one budget instead of each owning all of it.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from pyfinnotech.rate_limit import RateLimit, RateLimiter, boot_id
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class MmapRateLimitStore:
+    """
+    Memory-mapped table of `slots` named timestamps, one per `SharedRateLimit`. The file outlives a reboot, but the
+    `time.monotonic` timestamps don't, so the table is reset when the boot id in its header isn't the current one.
+
+    The processes are coordinated by a POSIX record lock on the file (which is not inherited by the forked children)
+    and the threads by a `threading.Lock`, so a read-modify-write costs a few microseconds.
+
+    The record locks are per process, so a process should open a file just once, by `open`.
+    """
+
+    _header = struct.Struct('<4sQ16s')
+    _slot = struct.Struct('<Qd')
+    _magic = b'PFR2'
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path, slots=256):
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError('MmapRateLimitStore is not supported on this platform')
+
+        self.path = path
+        self.slots = slots
+        self._open()
+
+    def _open(self):
+        size = self._header.size + self._slot.size * self.slots
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._pid = os.getpid()
+        self._thread_lock = threading.Lock()
+        self._indexes = {}
+        with self:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+            magic, slots, boot_id_ = self._header.unpack_from(self._map, 0)
+            if magic == self._magic and slots != self.slots:
+                raise ValueError(f'{self.path} has {slots} slots, not {self.slots}')
+
+            current_boot_id = boot_id()
+            if magic != self._magic or boot_id_ != current_boot_id:
+                self._map[:] = bytes(size)
+                self._header.pack_into(self._map, 0, self._magic, self.slots, current_boot_id)
+
+    @classmethod
+    def open(cls, path, slots=256):
+        """
+        :return: The store of `path` of this process
+        """
+        path = os.path.abspath(path)
+        with cls._instances_lock:
+            store = cls._instances.get(path)
+            if store is None:
+                store = cls._instances[path] = cls(path, slots=slots)
+            return store
+
+    def __enter__(self):
+        if self._pid != os.getpid():
+            # Forked, the lock may have been held by another thread of the parent
+            self._pid = os.getpid()
+            self._thread_lock = threading.Lock()
+
+        self._thread_lock.acquire()
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def _offset(self, index):
+        return self._header.size + self._slot.size * index
+
+    def index(self, name):
+        """
+        Finds (or claims) the slot of `name`, should be called while holding the lock.
+        """
+        index = self._indexes.get(name)
+        if index is not None:
+            return index
+
+        key = struct.unpack('<Q', hashlib.blake2b(name.encode(), digest_size=8).digest())[0] or 1
+        for probe in range(self.slots):
+            index = (key + probe) % self.slots
+            slot_key, _ = self._slot.unpack_from(self._map, self._offset(index))
+            if slot_key == 0:
+                self._slot.pack_into(self._map, self._offset(index), key, 0.)
+            if slot_key in (0, key):
+                self._indexes[name] = index
+                return index
+
+        raise ValueError(f'No free slot in {self.path}')
+
+    def get(self, index):
+        return self._slot.unpack_from(self._map, self._offset(index))[1]
+
+    def set(self, index, value):
+        struct.pack_into('<d', self._map, self._offset(index) + 8, value)
+
+    def close(self):
+        with self._instances_lock:
+            if self._instances.get(self.path) is self:
+                del self._instances[self.path]
+        self._map.close()
+        os.close(self._fd)
+
+
+class SharedRateLimit(RateLimit):
+    """
+    `RateLimit` whose state is the slot `name` of `store`, shared by all the processes using the same store file.
+    `time.monotonic` is system-wide, so the timestamps are comparable across the processes.
+    """
+
+    def __init__(self, store: MmapRateLimitStore, name, rate, burst=1):
+        super().__init__(rate=rate, burst=burst)
+        self.store = store
+        self.name = name
+        self._lock = store
+
+    def __getstate__(self):
+        return {
+            'path': self.store.path,
+            'slots': self.store.slots,
+            'name': self.name,
+            'rate': self.rate,
+            'burst': self.burst
+        }
+
+    def __setstate__(self, state):
+        store = MmapRateLimitStore.open(state.pop('path'), slots=state.pop('slots'))
+        self.__init__(store, **state)
+
+    def _get_arrival_at(self):
+        return self.store.get(self.store.index(self.name))
+
+    def _set_arrival_at(self, value):
+        self.store.set(self.store.index(self.name), value)
+
+
+def shared_rate_limiter(client_id, endpoints: dict = None, scopes: dict = None, default: RateLimit = None,
+                        directory=None) -> RateLimiter:
+    """
+    Same as `RateLimiter(endpoints, scopes, default)`, but the limits are shared by all the clients of `client_id`
+    on this host, through the `pyfinnotech-{client_id}.ratelimit` file of `directory` (default: the temp directory).
+    """
+    store = MmapRateLimitStore.open(
+        os.path.join(directory or tempfile.gettempdir(), f'pyfinnotech-{client_id}.ratelimit')
+    )
+
+    def share(prefix, limits):
+        return {
+            key: SharedRateLimit(store, f'{prefix}:{key}', rate=limit.rate, burst=limit.burst)
+            for key, limit in (limits or {}).items()
+        }
+
+    return RateLimiter(
+        endpoints=share('endpoint', endpoints),
+        scopes=share('scope', scopes),
+        default=None if default is None else SharedRateLimit(store, 'default', rate=default.rate, burst=default.burst)
+    )
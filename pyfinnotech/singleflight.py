@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import threading
+
+from pyfinnotech.deadline import remaining
+from pyfinnotech.exceptions import FinnotechTimeoutException
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+def _should_rerun(exception):
+    """
+    The leader has run out of its own deadline, but the follower still has time to make the call itself
+    """
+    return isinstance(exception, FinnotechTimeoutException) and remaining() != 0
+
+
+class SingleFlight:
+    """
+    Runs a function only once for all the concurrent callers of the same key: the first caller runs it and the
+    others wait for it and share its result (or exception).
+
+    A follower waits at most the deadline of its own call (see `pyfinnotech.deadline`), and runs the function again
+    if the leader has failed by its shorter deadline.
+
+    `shared` counts the callers which have shared the call of another one.
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger('pyfinnotech')
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def __getstate__(self):
+        # The in-flight calls belong to this process
+        return {'logger': self.logger.name}
+
+    def __setstate__(self, state):
+        self.__init__(logger=logging.getLogger(state['logger']))
+
+    def do(self, key, func, *args, **kwargs):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    break
+                self.shared += 1
+
+            if not call.done.wait(remaining()):
+                raise FinnotechTimeoutException('Deadline exceeded waiting for a shared call', logger=self.logger)
+            if call.exception is None:
+                return call.result
+            if not _should_rerun(call.exception):
+                raise call.exception
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+
+        except BaseException as e:
+            call.exception = e
+            raise
+
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio version of `SingleFlight`, `func` should be a coroutine function.
+    """
+
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger('pyfinnotech')
+        self.shared = 0
+        self._calls = {}
+
+    __getstate__ = SingleFlight.__getstate__
+    __setstate__ = SingleFlight.__setstate__
+
+    async def do(self, key, func, *args, **kwargs):
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+
+            self.shared += 1
+            # Unlike `wait_for`, it doesn't cancel the shared call when this caller times out or is cancelled
+            done, _ = await asyncio.wait((future,), timeout=remaining())
+            if not done:
+                raise FinnotechTimeoutException('Deadline exceeded waiting for a shared call', logger=self.logger)
+            if future.cancelled() or not _should_rerun(future.exception()):
+                return future.result()
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await func(*args, **kwargs)
+            future.set_result(result)
+            return result
+
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Marks it as retrieved, when there is no other waiter
+            raise
+
+        finally:
+            del self._calls[key]
@@ -37,6 +37,21 @@ class ApiClientTestCase(unittest.TestCase):
         )
         super().setUpClass()
 
+    def create_api_client(self, client_class=FinnotechApiClient, share_token=True, **kwargs):
+        """
+        :return: Another client of the mock server, configured by `kwargs`
+        :param share_token: Reuse the client credential token of `api_client`, instead of fetching one
+        """
+        api_client = client_class(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            **kwargs
+        )
+        if share_token:
+            api_client._client_credential_token = self.api_client.client_credential
+        return api_client
+
     @classmethod
     def tearDownClass(cls):
         cls._server_shutdown()
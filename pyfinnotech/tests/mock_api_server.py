@@ -1,16 +1,18 @@
 import base64
 import functools
+from datetime import datetime, timezone
 
 from nanohttp import RestController, json, HttpNotFound, context, HttpUnauthorized, HttpBadRequest
 
 from pyfinnotech.const import ALL_SCOPE_CLIENT_CREDENTIALS
+from pyfinnotech.jalali import format_jalali_timestamp
 
 valid_mock_cards = [
     '0000000000000000'
 ]
 
 valid_mock_ibans = [
-    'IR910800005000115426432001'
+    'IR660800005000115426432001'
 ]
 
 valid_mock_client_id = 'mock-app'
@@ -102,11 +104,13 @@ def authorize_basic(func):
 
 
 class MockOauthController(RestController):
+    issued_tokens = 0
 
     @json
     @authorize_basic
     def post(self, r1: str = None):
         if r1 == 'token':
+            MockOauthController.issued_tokens += 1
             return {
                 "result": {
                     "value": valid_mock_client_credential_tokens[0]
@@ -114,7 +118,7 @@ class MockOauthController(RestController):
                         ','.join(ALL_SCOPE_CLIENT_CREDENTIALS)
                     ]
                     , "lifeTime": 864000000
-                    , "creationDate": "13970730111355"
+                    , "creationDate": format_jalali_timestamp(datetime.now(timezone.utc))
                     ,
                     "refreshToken": valid_mock_client_credential_refresh_tokens
                 }
@@ -153,7 +157,7 @@ class MockIbanController(RestController):
             return {
                 "trackId": "get-iban-inquiry-029",
                 "result": {
-                    "IBAN": "IR910800005000115426432001"
+                    "IBAN": "IR660800005000115426432001"
                     , "bankName": "قرض الحسنه رسالت"
                     , "deposit": "10.6423499.1"
                     , "depositDescription": "حساب فعال است"
@@ -183,7 +187,7 @@ class MockCardToIbanController(RestController):
             return {
                 "trackId": "cardToIban-029",
                 "result": {
-                    "IBAN": "IR910800005000115426432001"
+                    "IBAN": "IR660800005000115426432001"
                     , "bankName": "قرض الحسنه رسالت"
                     , "deposit": "10.6423499.1"
                     , "card": "6362141081734437"
@@ -211,7 +215,7 @@ class MockNationalIdVerification(RestController):
     def get(self):
         return {
             "result": {
-                "nationalCode": "0067408595",
+                "nationalCode": "0067408591",
                 "birthDate": "1365/11/25",
                 "status": "DONE",
                 "fullName": "سعید غلامی فرد",
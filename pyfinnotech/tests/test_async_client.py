@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+
+from pyfinnotech import AsyncFinnotechApiClient
+from pyfinnotech.async_api import aiohttp
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_cards, valid_mock_ibans, valid_mock_facility_sms_tokens
+from pyfinnotech.token import FacilitySmsAccessTokenToken
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class AsyncClientTestCase(ApiClientTestCase):
+    def create_async_client(self, **kwargs):
+        return AsyncFinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            **kwargs
+        )
+
+    def test_inquiries(self):
+        async def run():
+            async with self.create_async_client() as api_client:
+                iban_result = await api_client.iban_inquiry(valid_mock_ibans[0])
+                self.assertTrue(iban_result.is_valid)
+                self.assertIsNotNone(iban_result.owner_first_name)
+
+                card_result = await api_client.card_inquiry(valid_mock_cards[0])
+                self.assertTrue(card_result.is_valid)
+                self.assertIsNotNone(card_result.full_name)
+
+                card_to_iban_result = await api_client.card_to_iban(valid_mock_cards[0])
+                self.assertTrue(card_to_iban_result.is_valid)
+                self.assertIsNotNone(card_to_iban_result.iban)
+
+                with self.assertRaises(ValueError):
+                    await api_client.card_to_iban('A000000000000000')
+
+                with self.assertRaises(FinnotechHttpException):
+                    await api_client.card_inquiry('4111111111111111')
+
+        asyncio.run(run())
+
+    def test_national_id_verification(self):
+        async def run():
+            async with self.create_async_client() as api_client:
+                result = await api_client.national_id_verification(
+                    access_token=FacilitySmsAccessTokenToken.load(valid_mock_facility_sms_tokens[0]),
+                    national_id='0067408591',
+                    birth_date='1365/11/25',
+                    full_name='سعید غلامی فرد',
+                    gender='مرد',
+                )
+                self.assertTrue(result.is_valid)
+                self.assertEqual('0067408591', result.national_code)
+
+        asyncio.run(run())
+
+    def test_concurrent_inquiries(self):
+        async def run():
+            async with self.create_async_client(max_in_flight=4) as api_client:
+                results = await asyncio.gather(*[api_client.iban_inquiry(valid_mock_ibans[0]) for _ in range(20)])
+                self.assertTrue(all(r.is_valid for r in results))
+
+        asyncio.run(run())
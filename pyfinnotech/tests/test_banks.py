@@ -0,0 +1,20 @@
+from pyfinnotech.banks import resolve_bank
+from pyfinnotech.const import BANK_AYANDEH, BANK_MELLI, BANK_MELLAT, BANK_NOOR
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, valid_mock_cards
+
+
+class BankResolutionTestCase(ApiClientTestCase):
+    def test_resolve_bank(self):
+        self.assertEqual(BANK_MELLI, resolve_bank('6037991234567893').code)
+        self.assertEqual(BANK_MELLAT, resolve_bank('6104-3312-3456-7890').code)
+        self.assertEqual(BANK_AYANDEH, resolve_bank('IR120620000000000000000001').code)
+        self.assertEqual(BANK_AYANDEH, resolve_bank('ir12 0620 0000 0000 0000 0000 01').code)
+        self.assertIsNone(resolve_bank('0000000000000000'))
+        self.assertIsNone(resolve_bank('IR120000000000000000000001'))
+        self.assertIsNone(resolve_bank(None))
+
+    def test_response_bank(self):
+        self.assertEqual(BANK_NOOR, self.api_client.iban_inquiry(valid_mock_ibans[0]).bank.code)
+        self.assertEqual(BANK_NOOR, self.api_client.card_to_iban(valid_mock_cards[0]).bank.code)
+        self.assertEqual(BANK_MELLI, self.api_client.resolve_bank('6037991234567893').code)
@@ -0,0 +1,66 @@
+import itertools
+import threading
+import time
+
+from pyfinnotech.batch import map_concurrently
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, valid_mock_cards
+
+
+class BatchTestCase(ApiClientTestCase):
+    def test_map_iban_inquiry(self):
+        unknown_iban = 'IR820540102680020817909002'
+        ibans = [valid_mock_ibans[0], 'IR00', unknown_iban, valid_mock_ibans[0]]
+
+        results = list(self.api_client.map_iban_inquiry(ibans, max_workers=4))
+        self.assertEqual(ibans, [r.input for r in results])
+        self.assertTrue(results[0].is_ok)
+        self.assertTrue(results[0].result.is_valid)
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertIsInstance(results[2].error, FinnotechHttpException)
+        self.assertTrue(results[3].is_ok)
+
+    def test_map_cards(self):
+        cards = [valid_mock_cards[0]] * 5
+        self.assertTrue(all(r.is_ok for r in self.api_client.map_card_inquiry(cards, ordered=False)))
+        self.assertTrue(all(r.result.is_valid for r in self.api_client.map_card_to_iban(cards)))
+
+    def test_ordering_and_bounded_consumption(self):
+        def slow(i):
+            time.sleep(.05 if i == 0 else 0)
+            return i
+
+        self.assertEqual(list(range(10)), [r.result for r in map_concurrently(slow, range(10), max_workers=4)])
+        unordered = [r.result for r in map_concurrently(slow, range(10), max_workers=4, ordered=False)]
+        self.assertEqual(list(range(10)), sorted(unordered))
+        self.assertNotEqual(0, unordered[0])
+
+        # An endless input is consumed lazily
+        consumed = itertools.count()
+        lock = threading.Lock()
+
+        def counted(i):
+            with lock:
+                next(consumed)
+            return i
+
+        results = map_concurrently(counted, itertools.count(), max_workers=2, max_pending=4)
+        self.assertEqual([0, 1, 2], [next(results).result for _ in range(3)])
+        results.close()
+        self.assertLessEqual(next(consumed), 8)
+
+        # Abandoning the batch cancels the queued inputs
+        called = []
+
+        def slow_counted(i):
+            called.append(i)
+            time.sleep(.02)
+            return i
+
+        for ordered in (True, False):
+            called.clear()
+            results = map_concurrently(slow_counted, range(10), max_workers=1, max_pending=5, ordered=ordered)
+            next(results)
+            results.close()
+            self.assertLessEqual(len(called), 2)
@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from pyfinnotech.bulk_validation import validate_cards, validate_ibans, validate_national_ids, numpy
+
+cards = ['6037991234567893', '0000000000000000', '6037991234567890', '603799123456789', '60379912345678933',
+         'A037991234567893', '', '6037991234567893\n']
+ibans = ['IR660800005000115426432001', 'IR910800005000115426432001', 'TR660800005000115426432001',
+         'IR6608000050001154264320011', 'IR66080000500011542643200', 'IR660800005000115426432001\n']
+national_ids = ['0067408591', '0499370899', '0067408595', '1111111111', '006740859', '006740859A', '0067408591\n']
+
+
+def mutate(value):
+    index = random.randrange(len(value))
+    return value[:index] + random.choice('0123456789') + value[index + 1:]
+
+
+class BulkValidationTestCase(unittest.TestCase):
+    def test_pure_python(self):
+        # The trailing newline is rejected, same as by the numpy implementation
+        self.assertEqual([True, True, False, False, False, False, False, False], validate_cards(cards, use_numpy=False))
+        self.assertEqual([True, False, False, False, False, False], validate_ibans(ibans, use_numpy=False))
+        self.assertEqual(
+            [True, True, False, False, False, False, False],
+            validate_national_ids(national_ids, use_numpy=False)
+        )
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        random.seed(13)
+        for validate, samples in ((validate_cards, cards), (validate_ibans, ibans),
+                                  (validate_national_ids, national_ids)):
+            samples = samples + [mutate(random.choice(samples[:2])) for _ in range(1000)]
+            expected = validate(samples, use_numpy=False)
+            self.assertEqual(expected, validate(iter(samples)).tolist())
+            self.assertEqual(expected, validate(numpy.array(samples)).tolist())
+            self.assertEqual(expected, validate(numpy.array([s.encode() for s in samples])).tolist())
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import ujson
+
+from pyfinnotech.bulkhead import Bulkhead, Bulkheads, endpoint_family
+from pyfinnotech.const import ENDPOINT_IBAN_INQUIRY, ENDPOINT_CARD_TO_IBAN, ENDPOINT_STANDARD_RELIABILITY, \
+    ENDPOINT_OAUTH2_TOKEN
+from pyfinnotech.exceptions import FinnotechBulkheadFullException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, valid_mock_cards
+from pyfinnotech.transport import HttpResponse
+
+ok_response = HttpResponse(200, ujson.dumps({'result': {'IBAN': valid_mock_ibans[0], 'depositStatus': '02'}}).encode())
+
+
+class BulkheadTestCase(unittest.TestCase):
+    def test_families(self):
+        self.assertEqual('oak', endpoint_family(ENDPOINT_IBAN_INQUIRY))
+        self.assertEqual('facility', endpoint_family(ENDPOINT_CARD_TO_IBAN))
+        self.assertEqual('credit', endpoint_family(ENDPOINT_STANDARD_RELIABILITY))
+        self.assertEqual('dev', endpoint_family(ENDPOINT_OAUTH2_TOKEN))
+        self.assertEqual('kyc', endpoint_family('/kyc/v2/clients/{clientId}/identificationInquiry'))
+
+        bulkheads = Bulkheads(max_concurrent=3, pool_block=True, keep_alive_timeout=5)
+        transport = bulkheads.get(ENDPOINT_IBAN_INQUIRY).transport
+        self.assertEqual((3, True, 5), (transport.pool_maxsize, transport.pool_block, transport.keep_alive_timeout))
+
+    def test_queue(self):
+        bulkhead = Bulkhead('oak', max_concurrent=1, max_queue=1)
+        self.assertTrue(bulkhead.acquire())
+        self.assertFalse(bulkhead.acquire(timeout=.01))
+
+        threading.Timer(.05, bulkhead.release).start()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(bulkhead.acquire()))
+        waiter.start()
+        time.sleep(.01)
+        self.assertIsNone(bulkhead.acquire(timeout=.01))
+        waiter.join()
+
+        self.assertEqual([True], acquired)
+        stats = bulkhead.stats
+        self.assertEqual(1, stats['in_flight'])
+        self.assertEqual(0, stats['queued'])
+        self.assertEqual(1, stats['max_queued'])
+        self.assertEqual(2, stats['acquired'])
+        self.assertEqual(1, stats['rejected'])
+        self.assertGreaterEqual(stats['max_wait_time'], .03)
+
+    def test_async(self):
+        bulkhead = Bulkhead('oak', max_concurrent=1)
+
+        async def acquire_released():
+            self.assertTrue(await bulkhead.acquire_async())
+            self.assertFalse(await bulkhead.acquire_async(timeout=.01))
+            asyncio.get_running_loop().call_later(.05, bulkhead.release)
+            return await bulkhead.acquire_async(timeout=1)
+
+        self.assertTrue(asyncio.run(acquire_released()))
+        self.assertEqual(0, bulkhead.queued)
+
+
+class ClientBulkheadTestCase(ApiClientTestCase):
+    def test_isolation(self):
+        bulkheads = Bulkheads(max_concurrent=4, families={'facility': {'max_concurrent': 1, 'max_queue': 0}})
+        api_client = self.create_api_client(bulkheads=bulkheads)
+        released = threading.Event()
+        self.addCleanup(released.set)
+        transports = {}
+
+        def request(method, uri, params, headers, body, timeout=None, transport=None):
+            transports[uri.split('/')[1]] = transport
+            if 'cardToIban' in uri:
+                released.wait()
+            return ok_response
+
+        api_client._request = request
+        stuck = threading.Thread(target=api_client.card_to_iban, args=(valid_mock_cards[0],), daemon=True)
+        stuck.start()
+        started_at = time.monotonic()
+        while bulkheads.get(ENDPOINT_CARD_TO_IBAN).in_flight == 0 and time.monotonic() - started_at < 5:
+            time.sleep(.001)
+
+        # The facility calls are held up, the others are not
+        with self.assertRaises(FinnotechBulkheadFullException) as context:
+            api_client.card_to_iban(valid_mock_cards[0])
+        self.assertEqual('facility', context.exception.family)
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+
+        released.set()
+        stuck.join(5)
+        self.assertIs(bulkheads.get(ENDPOINT_IBAN_INQUIRY).transport, transports['oak'])
+        self.assertIs(bulkheads.get(ENDPOINT_CARD_TO_IBAN).transport, transports['facility'])
+        self.assertEqual({'oak', 'facility'}, set(bulkheads.stats))
+        self.assertEqual(1, bulkheads.stats['facility']['rejected'])
+        api_client.close()
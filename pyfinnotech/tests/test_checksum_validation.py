@@ -0,0 +1,64 @@
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_cards, valid_mock_ibans
+from pyfinnotech.validation import is_luhn_valid, is_iban_checksum_valid, is_national_id_checksum_valid
+
+
+class ChecksumValidationTestCase(ApiClientTestCase):
+    def test_checksums(self):
+        self.assertTrue(is_luhn_valid('6037991234567893'))
+        self.assertTrue(is_luhn_valid('0000000000000000'))
+        self.assertFalse(is_luhn_valid('6037991234567890'))
+
+        self.assertTrue(is_iban_checksum_valid('IR660800005000115426432001'))
+        self.assertFalse(is_iban_checksum_valid('IR910800005000115426432001'))
+
+        self.assertTrue(is_national_id_checksum_valid('0067408591'))
+        self.assertTrue(is_national_id_checksum_valid('0499370899'))
+        self.assertFalse(is_national_id_checksum_valid('0067408595'))
+        self.assertFalse(is_national_id_checksum_valid('1111111111'))
+
+    def test_avoided_calls(self):
+        api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url
+        )
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        self.assertTrue(api_client.card_to_iban(valid_mock_cards[0]).is_valid)
+
+        with self.assertRaises(ValueError):
+            api_client.iban_inquiry('IR910800005000115426432001')
+
+        with self.assertRaises(ValueError):
+            api_client.card_to_iban('6037991234567890')
+
+        with self.assertRaises(ValueError):
+            api_client.card_inquiry('6037991234567890')
+
+        with self.assertRaises(ValueError):
+            api_client.standard_reliability('0067408595', '09120000000', '1234')
+
+        # A trailing newline is a bad format, not a checksum to compute
+        for call, value in ((api_client.card_inquiry, valid_mock_cards[0]),
+                            (api_client.iban_inquiry, valid_mock_ibans[0])):
+            with self.assertRaisesRegex(ValueError, '^Bad (card|iban): '):
+                call(value + '\n')
+
+        self.assertEqual(
+            {'iban_inquiry': 1, 'card_to_iban': 1, 'card_inquiry': 1, 'standard_reliability': 1},
+            api_client.avoided_calls
+        )
+
+    def test_opt_out(self):
+        api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            local_validation=False
+        )
+        with self.assertRaises(FinnotechHttpException):
+            api_client.card_inquiry('6037991234567890')
+
+        self.assertEqual({}, api_client.avoided_calls)
@@ -0,0 +1,101 @@
+import time
+import unittest
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.circuit_breaker import CircuitBreaker, CircuitBreakers, CLOSED, OPEN, HALF_OPEN
+from pyfinnotech.const import ENDPOINT_IBAN_INQUIRY
+from pyfinnotech.exceptions import FinnotechHttpException, FinnotechCircuitOpenException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    def test_failure_rate(self):
+        changes = []
+        breaker = CircuitBreaker(
+            'endpoint',
+            failure_rate_threshold=.75,
+            window=4,
+            min_calls=4,
+            open_duration=.05,
+            half_open_calls=2,
+            on_state_change=lambda *change: changes.append(change)
+        )
+        for status_code in (200, 400, 503, 200, None):
+            self.assertTrue(breaker.allow())
+            breaker.record(.01, status_code)
+        self.assertEqual(CLOSED, breaker.state)
+        self.assertEqual(.5, breaker.failure_rate)
+
+        self.assertTrue(breaker.allow())
+        breaker.record(.01, 500)
+        self.assertEqual(OPEN, breaker.state)
+        self.assertFalse(breaker.allow())
+
+        # Half-open: a limited number of probes, a failed one opens it again
+        time.sleep(.06)
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record(.01, 200)
+        breaker.record(.01, None)
+        self.assertEqual(OPEN, breaker.state)
+
+        time.sleep(.06)
+        self.assertTrue(breaker.allow())
+        breaker.cancel()
+        for _ in range(2):
+            self.assertTrue(breaker.allow())
+            breaker.record(.01, 200)
+        self.assertEqual(CLOSED, breaker.state)
+        self.assertTrue(breaker.allow())
+
+        self.assertEqual([
+            ('endpoint', CLOSED, OPEN),
+            ('endpoint', OPEN, HALF_OPEN),
+            ('endpoint', HALF_OPEN, OPEN),
+            ('endpoint', OPEN, HALF_OPEN),
+            ('endpoint', HALF_OPEN, CLOSED),
+        ], changes)
+        self.assertEqual({
+            'state': CLOSED,
+            'calls': 0,
+            'failure_rate': 0.,
+            'slow_call_rate': 0.,
+            'opened': 2,
+            'rejected': 2
+        }, breaker.stats)
+
+    def test_slow_calls(self):
+        breaker = CircuitBreaker('endpoint', slow_call_threshold=.1, slow_call_rate_threshold=.5, min_calls=2)
+        breaker.record(.5, 200)
+        self.assertEqual(CLOSED, breaker.state)
+        breaker.record(.2, 200)
+        self.assertEqual(OPEN, breaker.state)
+
+
+class ClientCircuitBreakerTestCase(ApiClientTestCase):
+    def test_fail_fast(self):
+        breakers = CircuitBreakers(min_calls=3, endpoints={ENDPOINT_IBAN_INQUIRY: {'open_duration': 60}})
+        api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            circuit_breakers=breakers
+        )
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+
+        sent = []
+        api_client._request = lambda *args: sent.append(args) or HttpResponse(503, b'{}')
+        for _ in range(2):
+            with self.assertRaises(FinnotechHttpException):
+                api_client.iban_inquiry(valid_mock_ibans[0])
+        self.assertEqual(OPEN, breakers.get(ENDPOINT_IBAN_INQUIRY).state)
+
+        with self.assertRaises(FinnotechCircuitOpenException) as context:
+            api_client.iban_inquiry(valid_mock_ibans[0])
+        self.assertEqual(ENDPOINT_IBAN_INQUIRY, context.exception.endpoint)
+        self.assertEqual(2, len(sent))
+        self.assertEqual(OPEN, breakers.stats[ENDPOINT_IBAN_INQUIRY]['state'])
+        self.assertEqual(60, breakers.get(ENDPOINT_IBAN_INQUIRY).open_duration)
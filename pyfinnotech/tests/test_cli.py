@@ -0,0 +1,69 @@
+import contextlib
+import io
+import os
+import tempfile
+
+import ujson
+
+from pyfinnotech.cli import main
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, valid_mock_cards, valid_mock_client_id, \
+    valid_mock_client_secret
+
+unknown_iban = 'IR820540102680020817909002'
+
+
+class CliTestCase(ApiClientTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def run_cli(self, *args):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = main([
+                *args,
+                '--client-id', valid_mock_client_id,
+                '--client-secret', valid_mock_client_secret,
+                '--base-url', self.api_client.server_url,
+                '--progress-interval', '0',
+            ])
+        self.assertEqual(0, exit_code)
+        return stderr.getvalue()
+
+    def test_iban_inquiry_csv_to_jsonl(self):
+        with open(self.path('ibans.csv'), 'w') as f:
+            f.write('id,iban\n1,' + valid_mock_ibans[0] + '\n2,IR00\n3,' + unknown_iban + '\n')
+
+        progress = self.run_cli(
+            'iban-inquiry', self.path('ibans.csv'), '-o', self.path('out.jsonl'), '--concurrency', '2',
+            '--rate-limit', '100'
+        )
+        self.assertIn('3 done, 0 skipped', progress)
+        self.assertIn('errors: 400=1 ValueError=1', progress)
+        self.assertIn('p99', progress)
+
+        with open(self.path('out.jsonl')) as f:
+            records = {r['input']: r for r in map(ujson.loads, f)}
+        self.assertEqual('02', records[valid_mock_ibans[0]]['result']['depositStatus'])
+        self.assertEqual('ValueError', records['IR00']['error']['type'])
+        self.assertEqual(400, records[unknown_iban]['error']['status'])
+
+    def test_checkpoint_resume(self):
+        with open(self.path('cards.txt'), 'w') as f:
+            f.write(f'{valid_mock_cards[0]}\n6037991234567893\n')
+
+        args = ('card-to-iban', self.path('cards.txt'), '-o', self.path('out.csv'),
+                '--checkpoint', self.path('job.sqlite'), '--resume')
+        self.assertIn('2 done, 0 skipped', self.run_cli(*args))
+        self.assertIn('0 done, 2 skipped', self.run_cli(*args))
+
+        with open(self.path('out.csv')) as f:
+            lines = f.read().splitlines()
+        self.assertEqual('input,status,error,result', lines[0])
+        self.assertEqual(3, len(lines))
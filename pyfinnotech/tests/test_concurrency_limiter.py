@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.concurrency import AdaptiveConcurrencyLimiter, parse_retry_after
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+
+class AdaptiveConcurrencyLimiterTestCase(unittest.TestCase):
+    def test_aimd(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+        for _ in range(20):
+            self.assertTrue(limiter.acquire())
+            self.assertTrue(limiter.acquire())
+            limiter.release(.01, status_code=200)
+            limiter.release(.01, status_code=200)
+        self.assertEqual(4, limiter.limit)
+
+        limiter.acquire()
+        limiter.release(.1, status_code=200)
+        self.assertEqual(3, limiter.limit)
+
+        limiter.acquire()
+        limiter.release(.01, status_code=None)
+        self.assertEqual(1, limiter.limit)
+        self.assertEqual({'limit': 1, 'in_flight': 0, 'baseline_latency': .01}, limiter.stats)
+
+    def test_blocking_and_retry_after(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire(timeout=.01))
+
+        threading.Timer(.05, limiter.release, args=(.01,), kwargs={'status_code': 200}).start()
+        self.assertTrue(limiter.acquire(timeout=1))
+
+        limiter.release(.01, status_code=429, retry_after=.2)
+        started_at = time.monotonic()
+        self.assertFalse(limiter.acquire(timeout=.05))
+        self.assertTrue(limiter.acquire())
+        self.assertGreaterEqual(time.monotonic() - started_at, .2)
+
+    def test_async(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+
+        async def acquire_released():
+            self.assertTrue(await limiter.acquire_async())
+            self.assertFalse(await limiter.acquire_async(timeout=.01))
+            asyncio.get_running_loop().call_later(.05, lambda: limiter.release(.01, status_code=200))
+            return await limiter.acquire_async(timeout=1)
+
+        self.assertTrue(asyncio.run(acquire_released()))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(3, parse_retry_after('3'))
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertEqual(0, parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'))
+
+
+class ClientConcurrencyLimiterTestCase(ApiClientTestCase):
+    def test_overload(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            concurrency_limiter=limiter
+        )
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        self.assertEqual(0, limiter.in_flight)
+
+        api_client._request = lambda *args: HttpResponse(429, b'{}', {'Retry-After': '0.1'})
+        with self.assertRaises(FinnotechHttpException):
+            api_client.iban_inquiry(valid_mock_ibans[0])
+        self.assertEqual(4, limiter.limit)
+        self.assertFalse(limiter.acquire(timeout=.01))
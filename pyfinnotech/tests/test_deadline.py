@@ -0,0 +1,116 @@
+import asyncio
+import time
+import unittest
+
+import requests
+import ujson
+
+from pyfinnotech import AsyncFinnotechApiClient
+from pyfinnotech.const import ENDPOINT_IBAN_INQUIRY, ENDPOINT_OAUTH2_TOKEN
+from pyfinnotech.deadline import deadline, remaining, bounded
+from pyfinnotech.exceptions import FinnotechHttpException, FinnotechTimeoutException
+from pyfinnotech.rate_limit import RateLimiter, RateLimit
+from pyfinnotech.retry import RetryPolicy
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+ok_response = HttpResponse(200, ujson.dumps({'result': {'IBAN': valid_mock_ibans[0], 'depositStatus': '02'}}).encode())
+
+
+class DeadlineTestCase(unittest.TestCase):
+    def test_nested(self):
+        self.assertIsNone(remaining())
+        self.assertEqual((3, 10), bounded((3, 10)))
+
+        with deadline(5):
+            self.assertAlmostEqual(5, remaining(), places=2)
+            self.assertEqual(3, bounded((3, 10))[0])
+            self.assertAlmostEqual(5, bounded((3, 10))[1], places=2)
+
+            with deadline(10):
+                self.assertLessEqual(remaining(), 5)
+            with deadline(1):
+                self.assertLessEqual(remaining(), 1)
+            with deadline(None):
+                self.assertLessEqual(remaining(), 5)
+
+        self.assertIsNone(remaining())
+
+
+class ClientDeadlineTestCase(ApiClientTestCase):
+    def test_timeouts(self):
+        api_client = self.create_api_client(share_token=False, timeouts={ENDPOINT_IBAN_INQUIRY: (1, 5)})
+        sent = []
+        request = api_client.transport.request
+
+        def recorded_request(method, url, **kwargs):
+            sent.append((url, kwargs['timeout']))
+            return request(method, url, **kwargs)
+
+        api_client.transport.request = recorded_request
+
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        self.assertEqual([ENDPOINT_OAUTH2_TOKEN, (1, 5)], [sent[0][0][-len(ENDPOINT_OAUTH2_TOKEN):], sent[1][1]])
+
+        # The token acquisition takes from the same budget
+        api_client._client_credential_token = None
+        sent.clear()
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0], timeout=2).is_valid)
+        self.assertEqual(2, len(sent))
+        self.assertTrue(all(connect <= 2 and read <= 2 for _, (connect, read) in sent))
+
+    def test_retries(self):
+        api_client = self.create_api_client(
+            share_token=False,
+            retry_policy=RetryPolicy(max_attempts=10, backoff_base=.01)
+        )
+        api_client._client_credential_token = self.api_client.client_credential
+
+        def request(method, uri, params, headers, body, timeout=None, transport=None):
+            time.sleep(min(.2, timeout[1]))
+            raise requests.Timeout()
+
+        api_client._request = request
+        started_at = time.monotonic()
+        with self.assertRaises(FinnotechTimeoutException):
+            api_client.iban_inquiry(valid_mock_ibans[0], timeout=.3)
+        self.assertLess(time.monotonic() - started_at, .5)
+
+        # No retry when the server asks to wait beyond the deadline
+        api_client._request = lambda *args: HttpResponse(503, b'{}', {'Retry-After': '5'})
+        started_at = time.monotonic()
+        with self.assertRaises(FinnotechHttpException):
+            api_client.iban_inquiry(valid_mock_ibans[0], timeout=1)
+        self.assertLess(time.monotonic() - started_at, .5)
+
+    def test_rate_limit(self):
+        api_client = self.create_api_client(share_token=False, rate_limiter=RateLimiter(default=RateLimit(1)))
+        api_client._client_credential_token = self.api_client.client_credential
+        api_client._request = lambda *args: ok_response
+
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0], timeout=.1).is_valid)
+        with self.assertRaises(FinnotechTimeoutException):
+            api_client.iban_inquiry(valid_mock_ibans[0], timeout=.1)
+
+    def test_async(self):
+        api_client = self.create_api_client(AsyncFinnotechApiClient, share_token=False)
+        api_client._client_credential_token = self.api_client.client_credential
+        sent = []
+
+        async def send(method, url, params, headers, body, timeout=None):
+            sent.append(timeout)
+            return ok_response
+
+        api_client._request = send
+
+        async def inquire():
+            try:
+                await api_client.iban_inquiry(valid_mock_ibans[0])
+                return await api_client.iban_inquiry(valid_mock_ibans[0], timeout=.5)
+            finally:
+                await api_client.close()
+
+        self.assertTrue(asyncio.run(inquire()).is_valid)
+        self.assertEqual((3.05, 10), sent[0])
+        self.assertLessEqual(sent[1][1], .5)
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import ujson
+
+from pyfinnotech import AsyncFinnotechApiClient
+from pyfinnotech.deadline import remaining
+from pyfinnotech.exceptions import FinnotechHttpException, FinnotechTimeoutException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+ok_response = HttpResponse(200, ujson.dumps({'result': {'IBAN': valid_mock_ibans[0], 'depositStatus': '02'}}).encode())
+
+
+class DeduplicationTestCase(ApiClientTestCase):
+    def wait_for_duplicates(self, api_client, count):
+        while api_client.deduplicated_calls < count:
+            time.sleep(.001)
+
+    def test_threads(self):
+        api_client = self.create_api_client(deduplicate_calls=True)
+        sent = []
+        released = threading.Event()
+
+        def request(method, uri, params, headers, body, timeout=None, transport=None):
+            sent.append(params)
+            released.wait()
+            return response
+
+        api_client._request = request
+        for response in (ok_response, HttpResponse(400, b'{}')):
+            sent.clear()
+            released.clear()
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(api_client.iban_inquiry, valid_mock_ibans[0]) for _ in range(4)]
+                self.wait_for_duplicates(api_client, 3 if response is ok_response else 6)
+                released.set()
+
+            self.assertEqual(1, len(sent))
+            if response is ok_response:
+                self.assertEqual(1, len({id(future.result().payload) for future in futures}))
+            else:
+                self.assertEqual(1, len({id(future.exception()) for future in futures}))
+                self.assertIsInstance(futures[0].exception(), FinnotechHttpException)
+
+        # Only the concurrent calls are shared
+        released.set()
+        sent.clear()
+        api_client._request = lambda *args: sent.append(args) or ok_response
+        api_client.iban_inquiry(valid_mock_ibans[0])
+        api_client.iban_inquiry(valid_mock_ibans[0])
+        self.assertEqual(2, len(sent))
+
+    def test_deadline(self):
+        api_client = self.create_api_client(deduplicate_calls=True)
+        sent = []
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def request(method, uri, params, headers, body, timeout=None, transport=None):
+            sent.append(remaining())
+            left = remaining()
+            if left is None:
+                released.wait()
+            elif left < 1:
+                time.sleep(left)
+                raise requests.Timeout()
+            return ok_response
+
+        api_client._request = request
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # A follower doesn't wait for a slow leader longer than its own deadline
+            leader = executor.submit(api_client.iban_inquiry, valid_mock_ibans[0])
+            while not sent:
+                time.sleep(.001)
+            started_at = time.monotonic()
+            with self.assertRaises(FinnotechTimeoutException):
+                api_client.iban_inquiry(valid_mock_ibans[0], timeout=.05)
+            self.assertLess(time.monotonic() - started_at, 1)
+            released.set()
+            self.assertTrue(leader.result().is_valid)
+
+            # A leader failed by its short deadline doesn't fail the follower which still has time
+            sent.clear()
+            leader = executor.submit(api_client.iban_inquiry, valid_mock_ibans[0], timeout=.1)
+            while not sent:
+                time.sleep(.001)
+            self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0], timeout=5).is_valid)
+            self.assertIsInstance(leader.exception(), FinnotechTimeoutException)
+            self.assertEqual(2, len(sent))
+
+    def test_async_deadline(self):
+        api_client = self.create_api_client(AsyncFinnotechApiClient, deduplicate_calls=True)
+        sent = []
+
+        async def send(method, url, params, headers, body, timeout=None):
+            sent.append(remaining())
+            left = remaining()
+            if left < 1:
+                await asyncio.sleep(left)
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(.2)
+            return ok_response
+
+        api_client._request = send
+
+        async def inquire():
+            try:
+                leader = asyncio.ensure_future(api_client.iban_inquiry(valid_mock_ibans[0], timeout=5))
+                await asyncio.sleep(.01)
+                with self.assertRaises(FinnotechTimeoutException):
+                    await api_client.iban_inquiry(valid_mock_ibans[0], timeout=.05)
+                self.assertTrue((await leader).is_valid)
+
+                sent.clear()
+                leader = asyncio.ensure_future(api_client.iban_inquiry(valid_mock_ibans[0], timeout=.1))
+                await asyncio.sleep(.01)
+                self.assertTrue((await api_client.iban_inquiry(valid_mock_ibans[0], timeout=5)).is_valid)
+                with self.assertRaises(FinnotechTimeoutException):
+                    await leader
+                self.assertEqual(2, len(sent))
+            finally:
+                await api_client.close()
+
+        asyncio.run(inquire())
+
+    def test_async(self):
+        api_client = self.create_api_client(AsyncFinnotechApiClient, deduplicate_calls=True)
+        sent = []
+
+        async def send(method, url, params, headers, body, timeout=None):
+            sent.append(params)
+            await asyncio.sleep(.05)
+            return ok_response
+
+        api_client._request = send
+
+        async def inquire():
+            try:
+                return await asyncio.gather(*[api_client.iban_inquiry(valid_mock_ibans[0]) for _ in range(4)])
+            finally:
+                await api_client.close()
+
+        responses = asyncio.run(inquire())
+        self.assertEqual(1, len(sent))
+        self.assertEqual(3, api_client.deduplicated_calls)
+        self.assertEqual(1, len({id(response.payload) for response in responses}))
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import ujson
+
+from pyfinnotech import AsyncFinnotechApiClient
+from pyfinnotech.concurrency import AdaptiveConcurrencyLimiter
+from pyfinnotech.const import ENDPOINT_IBAN_INQUIRY, ENDPOINT_STANDARD_RELIABILITY
+from pyfinnotech.hedging import HedgingPolicy
+from pyfinnotech.metrics import MetricsRegistry
+from pyfinnotech.retry import RetryBudget
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+ok_response = HttpResponse(200, ujson.dumps({'result': {'IBAN': valid_mock_ibans[0], 'depositStatus': '02'}}).encode())
+
+
+def create_policy(**kwargs):
+    policy = HedgingPolicy(min_samples=10, **kwargs)
+    for latency in range(10):
+        policy.observe(ENDPOINT_IBAN_INQUIRY, .01 + latency / 1000)
+    return policy
+
+
+class HedgingPolicyTestCase(unittest.TestCase):
+    def test_delay(self):
+        policy = HedgingPolicy(min_samples=10, percentile=.9)
+        self.assertTrue(policy.is_hedged(ENDPOINT_IBAN_INQUIRY))
+        self.assertFalse(policy.is_hedged(ENDPOINT_STANDARD_RELIABILITY))
+
+        for latency in range(1, 10):
+            policy.observe(ENDPOINT_IBAN_INQUIRY, latency)
+        self.assertIsNone(policy.delay(ENDPOINT_IBAN_INQUIRY))
+        policy.observe(ENDPOINT_IBAN_INQUIRY, 10)
+        self.assertEqual(10, policy.delay(ENDPOINT_IBAN_INQUIRY))
+
+        policy = HedgingPolicy(budget=RetryBudget(ratio=.5, max_tokens=1))
+        self.assertTrue(policy.try_hedge())
+        self.assertFalse(policy.try_hedge())
+        policy.delay(ENDPOINT_IBAN_INQUIRY)
+        policy.delay(ENDPOINT_IBAN_INQUIRY)
+        self.assertTrue(policy.try_hedge())
+        self.assertEqual({'hedged': 2, 'hedge_wins': 0, 'budget_tokens': 0, 'budget_exhausted': 1}, policy.stats)
+
+
+class ClientHedgingTestCase(ApiClientTestCase):
+    def test_threads(self):
+        policy = create_policy()
+        metrics = MetricsRegistry()
+        api_client = self.create_api_client(hedging_policy=policy, metrics=metrics)
+        sent = []
+        lock = threading.Lock()
+
+        def request(method, uri, params, headers, body, timeout=None, transport=None):
+            with lock:
+                sent.append(params['trackId'])
+                is_first = len(sent) == 1
+            if is_first:
+                time.sleep(.5)
+            return ok_response
+
+        api_client._request = request
+        started_at = time.monotonic()
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        self.assertLess(time.monotonic() - started_at, .4)
+        self.assertEqual(2, len(sent))
+        self.assertEqual(sent[0], sent[1])
+        self.assertEqual(1, policy.stats['hedge_wins'])
+
+        # No budget, no hedge
+        policy.budget = RetryBudget(ratio=0, max_tokens=0)
+        sent.clear()
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        self.assertEqual(1, len(sent))
+
+        # The abandoned loser is recorded as cancelled when it completes, not as a request
+        policy.executor.shutdown(wait=True)
+        self.assertEqual({200: 2}, metrics.snapshot()['requests'][ENDPOINT_IBAN_INQUIRY])
+        api_client.close()
+        self.assertIsNone(policy._executor)
+
+    def test_async(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+        api_client = self.create_api_client(
+            AsyncFinnotechApiClient,
+            hedging_policy=create_policy(),
+            concurrency_limiter=limiter
+        )
+        sent = []
+        cancelled = []
+
+        async def send(method, url, params, headers, body, timeout=None):
+            sent.append(params['trackId'])
+            if len(sent) == 1:
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.append(params['trackId'])
+                    raise
+            return ok_response
+
+        api_client._request = send
+
+        async def inquire():
+            try:
+                return await api_client.iban_inquiry(valid_mock_ibans[0])
+            finally:
+                await api_client.close()
+
+        started_at = time.monotonic()
+        self.assertTrue(asyncio.run(inquire()).is_valid)
+        self.assertLess(time.monotonic() - started_at, .5)
+        self.assertEqual([sent[0]] * 2, sent)
+        self.assertEqual(sent[:1], cancelled)
+        self.assertEqual(0, limiter.in_flight)
+        self.assertEqual(4, limiter.limit)
@@ -0,0 +1,104 @@
+import itertools
+import logging
+import os
+import tempfile
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.jobs import BulkJob, FileCheckpoint, SqliteCheckpoint
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+unknown_iban = 'IR820540102680020817909002'
+
+
+class BulkJobTestCase(ApiClientTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+        )
+        # Distinct inputs which are all answered by the mock server the same way
+        self.calls = []
+        self.api_client.iban_inquiry = lambda iban: self.calls.append(iban) or FinnotechApiClient.iban_inquiry(
+            self.api_client, valid_mock_ibans[0] if iban.startswith('IR66') else iban
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def inputs(self):
+        return [f'IR66{i:022d}' for i in range(20)] + ['IR00', unknown_iban]
+
+    def assert_resumes(self, create_checkpoint):
+        with create_checkpoint() as checkpoint:
+            job = BulkJob(self.api_client, 'iban_inquiry', checkpoint, max_workers=2)
+            # Crashes after 10 results
+            run = job.run(self.inputs())
+            results = list(itertools.islice(run, 10))
+            run.close()
+            self.assertTrue(all(r.is_ok for r in results))
+
+        finished = {r.input for r in results}
+        self.calls.clear()
+        with create_checkpoint() as checkpoint:
+            job = BulkJob(self.api_client, 'iban_inquiry', checkpoint, max_workers=2)
+            results = list(job.run(self.inputs()))
+            self.assertGreaterEqual(job.skipped, 10)
+            self.assertFalse(finished & {r.input for r in results})
+            self.assertFalse(finished & set(self.calls))
+
+            records = {input_: (result, error) for input_, result, error in checkpoint.records()}
+            self.assertEqual(set(self.inputs()), set(records))
+            self.assertEqual('02', records[self.inputs()[0]][0]['depositStatus'])
+            self.assertEqual(400, records[unknown_iban][1]['status'])
+            self.assertIn('message', records['IR00'][1])
+
+        # Nothing left to do
+        self.calls.clear()
+        with create_checkpoint() as checkpoint:
+            self.assertEqual([], list(BulkJob(self.api_client, 'iban_inquiry', checkpoint).run(self.inputs())))
+            self.assertEqual([], self.calls)
+
+    def test_file_checkpoint(self):
+        path = os.path.join(self.directory.name, 'job.jsonl')
+        self.assert_resumes(lambda: FileCheckpoint(path, sync_every=3))
+
+        # A partially written record is dropped
+        with open(path, 'ab') as f:
+            f.write(b'{"input": "IR12')
+        with FileCheckpoint(path) as checkpoint:
+            self.assertEqual(len(self.inputs()), len(list(checkpoint.records())))
+            checkpoint.add('IR12', result={})
+        with FileCheckpoint(path) as checkpoint:
+            self.assertTrue(checkpoint.is_done('IR12'))
+
+    def test_sqlite_checkpoint(self):
+        path = os.path.join(self.directory.name, 'job.sqlite')
+        self.assert_resumes(lambda: SqliteCheckpoint(path, sync_every=3))
+
+    def test_transient_errors(self):
+        path = os.path.join(self.directory.name, 'job.jsonl')
+        inquire = self.api_client.iban_inquiry
+
+        def throttled(iban):
+            if iban == unknown_iban:
+                raise FinnotechHttpException(HttpResponse(429, b'{}'), logging.getLogger('pyfinnotech'))
+            return inquire(iban)
+
+        self.api_client.iban_inquiry = throttled
+        with FileCheckpoint(path) as checkpoint:
+            results = list(BulkJob(self.api_client, 'iban_inquiry', checkpoint).run(self.inputs()))
+            self.assertEqual(429, [r for r in results if r.input == unknown_iban][0].error.status_code)
+
+        # The throttled input isn't finished, it's retried by the next run
+        self.api_client.iban_inquiry = inquire
+        self.calls.clear()
+        with FileCheckpoint(path) as checkpoint:
+            results = list(BulkJob(self.api_client, 'iban_inquiry', checkpoint).run(self.inputs()))
+            self.assertEqual([unknown_iban], [r.input for r in results])
+            self.assertEqual([unknown_iban], self.calls)
+            self.assertTrue(checkpoint.is_done(unknown_iban))
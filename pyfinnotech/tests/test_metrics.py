@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import pickle
+import timeit
+import unittest
+
+import requests
+import ujson
+
+from pyfinnotech import AsyncFinnotechApiClient
+from pyfinnotech.cache import ResponseCache, NegativeCache
+from pyfinnotech.const import ENDPOINT_IBAN_INQUIRY
+from pyfinnotech.exceptions import FinnotechException, FinnotechHttpException
+from pyfinnotech.metrics import Histogram, MetricsRegistry
+from pyfinnotech.retry import RetryPolicy
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+ok_response = HttpResponse(200, ujson.dumps({'result': {'IBAN': valid_mock_ibans[0], 'depositStatus': '02'}}).encode())
+
+
+class HistogramTestCase(unittest.TestCase):
+    def test_buckets(self):
+        histogram = Histogram(buckets=(.1, 1))
+        self.assertIsNone(histogram.quantile(.5))
+        for value in (.05, .1, .5, 2):
+            histogram.observe(value)
+
+        self.assertEqual([(.1, 2), (1, 3), (float('inf'), 4)], histogram.cumulative_counts())
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(2.65, histogram.sum)
+        self.assertEqual(.1, histogram.quantile(.5))
+        self.assertEqual(float('inf'), histogram.quantile(.99))
+        self.assertEqual(histogram.snapshot, pickle.loads(pickle.dumps(histogram)).snapshot)
+
+    def test_overhead(self):
+        histogram = Histogram()
+        # Generous for the slow test machines, it's a few hundred nanoseconds
+        self.assertLess(min(timeit.repeat(lambda: histogram.observe(.123), number=10000, repeat=3)) / 10000, 5e-6)
+
+
+class MetricsRegistryTestCase(unittest.TestCase):
+    def test_export(self):
+        metrics = MetricsRegistry(buckets=(.1, 1))
+        metrics.record_request('/a', .05, status_code=200)
+        metrics.record_request('/a', 2, error=requests.ConnectionError())
+        metrics.record_error('/a', FinnotechException('failed', logger=logging.getLogger('pyfinnotech')))
+        metrics.record_retry('/a')
+        metrics.record_cache_hit('iban_inquiry')
+        metrics.record_token_refresh('CODE')
+
+        snapshot = metrics.snapshot()
+        self.assertEqual({'/a': {200: 1, 'error': 1}}, snapshot['requests'])
+        self.assertEqual({'/a': {'ConnectionError': 1, 'FinnotechException': 1}}, snapshot['errors'])
+        self.assertEqual({'/a': 1}, snapshot['retries'])
+        self.assertEqual({'iban_inquiry': {'response': 1}}, snapshot['cache_hits'])
+        self.assertEqual({'CODE': 1}, snapshot['token_refreshes'])
+        self.assertEqual({.1: 1, 1: 1, float('inf'): 2}, snapshot['latency']['/a']['buckets'])
+
+        text = metrics.to_prometheus()
+        for line in (
+                '# TYPE pyfinnotech_requests_total counter',
+                'pyfinnotech_requests_total{endpoint="/a",status="200"} 1',
+                'pyfinnotech_requests_total{endpoint="/a",status="error"} 1',
+                'pyfinnotech_errors_total{endpoint="/a",error="ConnectionError"} 1',
+                'pyfinnotech_retries_total{endpoint="/a"} 1',
+                'pyfinnotech_cache_hits_total{method="iban_inquiry",cache="response"} 1',
+                'pyfinnotech_token_refreshes_total{token="CODE"} 1',
+                '# TYPE pyfinnotech_request_duration_seconds histogram',
+                'pyfinnotech_request_duration_seconds_bucket{endpoint="/a",le="0.1"} 1',
+                'pyfinnotech_request_duration_seconds_bucket{endpoint="/a",le="+Inf"} 2',
+                'pyfinnotech_request_duration_seconds_sum{endpoint="/a"} 2.05',
+                'pyfinnotech_request_duration_seconds_count{endpoint="/a"} 2',
+        ):
+            self.assertIn(line, text.splitlines())
+        self.assertTrue(text.endswith('\n'))
+
+        self.assertEqual(snapshot, pickle.loads(pickle.dumps(metrics)).snapshot())
+
+
+class ClientMetricsTestCase(ApiClientTestCase):
+    def test_threads(self):
+        metrics = MetricsRegistry()
+        api_client = self.create_api_client(
+            metrics=metrics,
+            retry_policy=RetryPolicy(backoff_base=.01),
+            response_caches={'iban_inquiry': ResponseCache()},
+            negative_cache=NegativeCache(capacity=1000),
+            local_validation=False
+        )
+        outcomes = [requests.ConnectionError('reset'), ok_response, HttpResponse(400, b'{}')]
+
+        def request(method, uri, params, headers, body, timeout=None, transport=None):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        api_client._request = request
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        for _ in range(2):
+            with self.assertRaises(FinnotechHttpException):
+                api_client.iban_inquiry(valid_mock_ibans[0][:-1] + '2')
+
+        snapshot = metrics.snapshot()
+        self.assertEqual({200: 1, 400: 1, 'error': 1}, snapshot['requests'][ENDPOINT_IBAN_INQUIRY])
+        self.assertEqual(
+            {'ConnectionError': 1, 'FinnotechHttpException': 1},
+            snapshot['errors'][ENDPOINT_IBAN_INQUIRY]
+        )
+        self.assertEqual({ENDPOINT_IBAN_INQUIRY: 1}, snapshot['retries'])
+        self.assertEqual({'response': 1, 'negative': 1}, snapshot['cache_hits']['iban_inquiry'])
+        self.assertEqual(3, snapshot['latency'][ENDPOINT_IBAN_INQUIRY]['count'])
+
+        # Fetching the first token isn't a refresh
+        del api_client._request
+        api_client._client_credential_token = None
+        token = api_client.client_credential
+        self.assertEqual({}, metrics.snapshot()['token_refreshes'])
+        token.refresh(api_client)
+        self.assertEqual({'CODE': 1}, metrics.snapshot()['token_refreshes'])
+
+    def test_async(self):
+        metrics = MetricsRegistry()
+        api_client = self.create_api_client(AsyncFinnotechApiClient, metrics=metrics)
+
+        async def send(method, url, params, headers, body, timeout=None):
+            return ok_response
+
+        api_client._request = send
+
+        async def inquire():
+            try:
+                return await api_client.iban_inquiry(valid_mock_ibans[0])
+            finally:
+                await api_client.close()
+
+        self.assertTrue(asyncio.run(inquire()).is_valid)
+        self.assertEqual({ENDPOINT_IBAN_INQUIRY: {200: 1}}, metrics.snapshot()['requests'])
@@ -15,7 +15,7 @@ class IbanValidationTestCase(ApiClientTestCase):
         token = FacilitySmsAccessTokenToken.load(valid_mock_facility_sms_tokens[0])
         result = self.api_client.national_id_verification(
             access_token=token,
-            national_id='0067408595',
+            national_id='0067408591',
             birth_date='1365/11/25',
             full_name='سعید غلامی فرد',
             gender='مرد',
@@ -23,5 +23,5 @@ class IbanValidationTestCase(ApiClientTestCase):
         self.assertTrue(result.is_valid)
         self.assertTrue(result.is_alive)
         self.assertTrue(result.is_man)
-        self.assertEqual('0067408595', result.national_code)
+        self.assertEqual('0067408591', result.national_code)
         self.assertEqual(100, result.full_name_similarity)
@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.bloom import BloomFilter
+from pyfinnotech.cache import NegativeCache
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_cards
+
+unknown_card = '6037991234567893'
+
+
+class NegativeCacheTestCase(ApiClientTestCase):
+    def test_bloom_filter(self):
+        bloom_filter = BloomFilter(capacity=10000, error_rate=.01)
+        for i in range(10000):
+            bloom_filter.add(str(i))
+
+        self.assertTrue(all(str(i) in bloom_filter for i in range(10000)))
+        false_positives = sum(str(i) in bloom_filter for i in range(10000, 20000))
+        self.assertLess(false_positives, 200)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'filter.bin')
+            bloom_filter.save(path)
+            loaded = BloomFilter.load(path)
+            self.assertEqual(bloom_filter.bits, loaded.bits)
+            self.assertEqual(bloom_filter.hash_count, loaded.hash_count)
+            self.assertIn('13', loaded)
+
+    def test_fail_fast(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rejected.bin')
+            with FinnotechApiClient(
+                    client_id=self.api_client.client_id,
+                    client_secret=self.api_client.client_secret,
+                    base_url=self.api_client.server_url,
+                    negative_cache=NegativeCache(capacity=1000, path=path)
+            ) as api_client:
+                calls = []
+                execute = api_client._execute
+                api_client._execute = lambda *args, **kwargs: calls.append(kwargs) or execute(*args, **kwargs)
+                api_client.client_credential
+
+                for _ in range(3):
+                    with self.assertRaises(FinnotechHttpException) as context:
+                        api_client.card_to_iban(unknown_card)
+                    self.assertEqual(400, context.exception.status_code)
+
+                self.assertTrue(api_client.card_to_iban(valid_mock_cards[0]).is_valid)
+                self.assertEqual(2, len(calls) - 1)
+                self.assertEqual({'size': 1, 'hits': 2}, api_client.negative_cache.stats)
+
+                # Sent anyway, e.g. to recheck a false rejection
+                with NegativeCache.bypass():
+                    with self.assertRaises(FinnotechHttpException):
+                        api_client.card_to_iban(unknown_card)
+                self.assertEqual(3, len(calls) - 1)
+
+            # Persisted by close
+            negative_cache = NegativeCache(path=path)
+            self.assertTrue(negative_cache.is_rejected('card_to_iban', unknown_card))
+            self.assertFalse(negative_cache.is_rejected('card_inquiry', unknown_card))
+
+    def test_ttl(self):
+        negative_cache = NegativeCache(capacity=1000, ttl=60)
+        negative_cache.add('card_to_iban', unknown_card)
+
+        # Still remembered by the previous filter after a rotation
+        negative_cache.bloom_filter.created_at -= 60
+        self.assertTrue(negative_cache.is_rejected('card_to_iban', unknown_card))
+        self.assertEqual(0, negative_cache.bloom_filter.count)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rejected.bin')
+            negative_cache.save(path)
+            loaded = NegativeCache(path=path, ttl=60)
+            self.assertTrue(loaded.is_rejected('card_to_iban', unknown_card))
+
+            # Forgotten after the next one
+            loaded.bloom_filter.created_at -= 60
+            self.assertFalse(loaded.is_rejected('card_to_iban', unknown_card))
+
+            # Both are dropped after a long pause
+            loaded.bloom_filter.created_at -= 120
+            self.assertFalse(loaded.is_rejected('card_to_iban', unknown_card))
+            self.assertIsNone(loaded.previous_bloom_filter)
+            loaded.save()
+            self.assertFalse(os.path.exists(f'{path}.previous'))
@@ -0,0 +1,61 @@
+import multiprocessing
+import pickle
+
+from pyfinnotech.cache import ResponseCache, NegativeCache
+from pyfinnotech.exceptions import FinnotechHttpException
+from pyfinnotech.process_pool import map_processes
+from pyfinnotech.responses import IbanInquiryResponse
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, MockOauthController
+
+
+def owner_name(response):
+    return f'{response.owner_first_name} {response.owner_last_name}'
+
+
+class ProcessPoolTestCase(ApiClientTestCase):
+    def create_cached_api_client(self):
+        return self.create_api_client(
+            share_token=False,
+            response_caches={'iban_inquiry': ResponseCache()},
+            negative_cache=NegativeCache(capacity=1000)
+        )
+
+    def test_pickle(self):
+        api_client = self.create_cached_api_client()
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+
+        copy = pickle.loads(pickle.dumps(api_client))
+        self.assertIs(api_client.logger, copy.logger)
+        self.assertEqual(api_client.client_credential.token, copy.client_credential.token)
+        self.assertEqual(1, len(copy.response_caches['iban_inquiry']))
+        self.assertTrue(copy.iban_inquiry(valid_mock_ibans[0]).is_valid)
+
+        response = IbanInquiryResponse({'IBAN': valid_mock_ibans[0]})
+        self.assertEqual(response.payload, pickle.loads(pickle.dumps(response)).payload)
+
+        with self.assertRaises(FinnotechHttpException) as context:
+            api_client.iban_inquiry('IR820540102680020817909002')
+        exception = pickle.loads(pickle.dumps(context.exception))
+        self.assertEqual(400, exception.status_code)
+        self.assertEqual(context.exception.message, exception.message)
+
+    def test_map_processes(self):
+        api_client = self.create_cached_api_client()
+        # Opens a pooled connection, to be dropped by the forked workers
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        issued_tokens = MockOauthController.issued_tokens
+
+        ibans = [valid_mock_ibans[0], 'IR00', 'IR820540102680020817909002'] * 10
+        for mp_context in (None, multiprocessing.get_context('spawn')):
+            results = list(map_processes(
+                api_client, 'iban_inquiry', ibans, processes=2, chunk_size=4, postprocess=owner_name,
+                mp_context=mp_context
+            ))
+            self.assertEqual(ibans, [r.input for r in results])
+            self.assertEqual('شیما کیایی', results[0].result)
+            self.assertIsInstance(results[1].error, ValueError)
+            self.assertEqual(400, results[2].error.status_code)
+
+        # The workers reuse the parent's token
+        self.assertEqual(issued_tokens, MockOauthController.issued_tokens)
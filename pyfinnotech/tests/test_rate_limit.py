@@ -0,0 +1,59 @@
+import asyncio
+import time
+import unittest
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.const import ENDPOINT_IBAN_INQUIRY, ENDPOINT_CARD_TO_IBAN, ENDPOINT_CARDS, SCOPE_CARD_INFORMATION_GET
+from pyfinnotech.rate_limit import RateLimit, RateLimiter
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, valid_mock_cards
+
+
+class RateLimitTestCase(unittest.TestCase):
+    def test_burst_and_try(self):
+        rate_limiter = RateLimiter(endpoints={ENDPOINT_IBAN_INQUIRY: RateLimit(rate=10, burst=3)})
+        self.assertEqual([True] * 3 + [False], [rate_limiter.try_acquire(ENDPOINT_IBAN_INQUIRY) for _ in range(4)])
+
+        # Not limited
+        self.assertTrue(all(rate_limiter.try_acquire(ENDPOINT_CARD_TO_IBAN) for _ in range(100)))
+
+        self.assertFalse(rate_limiter.acquire(ENDPOINT_IBAN_INQUIRY, timeout=.01))
+        started_at = time.monotonic()
+        self.assertTrue(rate_limiter.acquire(ENDPOINT_IBAN_INQUIRY))
+        self.assertTrue(rate_limiter.acquire(ENDPOINT_IBAN_INQUIRY))
+        self.assertAlmostEqual(.2, time.monotonic() - started_at, delta=.05)
+
+    def test_scope_and_default(self):
+        scope_limit = RateLimit(rate=1)
+        rate_limiter = RateLimiter(scopes={SCOPE_CARD_INFORMATION_GET: scope_limit}, default=RateLimit(rate=1))
+        self.assertEqual([scope_limit], rate_limiter.limits(ENDPOINT_CARDS))
+        self.assertTrue(rate_limiter.try_acquire(ENDPOINT_CARDS))
+        self.assertFalse(rate_limiter.try_acquire(ENDPOINT_CARDS))
+        self.assertTrue(rate_limiter.try_acquire(ENDPOINT_CARD_TO_IBAN))
+        self.assertFalse(rate_limiter.try_acquire(ENDPOINT_IBAN_INQUIRY))
+
+    def test_async(self):
+        rate_limiter = RateLimiter(default=RateLimit(rate=20))
+
+        async def acquire_all():
+            started_at = time.monotonic()
+            await asyncio.gather(*[rate_limiter.acquire_async(ENDPOINT_IBAN_INQUIRY) for _ in range(5)])
+            return time.monotonic() - started_at
+
+        self.assertAlmostEqual(.2, asyncio.run(acquire_all()), delta=.05)
+
+
+class ClientRateLimitTestCase(ApiClientTestCase):
+    def test_paced_calls(self):
+        api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            rate_limiter=RateLimiter(endpoints={ENDPOINT_IBAN_INQUIRY: RateLimit(rate=20)})
+        )
+        api_client.card_to_iban(valid_mock_cards[0])
+
+        started_at = time.monotonic()
+        for _ in range(5):
+            self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        self.assertGreaterEqual(time.monotonic() - started_at, .2)
@@ -0,0 +1,44 @@
+import time
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.cache import ResponseCache
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, valid_mock_cards
+
+
+class ResponseCacheTestCase(ApiClientTestCase):
+    def test_lru_and_ttl(self):
+        cache = ResponseCache(ttl=.1, max_size=2)
+        cache.set('a', {'a': 1})
+        cache.set('b', {'b': 1})
+        self.assertEqual({'a': 1}, cache.get('a'))
+        cache.set('c', {'c': 1})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual({'a': 1}, cache.get('a'))
+
+        time.sleep(.1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual({'size': 1, 'hits': 2, 'misses': 2, 'evictions': 1}, cache.stats)
+
+    def test_cached_inquiries(self):
+        iban_cache = ResponseCache()
+        card_to_iban_cache = ResponseCache()
+        api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            response_caches={'iban_inquiry': iban_cache, 'card_to_iban': card_to_iban_cache}
+        )
+        calls = []
+        execute = api_client._execute
+        api_client._execute = lambda *args, **kwargs: calls.append(kwargs) or execute(*args, **kwargs)
+
+        for _ in range(3):
+            self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+            self.assertTrue(api_client.card_to_iban(valid_mock_cards[0]).is_valid)
+            self.assertTrue(api_client.card_inquiry(valid_mock_cards[0]).is_valid)
+
+        # The first call fetches the token as well
+        self.assertEqual(1 + 2 + 3, len(calls))
+        self.assertEqual({'size': 1, 'hits': 2, 'misses': 1, 'evictions': 0}, iban_cache.stats)
+        self.assertEqual({'size': 1, 'hits': 2, 'misses': 1, 'evictions': 0}, card_to_iban_cache.stats)
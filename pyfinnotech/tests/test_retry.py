@@ -0,0 +1,84 @@
+import asyncio
+
+import requests
+import ujson
+
+from pyfinnotech import AsyncFinnotechApiClient
+from pyfinnotech.exceptions import FinnotechHttpException, FinnotechException
+from pyfinnotech.retry import RetryPolicy, RetryBudget
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+ok_response = HttpResponse(200, ujson.dumps({'result': {'IBAN': valid_mock_ibans[0], 'depositStatus': '02'}}).encode())
+
+
+class RetryTestCase(ApiClientTestCase):
+    def fake_responses(self, *outcomes):
+        """
+        :return: A fake `_request` returning (or raising) the `outcomes` one by one, and the list of the sent params
+        """
+        outcomes = list(outcomes)
+        sent = []
+
+        def request(method, uri, params, headers, body, timeout=None, transport=None):
+            sent.append(dict(params))
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        return request, sent
+
+    def test_transient_failures(self):
+        api_client = self.create_api_client(retry_policy=RetryPolicy(backoff_base=.01))
+        api_client._request, sent = self.fake_responses(
+            HttpResponse(503, b'{}', {'Retry-After': '0'}),
+            requests.ConnectionError('reset'),
+            ok_response,
+        )
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        self.assertEqual(3, len(sent))
+        self.assertEqual(1, len({params['trackId'] for params in sent}))
+        self.assertEqual(2, api_client.retry_policy.stats['retries'])
+
+    def test_not_retriable(self):
+        api_client = self.create_api_client(retry_policy=RetryPolicy(backoff_base=.01))
+        api_client._request, sent = self.fake_responses(HttpResponse(400, b'{}'), ok_response)
+        with self.assertRaises(FinnotechHttpException):
+            api_client.iban_inquiry(valid_mock_ibans[0])
+        self.assertEqual(1, len(sent))
+
+        api_client._request, sent = self.fake_responses(*[HttpResponse(500, b'{}')] * 3, ok_response)
+        with self.assertRaises(FinnotechHttpException):
+            api_client.iban_inquiry(valid_mock_ibans[0])
+        self.assertEqual(3, len(sent))
+
+    def test_budget(self):
+        api_client = self.create_api_client(
+            retry_policy=RetryPolicy(backoff_base=.01, budget=RetryBudget(ratio=0, max_tokens=1))
+        )
+        api_client._request, sent = self.fake_responses(*[requests.Timeout()] * 4)
+        with self.assertRaises(FinnotechException):
+            api_client.iban_inquiry(valid_mock_ibans[0])
+        self.assertEqual(2, len(sent))
+        self.assertEqual({'retries': 1, 'budget_tokens': 0, 'budget_exhausted': 1}, api_client.retry_policy.stats)
+
+    def test_async(self):
+        api_client = self.create_api_client(AsyncFinnotechApiClient, retry_policy=RetryPolicy(backoff_base=.01))
+        request, sent = self.fake_responses(HttpResponse(502, b'{}'), ok_response)
+
+        async def send(method, url, params, headers, body, timeout=None):
+            return request(method, url, params, headers, body)
+
+        api_client._request = send
+
+        async def inquire():
+            try:
+                return await api_client.iban_inquiry(valid_mock_ibans[0])
+            finally:
+                await api_client.close()
+
+        self.assertTrue(asyncio.run(inquire()).is_valid)
+        self.assertEqual(2, len(sent))
+        self.assertEqual(sent[0]['trackId'], sent[1]['trackId'])
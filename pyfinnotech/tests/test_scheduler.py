@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+import unittest
+
+import ujson
+
+from pyfinnotech import AsyncFinnotechApiClient
+from pyfinnotech.exceptions import FinnotechTimeoutException
+from pyfinnotech.scheduler import PriorityScheduler, INTERACTIVE, BULK, priority, current_priority, as_bulk
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpResponse
+
+ok_response = HttpResponse(200, ujson.dumps({'result': {'IBAN': valid_mock_ibans[0], 'depositStatus': '02'}}).encode())
+
+
+class PrioritySchedulerTestCase(unittest.TestCase):
+    def test_priority(self):
+        self.assertEqual(INTERACTIVE, current_priority())
+        with priority(BULK):
+            self.assertEqual(BULK, current_priority())
+        self.assertEqual(BULK, as_bulk(current_priority)())
+        with self.assertRaises(ValueError):
+            with priority('urgent'):
+                pass
+
+    def test_interactive_first(self):
+        scheduler = PriorityScheduler(max_concurrent=2, reserved=1)
+        self.assertEqual(BULK, scheduler.acquire(BULK))
+        # The reserved permit is left to the interactive calls
+        self.assertIsNone(scheduler.acquire(BULK, timeout=.01))
+        self.assertEqual(INTERACTIVE, scheduler.acquire(INTERACTIVE))
+        self.assertIsNone(scheduler.acquire(INTERACTIVE, timeout=.01))
+
+        granted = []
+        lock = threading.Lock()
+
+        def acquire(priority_):
+            scheduler.acquire(priority_)
+            with lock:
+                granted.append(priority_)
+
+        waiters = [threading.Thread(target=acquire, args=(BULK,))]
+        waiters[0].start()
+        time.sleep(.02)
+        waiters.append(threading.Thread(target=acquire, args=(INTERACTIVE,)))
+        waiters[1].start()
+        while scheduler.queued[INTERACTIVE] == 0:
+            time.sleep(.001)
+
+        # The interactive call has come later, but gets the freed permit first
+        scheduler.release(BULK)
+        waiters[1].join(5)
+        self.assertEqual([INTERACTIVE], granted)
+        scheduler.release(INTERACTIVE)
+        scheduler.release(INTERACTIVE)
+        waiters[0].join(5)
+        self.assertEqual([INTERACTIVE, BULK], granted)
+
+        stats = scheduler.stats
+        self.assertEqual({'in_flight': 1, 'queued': 0, 'acquired': 2}, {
+            name: stats[BULK][name] for name in ('in_flight', 'queued', 'acquired')
+        })
+        self.assertEqual(2, stats[INTERACTIVE]['acquired'])
+        self.assertGreaterEqual(stats[BULK]['max_wait_time'], .02)
+        self.assertGreater(stats[BULK]['mean_wait_time'], 0)
+
+    def test_async(self):
+        scheduler = PriorityScheduler(max_concurrent=1, reserved=0)
+
+        async def acquire_released():
+            self.assertEqual(BULK, await scheduler.acquire_async(BULK))
+            self.assertIsNone(await scheduler.acquire_async(INTERACTIVE, timeout=.01))
+            asyncio.get_running_loop().call_later(.05, scheduler.release, BULK)
+            return await scheduler.acquire_async(timeout=1)
+
+        self.assertEqual(INTERACTIVE, asyncio.run(acquire_released()))
+        self.assertEqual(0, scheduler.queued[INTERACTIVE])
+
+
+class ClientSchedulerTestCase(ApiClientTestCase):
+    def test_threads(self):
+        scheduler = PriorityScheduler(max_concurrent=2, reserved=1)
+        api_client = self.create_api_client(scheduler=scheduler)
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def request(method, uri, params, headers, body, timeout=None, transport=None):
+            if current_priority() == BULK:
+                released.wait()
+            return ok_response
+
+        api_client._request = request
+        batch = threading.Thread(
+            target=lambda: list(api_client.map_iban_inquiry(valid_mock_ibans[:1] * 4, max_workers=4)),
+            daemon=True
+        )
+        batch.start()
+        while scheduler.queued[BULK] < 3:
+            time.sleep(.001)
+
+        # The batch fills its share, the interactive calls still get through
+        self.assertEqual(1, scheduler.in_flight[BULK])
+        self.assertTrue(api_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        released.set()
+        batch.join(5)
+        self.assertEqual(4, scheduler.stats[BULK]['acquired'])
+        self.assertEqual(1, scheduler.stats[INTERACTIVE]['acquired'])
+
+        # Waiting for a permit is bounded by the deadline of the call
+        scheduler.acquire(INTERACTIVE)
+        scheduler.acquire(INTERACTIVE)
+        with self.assertRaises(FinnotechTimeoutException):
+            api_client.iban_inquiry(valid_mock_ibans[0], timeout=.05)
+
+    def test_async(self):
+        scheduler = PriorityScheduler(max_concurrent=2, reserved=1)
+        api_client = self.create_api_client(AsyncFinnotechApiClient, scheduler=scheduler)
+        sent = []
+
+        async def send(method, url, params, headers, body, timeout=None):
+            sent.append(current_priority())
+            await asyncio.sleep(.01)
+            return ok_response
+
+        api_client._request = send
+
+        async def inquire():
+            async def inquire_bulk():
+                with priority(BULK):
+                    return await api_client.iban_inquiry(valid_mock_ibans[0])
+
+            try:
+                return await asyncio.gather(
+                    *[inquire_bulk() for _ in range(3)],
+                    api_client.iban_inquiry(valid_mock_ibans[0])
+                )
+            finally:
+                await api_client.close()
+
+        self.assertTrue(all(response.is_valid for response in asyncio.run(inquire())))
+        # The bulk calls run one by one, the interactive one doesn't wait for them
+        self.assertEqual([BULK, INTERACTIVE, BULK, BULK], sent)
+        self.assertEqual(3, scheduler.stats[BULK]['acquired'])
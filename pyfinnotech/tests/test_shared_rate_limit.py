@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+import pickle
+import tempfile
+import unittest
+
+from pyfinnotech.const import ENDPOINT_CARD_TO_IBAN, ENDPOINT_IBAN_INQUIRY
+from pyfinnotech.rate_limit import RateLimit
+from pyfinnotech.shared_rate_limit import shared_rate_limiter, MmapRateLimitStore, SharedRateLimit
+
+
+def count_permits(rate_limiter, results):
+    results.put(sum(rate_limiter.try_acquire(ENDPOINT_CARD_TO_IBAN) for _ in range(100)))
+
+
+class SharedRateLimitTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_shared_between_processes(self):
+        rate_limiter = shared_rate_limiter(
+            'mock-app',
+            endpoints={ENDPOINT_CARD_TO_IBAN: RateLimit(rate=.01, burst=10)},
+            default=RateLimit(rate=.01, burst=2),
+            directory=self.directory.name
+        )
+        processes = []
+        for context in (multiprocessing.get_context('fork'), multiprocessing.get_context('spawn')):
+            results = context.Queue()
+            process = context.Process(target=count_permits, args=(rate_limiter, results))
+            process.start()
+            processes.append((process, results))
+
+        self.assertEqual(10, sum(results.get() for _, results in processes))
+        for process, _ in processes:
+            process.join()
+
+        # Another limiter of the same client id shares the budget too
+        other = shared_rate_limiter(
+            'mock-app', default=RateLimit(rate=.01, burst=2), directory=self.directory.name
+        )
+        self.assertTrue(other.try_acquire(ENDPOINT_IBAN_INQUIRY))
+        self.assertTrue(rate_limiter.try_acquire(ENDPOINT_IBAN_INQUIRY))
+        self.assertFalse(other.try_acquire(ENDPOINT_IBAN_INQUIRY))
+
+        copy = pickle.loads(pickle.dumps(rate_limiter))
+        self.assertFalse(copy.try_acquire(ENDPOINT_CARD_TO_IBAN))
+
+    def test_reboot(self):
+        path = os.path.join(self.directory.name, 'rebooted.ratelimit')
+        store = MmapRateLimitStore(path, slots=4)
+        limit = SharedRateLimit(store, 'default', rate=.01)
+        self.assertEqual(0, limit.reserve(0))
+        self.assertIsNone(limit.reserve(0))
+
+        # Reopened by the same boot
+        store.close()
+        store = MmapRateLimitStore(path, slots=4)
+        self.assertIsNone(SharedRateLimit(store, 'default', rate=.01).reserve(0))
+
+        # Reopened after a reboot, the stored timestamp belongs to the old uptime
+        store._map[12:28] = b'x' * 16
+        store.close()
+        store = MmapRateLimitStore(path, slots=4)
+        self.assertEqual(0, SharedRateLimit(store, 'default', rate=.01).reserve(0))
+        store.close()
+
+        limit = RateLimit(rate=.01)
+        self.assertEqual(0, limit.reserve(0))
+        state = limit.__getstate__()
+        self.assertIsNone(pickle.loads(pickle.dumps(limit)).reserve(0))
+        state['_boot_id'] = b'x' * 16
+        unpickled = RateLimit.__new__(RateLimit)
+        unpickled.__setstate__(state)
+        self.assertEqual(0, unpickled.reserve(0))
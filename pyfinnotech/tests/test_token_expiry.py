@@ -0,0 +1,73 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.jalali import parse_jalali_timestamp, format_jalali_timestamp
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_client_credential_tokens
+from pyfinnotech.token import ClientCredentialToken
+
+
+def create_token(created_ago, life_time):
+    return ClientCredentialToken(
+        value=valid_mock_client_credential_tokens[0],
+        creationDate=format_jalali_timestamp(datetime.now(timezone.utc) - timedelta(seconds=created_ago)),
+        lifeTime=life_time * 1000
+    )
+
+
+class JalaliTestCase(unittest.TestCase):
+    def test_parse_jalali_timestamp(self):
+        self.assertEqual(
+            datetime(2018, 10, 22, 7, 43, 55, tzinfo=timezone.utc),
+            parse_jalali_timestamp('13970730111355')
+        )
+        self.assertEqual('13970730111355', format_jalali_timestamp(parse_jalali_timestamp('13970730111355')))
+
+        with self.assertRaises(ValueError):
+            parse_jalali_timestamp('1397073011135')
+
+
+class TokenExpiryTestCase(ApiClientTestCase):
+    def test_expiry(self):
+        token = create_token(created_ago=100, life_time=1000)
+        self.assertTrue(token.is_valid)
+        self.assertAlmostEqual(900, token.expires_in, delta=2)
+        self.assertFalse(token.needs_refresh(60))
+        self.assertTrue(token.needs_refresh(950))
+
+        self.assertFalse(create_token(created_ago=1000, life_time=100).is_valid)
+        self.assertTrue(ClientCredentialToken(value=valid_mock_client_credential_tokens[0]).is_valid)
+
+    def test_refresh_ahead(self):
+        api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            token_refresh_margin=60
+        )
+        token = create_token(created_ago=100, life_time=1000)
+        api_client._client_credential_token = token
+        self.assertIs(token, api_client.client_credential)
+
+        token = create_token(created_ago=100, life_time=130)
+        api_client._client_credential_token = token
+        self.assertLess(token.expires_in, 60)
+        self.assertGreater(api_client.client_credential.expires_in, 60)
+        api_client.close()
+
+    def test_background_refresh(self):
+        api_client = FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            background_token_refresh=True
+        )
+        for _ in range(100):
+            if api_client._client_credential_token is not None:
+                break
+            time.sleep(.05)
+
+        self.assertTrue(api_client._client_credential_token.is_valid)
+        api_client.close()
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pyfinnotech import FinnotechApiClient, AsyncFinnotechApiClient
+from pyfinnotech.deadline import deadline
+from pyfinnotech.exceptions import FinnotechTimeoutException
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, MockOauthController, \
+    valid_mock_facility_sms_tokens
+from pyfinnotech.token import FacilitySmsAccessTokenToken, ClientCredentialToken
+
+threads_count = 32
+
+
+class TokenSingleFlightTestCase(ApiClientTestCase):
+    def create_client(self):
+        return FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            pool_maxsize=threads_count
+        )
+
+    def run_concurrently(self, func):
+        barrier = threading.Barrier(threads_count)
+
+        def worker():
+            barrier.wait()
+            return func()
+
+        with ThreadPoolExecutor(threads_count) as executor:
+            return [f.result() for f in [executor.submit(worker) for _ in range(threads_count)]]
+
+    def test_concurrent_token_fetch(self):
+        api_client = self.create_client()
+        issued_tokens = MockOauthController.issued_tokens
+
+        results = self.run_concurrently(lambda: api_client.iban_inquiry(valid_mock_ibans[0]))
+
+        self.assertTrue(all(r.is_valid for r in results))
+        self.assertEqual(1, MockOauthController.issued_tokens - issued_tokens)
+        api_client.close()
+
+    def test_concurrent_token_refresh(self):
+        api_client = self.create_client()
+        token = api_client.client_credential
+        stale_token = token.token
+        issued_tokens = MockOauthController.issued_tokens
+
+        self.run_concurrently(lambda: token.refresh(api_client, stale_token=stale_token))
+
+        self.assertEqual(1, MockOauthController.issued_tokens - issued_tokens)
+        api_client.close()
+
+    def test_concurrent_sms_token_refresh(self):
+        calls = []
+        token = FacilitySmsAccessTokenToken.load(valid_mock_facility_sms_tokens[0])
+        stale_token = token.token
+
+        def refresh(http_client):
+            calls.append(http_client)
+            token.token = 'refreshed'
+
+        token._refresh = refresh
+        self.run_concurrently(lambda: token.refresh(self.api_client, stale_token=stale_token))
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual('refreshed', token.token)
+
+    def test_deadline(self):
+        api_client = self.create_client()
+        token = ClientCredentialToken(**self.api_client.client_credential.dump())
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def slow(*args):
+            released.wait()
+            return token
+
+        api_client._fetch_client_credential = slow
+        token._refresh = slow
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leaders = [
+                executor.submit(lambda: api_client.client_credential),
+                executor.submit(token.refresh, api_client)
+            ]
+            while api_client._client_credential_flight._calls == {} or token._refresh_flight._calls == {}:
+                time.sleep(.001)
+
+            # The followers joining the slow leaders give up by their own deadline
+            started_at = time.monotonic()
+            with deadline(.05):
+                with self.assertRaises(FinnotechTimeoutException):
+                    api_client.client_credential
+                with self.assertRaises(FinnotechTimeoutException):
+                    token.refresh(api_client)
+            self.assertLess(time.monotonic() - started_at, 1)
+
+            released.set()
+            self.assertIs(token, leaders[0].result())
+            leaders[1].result()
+
+    def test_async_deadline(self):
+        api_client = AsyncFinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url
+        )
+        token = ClientCredentialToken(**self.api_client.client_credential.dump())
+
+        async def slow(*args):
+            await asyncio.sleep(.5)
+            return token
+
+        api_client._fetch_client_credential = slow
+        token._refresh_async = slow
+
+        async def follow():
+            try:
+                leaders = [
+                    asyncio.ensure_future(api_client.get_client_credential()),
+                    asyncio.ensure_future(token.refresh_async(api_client))
+                ]
+                await asyncio.sleep(.01)
+                with deadline(.05):
+                    with self.assertRaises(FinnotechTimeoutException):
+                        await api_client.get_client_credential()
+                    with self.assertRaises(FinnotechTimeoutException):
+                        await token.refresh_async(api_client)
+                self.assertIs(token, await leaders[0])
+                await leaders[1]
+            finally:
+                await api_client.close()
+
+        asyncio.run(follow())
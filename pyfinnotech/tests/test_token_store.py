@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans, MockOauthController
+from pyfinnotech.token_store import FileTokenStore, SqliteTokenStore
+
+
+class TokenStoreTestCase(ApiClientTestCase):
+    def create_client(self, token_store):
+        return FinnotechApiClient(
+            client_id=self.api_client.client_id,
+            client_secret=self.api_client.client_secret,
+            base_url=self.api_client.server_url,
+            token_store=token_store
+        )
+
+    def assert_shared(self, create_token_store):
+        issued_tokens = MockOauthController.issued_tokens
+
+        first_client = self.create_client(create_token_store())
+        self.assertTrue(first_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+        second_client = self.create_client(create_token_store())
+        self.assertTrue(second_client.iban_inquiry(valid_mock_ibans[0]).is_valid)
+
+        self.assertEqual(1, MockOauthController.issued_tokens - issued_tokens)
+        self.assertEqual(first_client.client_credential.token, second_client.client_credential.token)
+        self.assertIsNotNone(second_client.client_credential.expires_at)
+
+        # The rejected token should not be reused
+        second_client.client_credential.refresh(second_client, stale_token=second_client.client_credential.token)
+        self.assertEqual(2, MockOauthController.issued_tokens - issued_tokens)
+
+    def assert_private(self, *paths):
+        for path in paths:
+            self.assertEqual(0o600, os.stat(path).st_mode & 0o777, path)
+
+    def test_file_token_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tokens.json')
+            self.assert_shared(lambda: FileTokenStore(path))
+            self.assert_private(path, f'{path}.lock')
+
+    def test_sqlite_token_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tokens.sqlite')
+            self.assert_shared(lambda: SqliteTokenStore(path))
+            self.assert_private(path)
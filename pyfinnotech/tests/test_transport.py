@@ -0,0 +1,30 @@
+from pyfinnotech import FinnotechApiClient
+from pyfinnotech.tests.helper import ApiClientTestCase
+from pyfinnotech.tests.mock_api_server import valid_mock_ibans
+from pyfinnotech.transport import HttpTransport
+
+
+class TransportTestCase(ApiClientTestCase):
+    def test_session_is_reused(self):
+        self.api_client.iban_inquiry(valid_mock_ibans[0])
+        session = self.api_client.transport.session
+        self.api_client.iban_inquiry(valid_mock_ibans[0])
+        self.assertIs(session, self.api_client.transport.session)
+
+    def test_keep_alive_timeout(self):
+        transport = HttpTransport(keep_alive_timeout=0)
+        session = transport.session
+        self.assertIsNot(session, transport.session)
+        transport.close()
+
+    def test_close(self):
+        with FinnotechApiClient(
+                client_id=self.api_client.client_id,
+                client_secret=self.api_client.client_secret,
+                base_url=self.api_client.server_url,
+                pool_maxsize=2
+        ) as api_client:
+            api_client.iban_inquiry(valid_mock_ibans[0])
+            self.assertIsNotNone(api_client.transport._session)
+
+        self.assertIsNone(api_client.transport._session)
@@ -1,27 +1,93 @@
 import base64
+import threading
+from datetime import datetime, timedelta, timezone
 
 import ujson
 
 from pyfinnotech.const import ALL_SCOPE_CLIENT_CREDENTIALS, ALL_SCOPE_AUTHORIZATION_TOKEN
+from pyfinnotech.jalali import parse_jalali_timestamp
 from pyfinnotech.responses import AuthorizationSmsVerify, AuthorizationTokenSmsSend
+from pyfinnotech.singleflight import SingleFlight, AsyncSingleFlight
 
 
 class Token:
     __token_type__ = 'CODE'
 
     scopes = []
+    creation_date = None
+    life_time = None
 
     def __init__(self):
-        pass
+        self._refresh_flight = SingleFlight()
+        self._async_refresh_flight = AsyncSingleFlight()
+
+    @property
+    def created_at(self) -> datetime:
+        if self.creation_date is None:
+            return None
+        return parse_jalali_timestamp(self.creation_date)
+
+    @property
+    def expires_at(self) -> datetime:
+        if self.creation_date is None or self.life_time is None:
+            return None
+        return self.created_at + timedelta(milliseconds=int(self.life_time))
+
+    @property
+    def expires_in(self):
+        """
+        Remaining seconds of the token's life, `None` when it's unknown
+        """
+        expires_at = self.expires_at
+        if expires_at is None:
+            return None
+        return (expires_at - datetime.now(timezone.utc)).total_seconds()
 
     @property
     def is_valid(self):
-        raise NotImplementedError()
+        expires_in = self.expires_in
+        return expires_in is None or expires_in > 0
+
+    def needs_refresh(self, margin=0):
+        """
+        :param margin: Seconds before the expiration from which the token should be refreshed
+        """
+        expires_in = self.expires_in
+        return expires_in is not None and expires_in <= margin
 
     def revoke(self):
         raise NotImplementedError()
 
-    def refresh(self, *args, **kwargs):
+    def refresh(self, http_client, stale_token=None):
+        """
+        Refreshes the token in place. Concurrent calls are single-flight: one refresh runs and the others wait for it.
+
+        :param stale_token: The rejected token value, the refresh is skipped if the token is not that value anymore
+            (someone else has already refreshed it)
+        """
+        self._refresh_flight.do('refresh', self._refresh_if_stale, http_client, stale_token)
+
+    async def refresh_async(self, http_client, stale_token=None):
+        await self._async_refresh_flight.do('refresh', self._refresh_if_stale_async, http_client, stale_token)
+
+    def _refresh_if_stale(self, http_client, stale_token):
+        if stale_token is None or stale_token == self.token:
+            self._refresh(http_client)
+            self._record_refresh(http_client)
+
+    async def _refresh_if_stale_async(self, http_client, stale_token):
+        if stale_token is None or stale_token == self.token:
+            await self._refresh_async(http_client)
+            self._record_refresh(http_client)
+
+    def _record_refresh(self, http_client):
+        if http_client.metrics is not None:
+            http_client.metrics.record_token_refresh(self.__token_type__)
+
+    def _refresh(self, http_client):
+        raise NotImplementedError()
+
+    async def _refresh_async(self, http_client):
         raise NotImplementedError()
 
     def generate_authorization_header(self):
@@ -45,16 +111,17 @@ class ClientCredentialToken(Token):
         self.life_time = kwargs.get('lifeTime', None)
         self.scopes = kwargs.get('scopes', None)
 
-    @property
-    def is_valid(self):
-        return True
-
     def revoke(self):
         raise NotImplementedError()
 
-    def refresh(self, http_client):
+    def _refresh(self, http_client):
         # TODO: We should ues refresh token, but it's not based on RFC, so it's almost unusable
-        new_token = self.__class__.fetch(http_client)
+        self._update(self.__class__.acquire(http_client, stale_token=self.token))
+
+    async def _refresh_async(self, http_client):
+        self._update(await self.__class__.fetch_async(http_client))
+
+    def _update(self, new_token):
         self.token = new_token.token
         self.refresh_token = new_token.refresh_token
         self.creation_date = new_token.creation_date
@@ -62,16 +129,55 @@ class ClientCredentialToken(Token):
         self.scopes = new_token.scopes
 
     @classmethod
-    def load(cls, raw_token, refresh_token=None):
+    def load(cls, raw_token, refresh_token=None, creation_date=None, life_time=None):
         payload = ujson.loads(base64.decodebytes((raw_token.split('.')[1] + '==').encode()).decode())
         payload.setdefault('refreshToken', refresh_token)
+        payload.setdefault('creationDate', creation_date)
+        payload.setdefault('lifeTime', life_time)
         return cls(value=raw_token, **payload)
 
+    def dump(self) -> dict:
+        return {
+            'value': self.token,
+            'refreshToken': self.refresh_token,
+            'creationDate': self.creation_date,
+            'lifeTime': self.life_time,
+            'scopes': self.scopes,
+        }
+
     def generate_authorization_header(self):
         return {
             'Authorization': f'Bearer {self.token}'
         }
 
+    @classmethod
+    def acquire(cls, http_client, stale_token=None):
+        """
+        Fetches a new token. When the client has a `token_store`, the stored token is reused instead if it's still
+        fresh (and it's not `stale_token`), otherwise the fetched one is stored for the other processes.
+        """
+        token_store = http_client.token_store
+        if token_store is None:
+            return cls.fetch(http_client)
+
+        key = http_client.client_id
+        with token_store.lock(key):
+            data = token_store.load(key)
+            if data is not None:
+                token = cls.load(
+                    raw_token=data['value'],
+                    refresh_token=data.get('refreshToken'),
+                    creation_date=data.get('creationDate'),
+                    life_time=data.get('lifeTime')
+                )
+                if token.token != stale_token and token.is_valid is True \
+                        and not token.needs_refresh(http_client.token_refresh_margin):
+                    return token
+
+            token = cls.fetch(http_client)
+            token_store.save(key, token.dump())
+            return token
+
     # noinspection PyProtectedMember
     @classmethod
     def fetch(cls, http_client):
@@ -79,12 +185,21 @@ class ClientCredentialToken(Token):
         https://devbeta.finnotech.ir/v2/boomrang-get-clientCredential-token.html
         :return:
         """
+        return cls(**http_client._execute(**cls._fetch_request(http_client)).get('result'))
+
+    # noinspection PyProtectedMember
+    @classmethod
+    async def fetch_async(cls, http_client):
+        return cls(**(await http_client._execute(**cls._fetch_request(http_client))).get('result'))
+
+    @classmethod
+    def _fetch_request(cls, http_client):
         url = '/dev/v2/oauth2/token'
 
         encoded_basic_authentication = base64 \
             .encodebytes(f'{http_client.client_id}:{http_client.client_secret}'.encode()) \
             .decode().strip()
-        return cls(**http_client._execute(
+        return dict(
             uri=url,
             body={
                 "grant_type": "client_credentials",
@@ -93,7 +208,7 @@ class ClientCredentialToken(Token):
             },
             method='post',
             headers={'Authorization': f'Basic {encoded_basic_authentication}'}
-        ).get('result'))
+        )
 
 
 class FacilitySmsAccessTokenToken(Token):
@@ -111,21 +226,24 @@ class FacilitySmsAccessTokenToken(Token):
         self.type = kwargs.get('type', None)
         self.user_national_id = kwargs.get('userId', None)
 
-    @property
-    def is_valid(self):
-        return True
-
     def revoke(self):
         raise NotImplementedError()
 
     # noinspection PyProtectedMember
-    def refresh(self, http_client):
+    def _refresh(self, http_client):
+        self._update(self.__class__(**http_client._execute(**self._refresh_request(http_client)).get('result')))
+
+    # noinspection PyProtectedMember
+    async def _refresh_async(self, http_client):
+        self._update(self.__class__(**(await http_client._execute(**self._refresh_request(http_client))).get('result')))
+
+    def _refresh_request(self, http_client):
         url = '/dev/v2/oauth2/token'
 
         encoded_basic_authentication = base64 \
             .encodebytes(f'{http_client.client_id}:{http_client.client_secret}'.encode()) \
             .decode().strip()
-        new_token = self.__class__(**http_client._execute(
+        return dict(
             uri=url,
             body={
                 "grant_type": "refresh_token",
@@ -135,8 +253,9 @@ class FacilitySmsAccessTokenToken(Token):
             },
             method='post',
             headers={'Authorization': f'Basic {encoded_basic_authentication}'}
-        ).get('result'))
+        )
 
+    def _update(self, new_token):
         self.token = new_token.token
         self.refresh_token = new_token.refresh_token
         self.creation_date = new_token.creation_date
@@ -161,6 +280,20 @@ class FacilitySmsAccessTokenToken(Token):
     # noinspection PyProtectedMember
     @classmethod
     def request_sms(cls, http_client, target_phone, scopes, redirect_url) -> AuthorizationTokenSmsSend:
+        return AuthorizationTokenSmsSend(http_client._execute(
+            **cls._request_sms_request(http_client, target_phone, scopes, redirect_url)
+        ).get('result'))
+
+    # noinspection PyProtectedMember
+    @classmethod
+    async def request_sms_async(cls, http_client, target_phone, scopes, redirect_url) -> AuthorizationTokenSmsSend:
+        return AuthorizationTokenSmsSend((await http_client._execute(
+            **cls._request_sms_request(http_client, target_phone, scopes, redirect_url)
+        )).get('result'))
+
+    # noinspection PyProtectedMember
+    @classmethod
+    def _request_sms_request(cls, http_client, target_phone, scopes, redirect_url):
         url = '/dev/v2/oauth2/authorize'
 
         params = {
@@ -175,21 +308,35 @@ class FacilitySmsAccessTokenToken(Token):
 
         encoded_basic_authentication = \
             cls.build_basic_authentication_token(http_client.client_id, http_client.client_secret)
-        return AuthorizationTokenSmsSend(http_client._execute(
+        return dict(
             uri=f'{url}?{"&".join([f"{k}={v}" for k, v in params.items()])}',
             method='get',
             headers={'Authorization': f'Basic {encoded_basic_authentication}'},
             no_track_id=True
-        ).get('result'))
+        )
 
     # noinspection PyProtectedMember
     @classmethod
     def verify_sms(cls, http_client, target_phone, target_national_id, track_id, otp) -> AuthorizationSmsVerify:
+        return AuthorizationSmsVerify(http_client._execute(
+            **cls._verify_sms_request(http_client, target_phone, target_national_id, track_id, otp)
+        ).get('result'))
+
+    # noinspection PyProtectedMember
+    @classmethod
+    async def verify_sms_async(cls, http_client, target_phone, target_national_id, track_id,
+                               otp) -> AuthorizationSmsVerify:
+        return AuthorizationSmsVerify((await http_client._execute(
+            **cls._verify_sms_request(http_client, target_phone, target_national_id, track_id, otp)
+        )).get('result'))
+
+    @classmethod
+    def _verify_sms_request(cls, http_client, target_phone, target_national_id, track_id, otp):
         url = '/dev/v2/oauth2/verify/sms'
 
         encoded_basic_authentication = \
             cls.build_basic_authentication_token(http_client.client_id, http_client.client_secret)
-        return AuthorizationSmsVerify(http_client._execute(
+        return dict(
             uri=url,
             body={
                 "mobile": target_phone,
@@ -200,16 +347,27 @@ class FacilitySmsAccessTokenToken(Token):
             method='post',
             headers={'Authorization': f'Basic {encoded_basic_authentication}'},
             no_track_id=True
-        ).get('result'))
+        )
 
     # noinspection PyProtectedMember
     @classmethod
     def request_token(cls, http_client, code, redirect_url):
+        return cls(**http_client._execute(**cls._request_token_request(http_client, code, redirect_url)).get('result'))
+
+    # noinspection PyProtectedMember
+    @classmethod
+    async def request_token_async(cls, http_client, code, redirect_url):
+        return cls(**(await http_client._execute(
+            **cls._request_token_request(http_client, code, redirect_url)
+        )).get('result'))
+
+    @classmethod
+    def _request_token_request(cls, http_client, code, redirect_url):
         url = '/dev/v2/oauth2/token'
 
         encoded_basic_authentication = \
             cls.build_basic_authentication_token(http_client.client_id, http_client.client_secret)
-        return cls(**http_client._execute(
+        return dict(
             uri=url,
             body={
                 "grant_type": "authorization_code",
@@ -220,4 +378,41 @@ class FacilitySmsAccessTokenToken(Token):
             method='post',
             headers={'Authorization': f'Basic {encoded_basic_authentication}'},
             no_track_id=True
-        ).get('result'))
+        )
+
+
+class ClientCredentialTokenRefresher(threading.Thread):
+    """
+    Keeps the client credential token of an api client fresh in background: the token is replaced `margin` seconds
+    before it expires, so the api calls never wait for a token fetch.
+    """
+
+    retry_interval = 10
+
+    def __init__(self, http_client, margin):
+        super().__init__(name='pyfinnotech-token-refresher', daemon=True)
+        self.http_client = http_client
+        self.margin = margin
+        self._stopped = threading.Event()
+
+    # noinspection PyProtectedMember
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                token = self.http_client._client_credential_token
+                if token is None:
+                    token = self.http_client.client_credential
+                elif token.needs_refresh(self.margin):
+                    token.refresh(self.http_client, stale_token=token.token)
+
+                expires_in = token.expires_in
+                wait = None if expires_in is None else max(expires_in - self.margin, 1)
+
+            except Exception as e:
+                self.http_client.logger.warning(f'Cannot refresh the client credential token: {e}')
+                wait = self.retry_interval
+
+            self._stopped.wait(wait)
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,146 @@
+import contextlib
+import os
+import sqlite3
+import threading
+
+import ujson
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# The stored tokens grant access to the api, only the owner may read them
+FILE_MODE = 0o600
+
+
+class TokenStore:
+    """
+    Persists the client credential tokens, so all the processes (e.g: gunicorn or celery workers) of a host share
+    and reuse one token instead of each fetching its own.
+
+    `lock` holds an exclusive lock across the processes, the one holding it decides whether to reuse the stored token
+    or to fetch (and save) a new one.
+    """
+
+    def load(self, key) -> dict:
+        """
+        :return: The stored token data, or `None`
+        """
+        raise NotImplementedError()
+
+    def save(self, key, data: dict):
+        raise NotImplementedError()
+
+    def lock(self, key):
+        """
+        Context manager, `load` and `save` may be called by the same thread while holding it.
+        """
+        raise NotImplementedError()
+
+
+class FileTokenStore(TokenStore):
+    """
+    Stores the tokens in a local json file, processes are coordinated by `flock` on `{path}.lock`.
+    """
+
+    def __init__(self, path):
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError('FileTokenStore is not supported on this platform, use SqliteTokenStore instead')
+
+        self.path = path
+        self.lock_path = f'{path}.lock'
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return ujson.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def load(self, key):
+        return self._read().get(key)
+
+    def save(self, key, data):
+        tokens = self._read()
+        tokens[key] = data
+        temp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, FILE_MODE), 'w') as f:
+            ujson.dump(tokens, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, FILE_MODE)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+class SqliteTokenStore(TokenStore):
+    """
+    Stores the tokens in a sqlite database, processes are coordinated by sqlite's own write lock.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        if path != ':memory:':
+            # Created by sqlite otherwise, readable by everyone; its journal files take the same mode
+            os.close(os.open(path, os.O_RDWR | os.O_CREAT, FILE_MODE))
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, data TEXT NOT NULL)')
+
+    def __getstate__(self):
+        return {'path': self.path, 'timeout': self.timeout}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    @contextlib.contextmanager
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            yield connection
+            return
+
+        with contextlib.closing(self._connect()) as connection:
+            yield connection
+
+    def load(self, key):
+        with self._connection() as connection:
+            row = connection.execute('SELECT data FROM tokens WHERE key = ?', (key,)).fetchone()
+        return None if row is None else ujson.loads(row[0])
+
+    def save(self, key, data):
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO tokens (key, data) VALUES (?, ?)',
+                (key, ujson.dumps(data))
+            )
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            self._local.connection = connection
+            try:
+                yield
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            finally:
+                self._local.connection = None
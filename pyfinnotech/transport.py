@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+import weakref
+
+import requests
+import ujson
+from requests.adapters import HTTPAdapter
+
+
+class HttpResponse:
+    """
+    Fully read response, exposing the same attributes as a `requests.Response` does, so it can be handled by
+    `FinnotechHttpException`. Used by the asyncio client and for the locally made up responses.
+    """
+
+    def __init__(self, status_code, content: bytes, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return ujson.loads(self.content)
+
+
+# Live transports, to drop their connections in the forked child processes
+_transports = weakref.WeakSet()
+
+
+def _reset_transports_after_fork():
+    for transport in list(_transports):
+        transport._reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_transports_after_fork)
+
+
+class HttpTransport:
+    """
+    Long-lived, pooled http transport.
+
+    Keeps one `requests.Session` (and so one urllib3 connection pool per host) alive between calls, so consecutive
+    requests reuse already established TCP+TLS connections instead of doing a fresh handshake every time.
+
+    :param pool_connections: Number of per-host connection pools to cache
+    :param pool_maxsize: Maximum number of connections kept alive for each host
+    :param pool_block: Block when all `pool_maxsize` connections of a host are in use, instead of opening extra ones
+    :param keep_alive_timeout: Seconds of inactivity after which the pooled connections are dropped, `None` keeps
+        them forever (until the server closes them)
+
+    It's picklable and fork-safe: the copies (in the other processes) open their own connections.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive_timeout=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive_timeout = keep_alive_timeout
+        self._reset()
+        _transports.add(self)
+
+    def _reset(self):
+        # The sockets inherited by a forked child are shared with its parent, so they are left to the parent
+        self._session = None
+        self._last_used_at = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'pool_block': self.pool_block,
+            'keep_alive_timeout': self.keep_alive_timeout,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            now = time.monotonic()
+            if self._session is not None \
+                    and self.keep_alive_timeout is not None \
+                    and now - self._last_used_at > self.keep_alive_timeout:
+                self._session.close()
+                self._session = None
+
+            if self._session is None:
+                self._session = self._create_session()
+
+            self._last_used_at = now
+            return self._session
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
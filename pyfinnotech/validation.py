@@ -0,0 +1,106 @@
+import re
+import threading
+from collections import Counter
+
+
+def validate_iban(iban):
+    if iban is None or not re.fullmatch('^IR[0-9]{24}$', iban):
+        raise ValueError(f'Bad iban: {iban}')
+
+
+def validate_card(card):
+    if card is None or not re.fullmatch('^[0-9]{16}$', card):
+        raise ValueError(f'Bad card: {card}')
+
+
+def validate_national_id(national_id):
+    if national_id is None or not re.fullmatch('^[0-9]{10}$', national_id):
+        raise ValueError(f'Bad national id: {national_id}')
+
+
+def validate_phone_number(phone_number):
+    if phone_number is None or not re.fullmatch('^[0-9]{11}$', phone_number):
+        raise ValueError(f'Bad phone number: {phone_number}')
+
+
+def validate_otp(otp):
+    if otp is None or not re.fullmatch('^[0-9]{4}$', otp):
+        raise ValueError(f'Bad otp: {otp}')
+
+
+def validate_birth_date(birth_date):
+    if birth_date is None or not re.fullmatch('^[0-9]{4}/[0-1][0-9]/[0-9]{2}$', birth_date):
+        raise ValueError(f'Bad birth_date: {birth_date}')
+
+
+def validate_gender(gender):
+    if gender is None or not re.fullmatch('^(مرد|زن)$', gender):
+        raise ValueError(f'Bad gender: {gender}')
+
+
+def is_luhn_valid(number):
+    total = 0
+    for index, digit in enumerate(reversed(number)):
+        digit = int(digit)
+        if index % 2 == 1:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+def is_iban_checksum_valid(iban):
+    """
+    ISO 13616 mod-97 check
+    """
+    rearranged = iban[4:] + iban[:4]
+    return int(''.join(str(int(c, 36)) for c in rearranged)) % 97 == 1
+
+
+def is_national_id_checksum_valid(national_id):
+    if len(set(national_id)) == 1:
+        return False
+
+    remainder = sum(int(national_id[i]) * (10 - i) for i in range(9)) % 11
+    check_digit = int(national_id[9])
+    return check_digit == remainder if remainder < 2 else check_digit == 11 - remainder
+
+
+class ChecksumValidator:
+    """
+    Runs the checksum checks (luhn, iban mod-97, national id) before the api calls and counts the calls avoided by
+    rejecting the malformed numbers locally.
+
+    :param enabled: Set to `False` to skip the checksum checks, only the format checks will run
+    """
+
+    checks = {
+        'card': (is_luhn_valid, 'Bad card checksum'),
+        'iban': (is_iban_checksum_valid, 'Bad iban checksum'),
+        'national_id': (is_national_id_checksum_valid, 'Bad national id checksum'),
+    }
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.avoided_calls = Counter()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def validate(self, endpoint, kind, value):
+        if self.enabled is not True:
+            return
+
+        check, message = self.checks[kind]
+        if not check(value):
+            with self._lock:
+                self.avoided_calls[endpoint] += 1
+            raise ValueError(f'{message}: {value}')
@@ -7,15 +7,24 @@ dependencies = [
     'nanohttp == 0.26.1',
     'pymlconf == 0.8.6',
 ]
-test_dependencies = ['nose', 'codecov']
+async_dependencies = ['aiohttp']
+bulk_dependencies = ['numpy']
+test_dependencies = ['nose', 'codecov'] + async_dependencies + bulk_dependencies
 
 setup(
     name="pyfinnotech",
     version='0.2.16',
     author="mahdi13",
     tests_require=test_dependencies,
-    extras_require={'test': test_dependencies},
+    extras_require={
+        'test': test_dependencies,
+        'async': async_dependencies,
+        'bulk': bulk_dependencies,
+    },
     install_requires=dependencies,
     packages=find_packages(),
+    entry_points={
+        'console_scripts': ['pyfinnotech = pyfinnotech.cli:main'],
+    },
     test_suite="pyfinnotech.tests"
 )